@@ -0,0 +1,175 @@
+import io
+import mmap
+import os
+import struct
+import pygame
+
+__author__ = 'Evan'
+
+
+'''
+Asset pack: images and sounds packed into a single file.
+
+Images are stored already decoded as RGBA pixels, so loading one is a copy out of the file instead of decoding
+a PNG.  Sounds are stored as the bytes of their file.  The file starts with an index of every asset, and is
+memory mapped when opened, so opening a pack only reads the index.  Each asset is turned into a surface or
+sound the first time it is asked for, and only the pages of the file it uses are read.
+
+Usage:
+    build('Res/Cards.pak', images=[('Ace of Spades', 'Res/img/Cards/Ace of Spades.png')],
+          sounds=[('The Ace of Spades', 'Res/Sound/The Ace of Spades.wav')])
+
+    asset_pack = load('Res/Cards.pak')
+    surface = asset_pack.get_image('Ace of Spades')
+'''
+
+MAGIC = 'CAP1'
+HEADER = struct.Struct('<4sI')
+
+# Index entry of an asset: name, kind, width and height of images, then where its data is in the file
+NAME_SIZE = 64
+ENTRY = struct.Struct('<' + str(NAME_SIZE) + 'sBHHII')
+
+IMAGE = 1
+SOUND = 2
+
+# Pixel format of the stored images, as used by pygame.image.tostring
+_PIXEL_FORMAT = 'RGBA'
+
+
+class AssetPack(object):
+    """
+    Memory mapped asset pack file
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = HEADER.unpack_from(self._map, 0) if len(self._map) >= HEADER.size else (None, 0)
+        if magic != MAGIC or len(self._map) < HEADER.size + count * ENTRY.size:
+            self.close()
+            raise ValueError(file_path + ' is not an asset pack file')
+
+        # Index of kind, size and location of each asset by name
+        self._index = {}
+        for i in range(0, count):
+            name, kind, width, height, offset, length = ENTRY.unpack_from(self._map, HEADER.size + i * ENTRY.size)
+            if offset + length > len(self._map):
+                self.close()
+                raise ValueError(file_path + ' is not an asset pack file')
+            self._index[name.rstrip('\0')] = (kind, width, height, offset, length)
+
+        self._assets = {}
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def get_names(self):
+        return sorted(self._index)
+
+    def get_loaded(self):
+        """
+        :return: Number of assets that have been turned into surfaces or sounds
+        """
+        return len(self._assets)
+
+    def get_image(self, name):
+        """
+        :param name: Name of the image in the pack
+        :return: Surface, converted to the display's pixel format when the display is set up.  Same surface is
+            returned every time
+        """
+        surface = self._assets.get(name, None)
+        if surface is None:
+            kind, width, height, offset, length = self._get_entry(name, IMAGE)
+            surface = pygame.image.fromstring(self._map[offset:offset + length], (width, height), _PIXEL_FORMAT)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            self._assets[name] = surface
+        return surface
+
+    def get_sound(self, name):
+        """
+        :param name: Name of the sound in the pack
+        :return: Pygame Sound.  Same sound is returned every time
+        """
+        sound = self._assets.get(name, None)
+        if sound is None:
+            kind, width, height, offset, length = self._get_entry(name, SOUND)
+            sound = pygame.mixer.Sound(file=io.BytesIO(self._map[offset:offset + length]))
+            self._assets[name] = sound
+        return sound
+
+    def _get_entry(self, name, kind):
+        entry = self._index[name]
+        if entry[0] != kind:
+            raise KeyError(name)
+        return entry
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    names = property(get_names)
+    loaded = property(get_loaded)
+
+
+def load(file_path):
+    """
+    :return: AssetPack, or None if the file doesn't exist
+    """
+    if not os.path.exists(file_path):
+        return None
+    return AssetPack(file_path)
+
+
+def build(file_path, images=None, sounds=None):
+    """
+    Decodes the images and reads the sounds, and writes them to an asset pack
+    :param file_path: File to write
+    :param images: List of (name, file path) pairs of images
+    :param sounds: List of (name, file path) pairs of sounds
+    :return: Number of assets written
+    """
+    entries = []
+    data = []
+    for name, image_path in images or []:
+        surface = pygame.image.load(image_path)
+        width, height = surface.get_size()
+        entries.append((name, IMAGE, width, height))
+        data.append(pygame.image.tostring(surface, _PIXEL_FORMAT))
+    for name, sound_path in sounds or []:
+        entries.append((name, SOUND, 0, 0))
+        with open(sound_path, 'rb') as sound_file:
+            data.append(sound_file.read())
+
+    for name, kind, width, height in entries:
+        if len(name) > NAME_SIZE:
+            raise ValueError('Asset name is longer than ' + str(NAME_SIZE) + ' characters: ' + name)
+
+    temp_file = file_path + '.tmp'
+    with open(temp_file, 'wb') as pack_file:
+        pack_file.write(HEADER.pack(MAGIC, len(entries)))
+
+        # Data follows the index, with each asset starting on an 8 byte boundary
+        offset = HEADER.size + len(entries) * ENTRY.size
+        offsets = []
+        for asset_data in data:
+            offset += -offset % 8
+            offsets.append(offset)
+            offset += len(asset_data)
+
+        for (name, kind, width, height), asset_offset, asset_data in zip(entries, offsets, data):
+            pack_file.write(ENTRY.pack(name, kind, width, height, asset_offset, len(asset_data)))
+        for asset_offset, asset_data in zip(offsets, data):
+            pack_file.write('\0' * (asset_offset - pack_file.tell()))
+            pack_file.write(asset_data)
+
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    os.rename(temp_file, file_path)
+    return len(entries)
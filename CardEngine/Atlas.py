@@ -0,0 +1,77 @@
+import math
+import pygame
+
+__author__ = 'Evan'
+
+
+class SpriteAtlas(object):
+    """
+    Packs sprites into one surface.  Sprites are handed out as subsurfaces, which share the pixels of the atlas
+    instead of each being a separate surface.
+
+    Atlas is converted to the pixel format of the display when the display is set up, so blitting a sprite
+    does not convert its pixels every time.  Every sprite is copied in when the atlas is made, so all of them
+    have to be loaded first.
+
+    Variables:
+    -surface: Surface holding every sprite
+    -rects: Area of each sprite in the atlas, by name
+    """
+    def __init__(self, sprites, columns=None):
+        """
+        :param sprites: List of (name, surface) pairs, placed left to right and top to bottom in order
+        :param columns: Number of sprites in each row.  Defaults to enough for the atlas to be roughly square
+        :return:
+        """
+        if columns is None:
+            columns = max(1, int(math.ceil(math.sqrt(len(sprites)))))
+
+        # Lay out the sprites in rows, with each row as tall as its tallest sprite
+        self.rects = {}
+        width = 0
+        y = 0
+        for i in range(0, len(sprites), columns):
+            x = 0
+            row_height = 0
+            for name, sprite in sprites[i:i + columns]:
+                self.rects[name] = pygame.Rect((x, y), sprite.get_size())
+                x += sprite.get_width()
+                row_height = max(row_height, sprite.get_height())
+            width = max(width, x)
+            y += row_height
+
+        # Pixels are copied as they are, including alpha, by taking the max against a transparent atlas
+        self.surface = pygame.Surface((max(width, 1), max(y, 1)), pygame.SRCALPHA, 32)
+        self.surface.fill((0, 0, 0, 0))
+        for name, sprite in sprites:
+            self.surface.blit(sprite, self.rects[name], special_flags=pygame.BLEND_RGBA_MAX)
+
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+
+        self._subsurfaces = {}
+        for name, rect in self.rects.items():
+            self._subsurfaces[name] = self.surface.subsurface(rect)
+
+    def get(self, name):
+        """
+        :param name: Name the sprite was packed with
+        :return: Subsurface of the atlas.  Same subsurface is returned every time, so it can be used as a key
+        """
+        return self._subsurfaces[name]
+
+    def __contains__(self, name):
+        return name in self._subsurfaces
+
+    def __len__(self):
+        return len(self._subsurfaces)
+
+
+def load(file_paths, columns=None):
+    """
+    Loads images and packs them into an atlas
+    :param file_paths: List of (name, file path) pairs
+    :param columns: Number of sprites in each row of the atlas
+    :return: SpriteAtlas
+    """
+    return SpriteAtlas([(name, pygame.image.load(file_path)) for name, file_path in file_paths], columns)
@@ -37,7 +37,13 @@ class UIElement(object):
     -rect: x and y location, as well as size of the image
     -z: variable used to determine order in which UI Elements are displayed and handled
     -visible: Used to determines if the UI Element is displayed and will handle events
+    -drawn_rect: Area of the screen the UI Element covered when it was last marked dirty, or None if hidden
+    -event_types: Pygame event types handle_event is called with, or None for every type
+
+    Changes to how a UI Element looks must call mark_dirty, so the engine draws that part of the screen again.
     """
+    event_types = None
+
     def __init__(self, rect, z):
         """
         Initializes the UI Element for basic interaction with the engine
@@ -56,6 +62,7 @@ class UIElement(object):
 
         self._z = z
         self._visible = True
+        self._drawn_rect = None
 
         # Adds the UI Element to the Card Engine
         CardEngine.Engine.CardEngine.add_ui_element(self)
@@ -77,6 +84,35 @@ class UIElement(object):
         """
         raise _InheritanceError('Function not defined')
 
+    def get_event_region(self):
+        """
+        Area of the screen mouse events must be in to be passed to handle_event.  Override to skip mouse events
+        that would not change the UI Element
+        :return: Pygame Rect, or None for the whole screen
+        """
+        return None
+
+    # Functions for redrawing only what changed
+    def get_draw_rect(self):
+        """
+        Area of the screen the UI Element covers when rendered.  Override if it draws outside of its rect
+        :return: Pygame Rect
+        """
+        return self._rect.copy()
+
+    def mark_dirty(self):
+        """
+        Marks where the UI Element was drawn and where it will be drawn next as needing to be drawn again
+        :return:
+        """
+        CardEngine.Engine.CardEngine.mark_dirty(self._drawn_rect)
+        if self._visible:
+            self._drawn_rect = self.get_draw_rect()
+            CardEngine.Engine.CardEngine.mark_dirty(self._drawn_rect)
+        else:
+            self._drawn_rect = None
+        CardEngine.Engine.CardEngine.update_element_bounds(self)
+
     # Common functions for location
     def set_location(self, x, y, z=0):
         """
@@ -87,8 +123,9 @@ class UIElement(object):
         :return:
         """
         self._rect.topleft = (x, y)
-        self._z = z
+        self._set_z(z)
         self._update()
+        self.mark_dirty()
 
     def move(self, dx, dy, dz=0):
         """
@@ -100,8 +137,16 @@ class UIElement(object):
         """
         (x, y) = self._rect.topleft
         self._rect.topleft = (x + dx, y + dy)
-        self._z += dz
+        self._set_z(self._z + dz)
         self._update()
+        self.mark_dirty()
+
+    def _set_z(self, new_z):
+        # Engine keeps its elements in z order, so it moves the UI Element when z changes
+        if new_z != self._z:
+            old_z = self._z
+            self._z = new_z
+            CardEngine.Engine.CardEngine.reorder_element(self, old_z)
 
     # Collision functions
     def collide(self, x, y):
@@ -127,13 +172,15 @@ class UIElement(object):
     def _prop_set_rect(self, new_rect):
         self._rect = pygame.Rect(new_rect)
         self._update()
+        self.mark_dirty()
         return
 
     def _prop_get_z(self):
         return self._z
     def _prop_set_z(self, new_z):
-        self._z = new_z
+        self._set_z(new_z)
         self._update()
+        self.mark_dirty()
         return
 
     def _prop_get_visible(self):
@@ -141,8 +188,13 @@ class UIElement(object):
     def _prop_set_visible(self, visible):
         self._visible = visible
         self._update()
+        self.mark_dirty()
         return
 
+    def _prop_get_drawn_rect(self):
+        return self._drawn_rect
+
     rect = property(_prop_get_rect, _prop_set_rect)
     z = property(_prop_get_z, _prop_set_z)
     visible = property(_prop_get_visible, _prop_set_visible)
+    drawn_rect = property(_prop_get_drawn_rect)
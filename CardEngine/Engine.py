@@ -1,5 +1,7 @@
+import bisect
 import sys
 import random
+import time
 import pygame
 import UI
 import Core.Constant
@@ -56,17 +58,43 @@ class CardEngine:
     keyPress = EventHandler()
     gameQuit = EventHandler()
 
-    # List of UI Elements
+    # List of UI Elements, kept in z order
     UIElements = []
+    _ui_z = []
 
-    # List of Cards
+    # List of Cards, kept in z order
     CardElements = []
+    _card_z = []
+
+    # Visible UI Elements by the event types they handle, in z order, with None for every event type.  Each
+    # subscribed element is kept with the event types it is listed under.
+    _event_elements = {}
+    _subscribed = {}
+
+    # Grid of the cards drawn over each square of the screen, used to find the cards under the mouse
+    CARD_GRID_SIZE = 64
+    _card_grid = {}
+    _card_cells = {}
+
+    # Parts of the screen that need to be drawn again.  Whole screen is drawn when redraw all is set.
+    BACKGROUND_COLOR = (70, 200, 70)
+    _dirty_rects = []
+    _redraw_all = True
+
+    # Number of frames rendered, and seconds from init to the end of the first frame
+    frames = 0
+    first_frame_time = None
+    _init_time = 0
 
     def __init__(self):
         raise NotImplementedError("CardEngine cannot be instantiated.")
 
     @classmethod
-    def init(cls, width=800, height=600, display_caption='A Card Game'):
+    def init(cls, width=800, height=600, display_caption='A Card Game', icon=None):
+        cls._init_time = time.time()
+        cls.frames = 0
+        cls.first_frame_time = None
+
         # Seed needed for shuffling function
         random.seed()
 
@@ -75,8 +103,13 @@ class CardEngine:
         UI.init()
         cls.width = width
         cls.height = height
+
+        # Setting an icon before the display also keeps pygame from loading its own icon, which is slow
+        if icon is not None:
+            pygame.display.set_icon(icon)
         cls.DISPLAYSURFACE = pygame.display.set_mode((width, height), 0, 32)
         pygame.display.set_caption(display_caption)
+        cls.mark_all_dirty()
 
     @classmethod
     def update(cls):
@@ -106,21 +139,94 @@ class CardEngine:
             cls._handle_card_click(event)
 
             # Let UI handle events
-            for ui in cls.UIElements:
-                ui.handle_event(event)
+            cls._dispatch_event(event)
+
+    @classmethod
+    def _dispatch_event(cls, event):
+        # UI Elements for the event's type and for every type, kept apart but each in z order
+        elements = cls._event_elements.get(event.type, None)
+        any_elements = cls._event_elements.get(None, None)
+        if elements is None and any_elements is None:
+            return
+        if elements is None:
+            elements = list(any_elements[0])
+        elif any_elements is None:
+            elements = list(elements[0])
+        else:
+            elements = sorted(elements[0] + any_elements[0], key=lambda ui: ui.z)
+
+        pos = getattr(event, 'pos', None)
+        for ui in elements:
+            if pos is not None:
+                region = ui.get_event_region()
+                if region is not None and not region.collidepoint(pos):
+                    continue
+            ui.handle_event(event)
 
     @classmethod
     def render(cls):
-        cls.DISPLAYSURFACE.fill((70, 200, 70))
-        cls._sort_ui_elements()
-        cls._sort_card_elements()
+        cls.frames += 1
+
+        if cls._redraw_all:
+            cls.DISPLAYSURFACE.fill(cls.BACKGROUND_COLOR)
+            for ui in cls.UIElements:
+                ui.render(cls.DISPLAYSURFACE)
+            for card in cls.CardElements:
+                card.render(cls.DISPLAYSURFACE)
+
+            pygame.display.update()
+            if cls.first_frame_time is None:
+                cls.first_frame_time = time.time() - cls._init_time
+            cls._redraw_all = False
+            del cls._dirty_rects[:]
+            return
+
+        # Nothing changed, so the screen is left alone
+        if len(cls._dirty_rects) is 0:
+            return
+
+        # Only the dirty parts are drawn, with every element overlapping them drawn again in order
+        dirty_rects = cls._merge_dirty_rects()
+        for dirty_rect in dirty_rects:
+            cls.DISPLAYSURFACE.set_clip(dirty_rect)
+            cls.DISPLAYSURFACE.fill(cls.BACKGROUND_COLOR)
+            for ui in cls.UIElements:
+                if ui.drawn_rect is not None and dirty_rect.colliderect(ui.drawn_rect):
+                    ui.render(cls.DISPLAYSURFACE)
+            for card in cls.CardElements:
+                if card.drawn_rect is not None and dirty_rect.colliderect(card.drawn_rect):
+                    card.render(cls.DISPLAYSURFACE)
+        cls.DISPLAYSURFACE.set_clip(None)
+
+        pygame.display.update(dirty_rects)
+        del cls._dirty_rects[:]
+
+    @classmethod
+    def mark_dirty(cls, rect):
+        """
+        Marks part of the screen to be drawn again on the next render
+        :param rect: Pygame Rect, or None for nothing
+        :return:
+        """
+        if rect is None or cls._redraw_all:
+            return
+        cls._dirty_rects.append(pygame.Rect(rect))
 
-        for ui in cls.UIElements:
-            ui.render(cls.DISPLAYSURFACE)
-        for card in cls.CardElements:
-            card.render(cls.DISPLAYSURFACE)
+    @classmethod
+    def mark_all_dirty(cls):
+        cls._redraw_all = True
+        del cls._dirty_rects[:]
 
-        pygame.display.update()
+    @classmethod
+    def _merge_dirty_rects(cls):
+        # Rects inside other rects are drawn by the bigger rect, so they are dropped
+        dirty_rects = []
+        for rect in sorted(cls._dirty_rects, key=lambda dirty_rect: dirty_rect.width * dirty_rect.height,
+                           reverse=True):
+            if rect.width > 0 and rect.height > 0 and \
+                    not any(dirty_rect.contains(rect) for dirty_rect in dirty_rects):
+                dirty_rects.append(rect)
+        return dirty_rects
 
     @classmethod
     def _handle_card_click(cls, event):
@@ -128,72 +234,179 @@ class CardEngine:
             return
 
         x, y = event.pos
-        clicked = []
+        cards = cls._card_grid.get((x // cls.CARD_GRID_SIZE, y // cls.CARD_GRID_SIZE), None)
+        if cards is None:
+            return
 
-        for card in cls.CardElements:
+        # Only the top card under the mouse handles the event
+        for card in sorted(cards, key=lambda grid_card: grid_card.z, reverse=True):
             if card.collide(x, y):
-                clicked.append(card)
+                card.handle_event(event)
+                return
 
-        if len(clicked) is 0:
+    @classmethod
+    def pick_cards(cls, points):
+        """
+        Finds the top card under each of many points at once, checking every card against every point together
+        :param points: List of (x, y) points
+        :return: List of the top card containing each point, or None where no card does
+        """
+        # NumPy is only loaded when needed, so it does not slow down starting the game
+        import HitboxArray
+
+        cards = [card for card in cls.CardElements if card.visible]
+        if not cards or not points:
+            return [None] * len(points)
+        inside = HitboxArray.HitboxArray([card.hitbox for card in cards]).collide_points(points)
+
+        # Cards are in z order, so the last card containing a point is on top
+        top = len(cards) - 1 - inside[:, ::-1].argmax(axis=1)
+        return [cards[i] if inside[k, i] else None for k, i in enumerate(top)]
+
+    # Methods below keep the grid of cards and the event subscriptions up to date.  Cards are in every square
+    # their drawn rect touches, and hidden cards are in none.  Hidden UI Elements do not get events.
+    @classmethod
+    def update_element_bounds(cls, element):
+        """
+        Places a card in the grid again, or subscribes or unsubscribes a UI Element to events, after where or
+        whether it is drawn has changed
+        :param element: UI Element or card
+        :return:
+        """
+        if element in cls._card_cells:
+            cls._remove_from_grid(element)
+            cls._add_to_grid(element)
+        elif bool(element.visible) != (element in cls._subscribed):
+            if element.visible:
+                if cls._find_element(cls.UIElements, cls._ui_z, element, element.z) >= 0:
+                    cls._subscribe(element)
+            else:
+                cls._unsubscribe(element, element.z)
+
+    @classmethod
+    def _subscribe(cls, ui_element):
+        if not ui_element.visible or ui_element in cls._subscribed:
             return
 
-        card_display = clicked[0]
-        for card in clicked:
-            if card.z > card_display.z:
-                card_display = card
+        event_types = [None] if ui_element.event_types is None else ui_element.event_types
+        for event_type in event_types:
+            elements, z_list = cls._event_elements.setdefault(event_type, ([], []))
+            cls._insert_element(elements, z_list, ui_element)
+        cls._subscribed[ui_element] = event_types
 
-        card_display.handle_event(event)
+    @classmethod
+    def _unsubscribe(cls, ui_element, z):
+        for event_type in cls._subscribed.pop(ui_element, []):
+            elements, z_list = cls._event_elements[event_type]
+            i = cls._find_element(elements, z_list, ui_element, z)
+            del elements[i]
+            del z_list[i]
+            if len(elements) is 0:
+                del cls._event_elements[event_type]
+
+    @classmethod
+    def _add_to_grid(cls, card):
+        cells = []
+        if card.drawn_rect is not None:
+            # Grown by a pixel, as the hitbox of a rotated card is not rounded to whole pixels
+            rect = card.drawn_rect.inflate(2, 2)
+            for cell_x in range(rect.left // cls.CARD_GRID_SIZE, (rect.right - 1) // cls.CARD_GRID_SIZE + 1):
+                for cell_y in range(rect.top // cls.CARD_GRID_SIZE, (rect.bottom - 1) // cls.CARD_GRID_SIZE + 1):
+                    cls._card_grid.setdefault((cell_x, cell_y), []).append(card)
+                    cells.append((cell_x, cell_y))
+        cls._card_cells[card] = cells
 
-    # Methods below are used to handle the ui elements on screen.
     @classmethod
-    def _sort_ui_elements(cls):
-        for i in range(1, len(cls.UIElements)):
-            j = i
-            while (j > 0) and (cls.UIElements[j - 1].z > cls.UIElements[j].z):
-                temp = cls.UIElements[j]
-                cls.UIElements[j] = cls.UIElements[j - 1]
-                cls.UIElements[j - 1] = temp
-                j -= 1
+    def _remove_from_grid(cls, card):
+        for cell in cls._card_cells.pop(card, []):
+            cards = cls._card_grid[cell]
+            cards.remove(card)
+            if len(cards) is 0:
+                del cls._card_grid[cell]
+
+    # Methods below are used to handle the ui elements on screen.
+    # Elements are kept in z order as they are added and as their z changes, with the z of each element in a
+    # matching list to bisect.  Elements with the same z stay in the order they were added.
+    @staticmethod
+    def _find_element(elements, z_list, element, z):
+        for i in range(bisect.bisect_left(z_list, z), bisect.bisect_right(z_list, z)):
+            if elements[i] is element:
+                return i
+        return -1
+
+    @staticmethod
+    def _insert_element(elements, z_list, element):
+        i = bisect.bisect_right(z_list, element.z)
+        z_list.insert(i, element.z)
+        elements.insert(i, element)
 
     @classmethod
-    def _sort_card_elements(cls):
-        for i in range(1, len(cls.CardElements)):
-            j = i
-            while (j > 0) and (cls.CardElements[j - 1].z > cls.CardElements[j].z):
-                temp = cls.CardElements[j]
-                cls.CardElements[j] = cls.CardElements[j - 1]
-                cls.CardElements[j - 1] = temp
-                j -= 1
+    def reorder_element(cls, element, old_z):
+        """
+        Moves an element to its place for its new z
+        :param element: UI Element or card whose z changed
+        :param old_z: z the element had when it was placed
+        :return:
+        """
+        for elements, z_list in [(cls.UIElements, cls._ui_z), (cls.CardElements, cls._card_z)]:
+            i = cls._find_element(elements, z_list, element, old_z)
+            if i >= 0:
+                del elements[i]
+                del z_list[i]
+                cls._insert_element(elements, z_list, element)
+                break
+
+        if element in cls._subscribed:
+            cls._unsubscribe(element, old_z)
+            cls._subscribe(element)
 
     @classmethod
     def add_ui_element(cls, ui_element):
-        if ui_element not in cls.UIElements:
-            cls.UIElements.append(ui_element)
-        cls._sort_ui_elements()
+        if cls._find_element(cls.UIElements, cls._ui_z, ui_element, ui_element.z) < 0:
+            cls._insert_element(cls.UIElements, cls._ui_z, ui_element)
+            cls._subscribe(ui_element)
+        cls.mark_dirty(ui_element.drawn_rect)
 
     @classmethod
     def remove_ui_element(cls, ui_element):
-        if ui_element in cls.UIElements:
-            cls.UIElements.remove(ui_element)
+        i = cls._find_element(cls.UIElements, cls._ui_z, ui_element, ui_element.z)
+        if i >= 0:
+            del cls.UIElements[i]
+            del cls._ui_z[i]
+            cls._unsubscribe(ui_element, ui_element.z)
+            cls.mark_dirty(ui_element.drawn_rect)
 
     @classmethod
     def remove_all_ui_elements(cls):
         del cls.UIElements[:]
+        del cls._ui_z[:]
+        cls._event_elements.clear()
+        cls._subscribed.clear()
+        cls.mark_all_dirty()
 
     @classmethod
     def add_card_element(cls, card):
-        if card not in cls.UIElements:
-            cls.CardElements.append(card)
-        cls._sort_ui_elements()
+        if cls._find_element(cls.CardElements, cls._card_z, card, card.z) < 0:
+            cls._insert_element(cls.CardElements, cls._card_z, card)
+            cls._add_to_grid(card)
+        cls.mark_dirty(card.drawn_rect)
 
     @classmethod
     def remove_card_element(cls, card):
-        if card in cls.UIElements:
-            cls.CardElements.remove(card)
+        i = cls._find_element(cls.CardElements, cls._card_z, card, card.z)
+        if i >= 0:
+            del cls.CardElements[i]
+            del cls._card_z[i]
+            cls._remove_from_grid(card)
+            cls.mark_dirty(card.drawn_rect)
 
     @classmethod
     def remove_all_card_elements(cls):
         del cls.CardElements[:]
+        del cls._card_z[:]
+        cls._card_grid.clear()
+        cls._card_cells.clear()
+        cls.mark_all_dirty()
 
     # Methods below are used to create and shuffle a deck.
     @staticmethod
@@ -213,20 +426,47 @@ class CardEngine:
         return deck
 
     @staticmethod
-    def shuffle(deck):
-        temp = []
-        shuffled = []
+    def shuffle(deck, rng=None):
+        """
+        :param deck: List of cards.  Left as it is
+        :param rng: random.Random to shuffle with.  Defaults to the random module
+        :return: Shuffled copy of the deck
+        """
+        shuffled = list(deck)
+        CardEngine.shuffle_in_place(shuffled, rng)
+        return shuffled
 
-        # Create a temporary deck to not mess with the original deck
-        for i in range(0, len(deck)):
-            temp.append(deck[i])
+    @staticmethod
+    def shuffle_in_place(deck, rng=None):
+        """
+        Fisher-Yates shuffle.  Swaps each card, from the last to the second, with a random card at or before it
+        :param deck: List of cards to shuffle
+        :param rng: random.Random to shuffle with.  Defaults to the random module
+        :return: The deck
+        """
+        if rng is None:
+            rng = random
+        draw = rng.random
+
+        for i in range(len(deck) - 1, 0, -1):
+            j = int(draw() * (i + 1))
+            deck[i], deck[j] = deck[j], deck[i]
 
-        # Get a random card from the temporary deck and move it to the end of the shuffled deck
-        for i in range(0, len(deck)):
-            rand = random.randrange(0, len(deck) - i)
-            shuffled.append(temp.pop(rand))
+        return deck
 
-        return shuffled
+    @staticmethod
+    def generate_deals(deck, rng=None, number_of_deals=None):
+        """
+        Shuffles a copy of the deck each time the next deal is asked for
+        :param deck: List of cards.  Left as it is
+        :param rng: random.Random to shuffle with.  Defaults to the random module
+        :param number_of_deals: Number of deals to make, or None to keep dealing
+        :return: Generator of shuffled copies of the deck
+        """
+        count = 0
+        while number_of_deals is None or count < number_of_deals:
+            yield CardEngine.shuffle(deck, rng)
+            count += 1
 
     # Methods below deal with transferring cards.
     @staticmethod
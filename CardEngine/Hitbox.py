@@ -3,41 +3,52 @@ import CardEngine.VectorMath
 
 
 class Hitbox2D(object):
+    # Changing the hitbox only sets _dirty.  Points and triangles are worked out again the next time they are
+    # used, so a hitbox moved many times between collision checks is only worked out once
+    __slots__ = ('_original_points', 'hitbox_points', '_triangles', '_x', '_y', '_dirty')
+
     def __init__(self, points=None):
         # If no points were passed in, then initialize an empty array.  Otherwise,
         if points is None:
-            self.original_points = []
+            self._original_points = []
             self._x = 0
             self._y = 0
         else:
-            self.original_points = [point for point in points]
-            self._x = self.original_points[0].x
-            self._y = self.original_points[0].y
+            self._original_points = [point for point in points]
+            self._x = self._original_points[0].x
+            self._y = self._original_points[0].y
         # Points used to create triangles.  Need copy of original points as overlapping hitboxes
         # will add or remove points.
-        self.hitbox_points = [point for point in self.original_points]
+        self.hitbox_points = [point for point in self._original_points]
 
         # Triangles will be created to detect a mouse collision
-        self.triangles = []
+        self._triangles = []
+        self._dirty = True
+
+    def _refresh(self):
+        if self._dirty:
+            self._dirty = False
+            self._update()
 
     def _update(self):
         self._create_triangles()
 
     def _create_triangles(self):
-        self.triangles = []
+        self._triangles = []
         if len(self.hitbox_points) >= 3:
-            for i in range(0, len(self.original_points) - 2):
-                point_1 = self.original_points[0]
-                point_2 = self.original_points[i + 1]
-                point_3 = self.original_points[i + 2]
+            for i in range(0, len(self._original_points) - 2):
+                point_1 = self._original_points[0]
+                point_2 = self._original_points[i + 1]
+                point_3 = self._original_points[i + 2]
 
-                self.triangles.append(CardEngine.VectorMath.Triangle2D(point_1, point_2, point_3))
+                self._triangles.append(CardEngine.VectorMath.Triangle2D(point_1, point_2, point_3))
 
     def collidepoint(self, x, y):
-        collide_result = False
-        for triangle in self.triangles:
-            collide_result |= triangle.collidepoint(x, y)
-        return collide_result
+        self._refresh()
+        for triangle in self._triangles:
+            if triangle.collide_xy(x, y):
+                return True
+        return False
 
     def colliderect(self, rect):
         (x, y) = rect.topleft
@@ -67,19 +78,34 @@ class Hitbox2D(object):
         return self._x
     def _prop_set_x(self, x):
         self._x = x
-        self._update()
+        self._dirty = True
 
     def _prop_get_y(self):
         return self._y
     def _prop_set_y(self, y):
         self._y = y
-        self._update()
+        self._dirty = True
+
+    def _prop_get_original_points(self):
+        self._refresh()
+        return self._original_points
+
+    def _prop_get_triangles(self):
+        self._refresh()
+        return self._triangles
 
     x = property(_prop_get_x, _prop_set_x)
     y = property(_prop_get_y, _prop_set_y)
+    original_points = property(_prop_get_original_points)
+    triangles = property(_prop_get_triangles)
 
 
 class SquareHitbox2D(Hitbox2D):
+    # Point a of the rotated hitbox, the vectors from b and d to a, and their squared lengths.  Kept up to date
+    # with the rotated points so collide only does arithmetic on numbers
+    __slots__ = ('_width', '_height', '_angle', '_rotated_points',
+                 '_ax', '_ay', '_abx', '_aby', '_adx', '_ady', '_ab_ab', '_ad_ad')
+
     def __init__(self, x, y, width, height, angle):
         Hitbox2D.__init__(self, [CardEngine.VectorMath.Point2D(x, y),
                                  CardEngine.VectorMath.Point2D(x + width, y),
@@ -90,41 +116,47 @@ class SquareHitbox2D(Hitbox2D):
         self._height = height
         self._angle = math.radians(angle)
 
-        self._update_original_points()
-        self._get_rotated_points()
-
     def collide(self, x, y):
         # Assuming points a, b, c, and d, and a point m with coordinates (x, y).
         # Check the vector from point a to point m against the vectors from a to b and a to d.
         # Vector math to check if a point is inside the hitbox.  Allows hitbox to be rotated to any angle
-        vector_am = CardEngine.VectorMath.Vector2D(self.rotatedPoints[0].x - x,
-                                                   self.rotatedPoints[0].y - y)
-        vector_ab = CardEngine.VectorMath.Vector2D(self.rotatedPoints[0].x - self.rotatedPoints[1].x,
-                                                   self.rotatedPoints[0].y - self.rotatedPoints[1].y)
-        vector_ad = CardEngine.VectorMath.Vector2D(self.rotatedPoints[0].x - self.rotatedPoints[3].x,
-                                                   self.rotatedPoints[0].y - self.rotatedPoints[3].y)
-        if 0 <= vector_am * vector_ab < vector_ab * vector_ab and 0 <= vector_am * vector_ad < vector_ad * vector_ad:
-            return True
-        else:
+        if self._dirty:
+            self._refresh()
+        am_x = self._ax - x
+        am_y = self._ay - y
+        am_ab = am_x * self._abx + am_y * self._aby
+        if not 0 <= am_ab < self._ab_ab:
             return False
+        am_ad = am_x * self._adx + am_y * self._ady
+        return 0 <= am_ad < self._ad_ad
 
-    def update(self, **kwargs):
+    def get_edges(self):
+        """
+        :return: Values collide checks points against: x and y of point a, vector from b to a, vector from d to a,
+            and the squared lengths of those vectors
+        """
+        self._refresh()
+        return self._ax, self._ay, self._abx, self._aby, self._adx, self._ady, self._ab_ab, self._ad_ad
 
-        if 'x' in kwargs:
-            self._x = kwargs['x']
-        if 'y' in kwargs:
-            self._y = kwargs['y']
-        if 'width' in kwargs:
-            self._width = kwargs['width']
-        if 'height' in kwargs:
-            self._height = kwargs['height']
+    def update(self, **kwargs):
+        # Only marks the hitbox dirty when something changed, as cards pass their location and angle on every
+        # update even when they have not moved
+        x = kwargs.get('x', self._x)
+        y = kwargs.get('y', self._y)
+        width = kwargs.get('width', self._width)
+        height = kwargs.get('height', self._height)
         if 'degrees' in kwargs:
-            self._angle = math.radians(kwargs['degrees'])
-        elif 'radians' in kwargs:
-            self._angle = kwargs['radians']
+            angle = math.radians(kwargs['degrees'])
+        else:
+            angle = kwargs.get('radians', self._angle)
 
-        self._update_original_points()
-        self._get_rotated_points()
+        if (x, y, width, height, angle) != (self._x, self._y, self._width, self._height, self._angle):
+            self._x = x
+            self._y = y
+            self._width = width
+            self._height = height
+            self._angle = angle
+            self._dirty = True
 
     def _update(self):
         self._update_original_points()
@@ -132,23 +164,42 @@ class SquareHitbox2D(Hitbox2D):
         Hitbox2D._update(self)
 
     def _update_original_points(self):
-        self.original_points[0].x = self.x
-        self.original_points[0].y = self.y
+        self._original_points[0].x = self._x
+        self._original_points[0].y = self._y
 
-        self.original_points[1].x = self.x + self.width
-        self.original_points[1].y = self.y
+        self._original_points[1].x = self._x + self._width
+        self._original_points[1].y = self._y
 
-        self.original_points[2].x = self.x + self.width
-        self.original_points[2].y = self.y + self.height
+        self._original_points[2].x = self._x + self._width
+        self._original_points[2].y = self._y + self._height
 
-        self.original_points[3].x = self.x
-        self.original_points[3].y = self.y + self.height
+        self._original_points[3].x = self._x
+        self._original_points[3].y = self._y + self._height
 
     def _get_rotated_points(self):
         # Use Point 0 as reference for rotating every point
-        x, y = self.original_points[0].x, self.original_points[0].y
-
-        self.rotatedPoints = [point.copy().rotate_counterclockwise(x, y, self._angle) for point in self.original_points]
+        x, y = self._original_points[0].x, self._original_points[0].y
+
+        # Rotating a point changes it in place and returns None, so rotate copies of the original points
+        self._rotated_points = []
+        for point in self._original_points:
+            rotated_point = point.copy()
+            rotated_point.rotate_counterclockwise(x, y, self._angle)
+            self._rotated_points.append(rotated_point)
+
+        point_a, point_b, point_d = self._rotated_points[0], self._rotated_points[1], self._rotated_points[3]
+        self._ax = point_a.x
+        self._ay = point_a.y
+        self._abx = point_a.x - point_b.x
+        self._aby = point_a.y - point_b.y
+        self._adx = point_a.x - point_d.x
+        self._ady = point_a.y - point_d.y
+        self._ab_ab = self._abx * self._abx + self._aby * self._aby
+        self._ad_ad = self._adx * self._adx + self._ady * self._ady
+
+    def _prop_get_rotated_points(self):
+        self._refresh()
+        return self._rotated_points
 
     def _prop_get_topleft(self):
         return
@@ -230,43 +281,45 @@ class SquareHitbox2D(Hitbox2D):
     def _prop_set_size(self, (width, height)):
         self._width = width
         self._height = height
-        self.update()
+        self._dirty = True
 
     def _prop_get_width(self):
         return self._width
     def _prop_set_width(self, width):
         self._width = width
-        self.update()
+        self._dirty = True
 
     def _prop_get_height(self):
         return self._height
     def _prop_set_height(self, height):
         self._height = height
-        self.update()
+        self._dirty = True
 
     def _prop_get_w(self):
         return self._width
     def _prop_set_w(self, w):
         self._width = w
-        self.update()
+        self._dirty = True
 
     def _prop_get_h(self):
         return self._height
     def _prop_set_h(self, h):
         self._height = h
-        self.update()
+        self._dirty = True
 
     def _prop_get_radians(self):
         return self._angle
     def _prop_set_radians(self, angle):
         self._angle = angle
-        self.update()
+        self._dirty = True
 
     def _prop_get_degrees(self):
         return math.degrees(self._angle)
     def _prop_set_degrees(self, degrees):
         self._angle = math.radians(degrees)
-        self.update()
+        self._dirty = True
+
+    rotatedPoints = property(_prop_get_rotated_points)
 
     topleft = property(_prop_get_topleft, _prop_set_topleft)
     topright = property(_prop_get_topright, _prop_set_topright)
@@ -288,3 +341,6 @@ class SquareHitbox2D(Hitbox2D):
     height = property(_prop_get_height, _prop_set_height)
     w = property(_prop_get_w, _prop_set_w)
     h = property(_prop_get_h, _prop_set_h)
+
+    radians = property(_prop_get_radians, _prop_set_radians)
+    degrees = property(_prop_get_degrees, _prop_set_degrees)
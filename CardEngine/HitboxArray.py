@@ -0,0 +1,91 @@
+import numpy
+
+__author__ = 'Evan'
+
+
+'''
+SquareHitbox2Ds checked all at once with NumPy.
+
+The edges of each hitbox (point a of the rotated box, the vectors from b and d to a, and their squared lengths)
+are copied into one array, a row for each value and a column for each hitbox.  Checking a point against every
+hitbox is then a few array operations instead of a call to collide for each hitbox, and many points can be
+checked against every hitbox in the same operations.
+
+Usage:
+    hitboxes = HitboxArray([card_hitbox, other_card_hitbox])
+    inside = hitboxes.collide(100, 120)                    # (N,) bool
+    inside = hitboxes.collide_points([(100, 120), (5, 5)])  # (K, N) bool
+'''
+
+# Rows of the edge array, in the order SquareHitbox2D.get_edges returns them
+_AX, _AY, _ABX, _ABY, _ADX, _ADY, _AB_AB, _AD_AD = range(0, 8)
+
+
+class HitboxArray(object):
+    """
+    Collection of SquareHitbox2Ds that can be checked against points together
+
+    Variables:
+    -hitboxes: Hitboxes in the collection.  Column i of every result is hitboxes[i]
+    """
+    def __init__(self, hitboxes=None):
+        """
+        :param hitboxes: List of SquareHitbox2Ds
+        :return:
+        """
+        self.hitboxes = []
+        self._edges = numpy.zeros((8, 0))
+        if hitboxes:
+            self.hitboxes = list(hitboxes)
+            self.refresh()
+
+    def add(self, hitbox):
+        self.hitboxes.append(hitbox)
+        self._edges = numpy.column_stack((self._edges, hitbox.get_edges()))
+
+    def remove(self, hitbox):
+        i = self.hitboxes.index(hitbox)
+        del self.hitboxes[i]
+        self._edges = numpy.delete(self._edges, i, axis=1)
+
+    def refresh(self, hitbox=None):
+        """
+        Copies the edges of hitboxes again after they have moved, turned or changed size
+        :param hitbox: Hitbox to copy.  Every hitbox is copied if None
+        :return:
+        """
+        if hitbox is None:
+            self._edges = numpy.array([each.get_edges() for each in self.hitboxes], dtype=float).reshape(-1, 8).T
+        else:
+            self._edges[:, self.hitboxes.index(hitbox)] = hitbox.get_edges()
+
+    def collide(self, x, y):
+        """
+        :param x: X coordinate of the point
+        :param y: Y coordinate of the point
+        :return: (N,) bool array, True for each hitbox containing the point
+        """
+        return self._collide(float(x), float(y))
+
+    def collide_points(self, points):
+        """
+        :param points: Sequence or (K, 2) array of (x, y) points
+        :return: (K, N) bool array, True where point k is inside hitbox n
+        """
+        points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+        return self._collide(points[:, 0:1], points[:, 1:2])
+
+    def _collide(self, x, y):
+        # Same check as SquareHitbox2D.collide, broadcast over the hitboxes and the points
+        edges = self._edges
+        am_x = edges[_AX] - x
+        am_y = edges[_AY] - y
+        am_ab = am_x * edges[_ABX] + am_y * edges[_ABY]
+        am_ad = am_x * edges[_ADX] + am_y * edges[_ADY]
+        return (0 <= am_ab) & (am_ab < edges[_AB_AB]) & (0 <= am_ad) & (am_ad < edges[_AD_AD])
+
+    def __contains__(self, hitbox):
+        return hitbox in self.hitboxes
+
+    def __len__(self):
+        return len(self.hitboxes)
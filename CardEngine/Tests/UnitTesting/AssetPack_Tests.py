@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pygame
+from CardEngine import AssetPack
+from CardEngine.Engine import CardEngine
+__author__ = 'Evan'
+
+
+class AssetPackTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        CardEngine.init(200, 200)
+
+        cls.directory = tempfile.mkdtemp()
+        cls.images = []
+        for name, color, size in [('Red', (255, 0, 0, 255), (10, 20)), ('Clear', (0, 0, 255, 100), (7, 3))]:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(color)
+            image_path = os.path.join(cls.directory, name + '.png')
+            pygame.image.save(surface, image_path)
+            cls.images.append((name, image_path))
+
+        cls.file_path = os.path.join(cls.directory, 'test.pak')
+        cls.count = AssetPack.build(cls.file_path, cls.images,
+                                    [('Ace', os.path.join('Res', 'Sound', 'The Ace of Spades.wav'))])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        self.asset_pack = AssetPack.load(self.file_path)
+
+    def tearDown(self):
+        self.asset_pack.close()
+
+    def test_images(self):
+        self.assertEqual(self.count, 3)
+        self.assertEqual(self.asset_pack.names, ['Ace', 'Clear', 'Red'])
+        self.assertIn('Red', self.asset_pack)
+
+        # Nothing is turned into a surface until it is asked for, and then only once
+        self.assertEqual(self.asset_pack.loaded, 0)
+        for name, image_path in self.images:
+            surface = self.asset_pack.get_image(name)
+            image = pygame.image.load(image_path)
+            self.assertEqual(surface.get_size(), image.get_size())
+            self.assertEqual(surface.get_at((1, 1)), image.get_at((1, 1)))
+            self.assertIs(self.asset_pack.get_image(name), surface)
+        self.assertEqual(self.asset_pack.loaded, 2)
+
+        self.assertRaises(KeyError, self.asset_pack.get_image, 'Blue')
+        self.assertRaises(KeyError, self.asset_pack.get_image, 'Ace')
+
+    def test_sounds(self):
+        sound = self.asset_pack.get_sound('Ace')
+        self.assertAlmostEqual(sound.get_length(),
+                               pygame.mixer.Sound(os.path.join('Res', 'Sound', 'The Ace of Spades.wav')).get_length())
+        self.assertIs(self.asset_pack.get_sound('Ace'), sound)
+        self.assertRaises(KeyError, self.asset_pack.get_sound, 'Red')
+
+    def test_file(self):
+        self.assertIsNone(AssetPack.load(os.path.join(self.directory, 'missing.pak')))
+
+        bad_file = os.path.join(self.directory, 'bad.pak')
+        with open(bad_file, 'wb') as pack_file:
+            pack_file.write('not an asset pack')
+        self.assertRaises(ValueError, AssetPack.AssetPack, bad_file)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import unittest
+import pygame
+from CardEngine import Atlas
+from CardEngine import UI
+from CardEngine.Engine import CardEngine
+__author__ = 'Evan'
+
+
+class SpriteAtlasTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        CardEngine.init(200, 200)
+
+    def tearDown(self):
+        CardEngine.remove_all_card_elements()
+
+    def test_atlas(self):
+        red = pygame.Surface((10, 20), pygame.SRCALPHA)
+        red.fill((255, 0, 0, 255))
+        clear = pygame.Surface((5, 5), pygame.SRCALPHA)
+        clear.fill((0, 0, 255, 100))
+        green = pygame.Surface((10, 30))
+        green.fill((0, 255, 0))
+
+        atlas = Atlas.SpriteAtlas([('Red', red), ('Clear', clear), ('Green', green)], columns=2)
+        self.assertEqual(len(atlas), 3)
+        self.assertIn('Green', atlas)
+        self.assertEqual(atlas.surface.get_size(), (15, 50))
+        self.assertEqual(atlas.rects['Green'], pygame.Rect(0, 20, 10, 30))
+
+        # Sprites share the pixels of the atlas, and keep their colors and transparency
+        for name, sprite in [('Red', red), ('Clear', clear), ('Green', green)]:
+            subsurface = atlas.get(name)
+            self.assertIs(subsurface.get_parent(), atlas.surface)
+            self.assertIs(atlas.get(name), subsurface)
+            self.assertEqual(subsurface.get_size(), sprite.get_size())
+            self.assertEqual(subsurface.get_at((1, 1)), sprite.get_at((1, 1)))
+
+        # Space between sprites of different sizes is left transparent
+        self.assertEqual(atlas.surface.get_at((12, 10)).a, 0)
+
+        self.assertRaises(KeyError, atlas.get, 'Blue')
+
+    def test_card_ui(self):
+        # Cards use the atlas surface without copying it
+        atlas = Atlas.SpriteAtlas([('Front', pygame.Surface((20, 30))), ('Back', pygame.Surface((20, 30)))])
+        card = UI.CardUI(front_surface=atlas.get('Front'), back_surface=atlas.get('Back'))
+        other_card = UI.CardUI(front_surface=atlas.get('Front'), back_surface=atlas.get('Back'))
+        card.angle_degrees = 90
+        other_card.angle_degrees = 90
+        self.assertIs(card._get_rotated_image()[0], other_card._get_rotated_image()[0])
+
+if __name__ == '__main__':
+    unittest.main()
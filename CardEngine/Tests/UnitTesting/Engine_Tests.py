@@ -0,0 +1,344 @@
+import os
+import random
+import unittest
+import pygame
+from CardEngine.Engine import CardEngine
+from CardEngine import Base_UI
+from CardEngine import UI
+__author__ = 'Evan'
+
+
+class RenderTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        CardEngine.init(200, 200)
+
+    def setUp(self):
+        CardEngine.remove_all_ui_elements()
+        CardEngine.remove_all_card_elements()
+
+        # Record what is sent to the display instead of updating it
+        self.updates = []
+        self.display_update = pygame.display.update
+        pygame.display.update = lambda rects=None: self.updates.append(rects)
+
+        self.card = UI.CardUI(front_surface=pygame.Surface((20, 30)), back_surface=pygame.Surface((20, 30)),
+                              x=10, y=10)
+        self.card._rect.size = (20, 30)
+        CardEngine.render()
+
+    def tearDown(self):
+        pygame.display.update = self.display_update
+        CardEngine.remove_all_ui_elements()
+        CardEngine.remove_all_card_elements()
+
+    def test_render(self):
+        # First frame draws everything, then nothing is drawn while nothing changes
+        self.assertEqual(self.updates, [None])
+        frames = CardEngine.frames
+        CardEngine.render()
+        self.assertEqual(self.updates, [None])
+        self.assertEqual(CardEngine.frames, frames + 1)
+        self.assertGreater(CardEngine.first_frame_time, 0)
+
+        # Moving the card draws where it was and where it is now
+        self.card.set_location(100, 120)
+        CardEngine.render()
+        self.assertEqual(len(self.updates), 2)
+        self.assertIn(pygame.Rect(10, 10, 20, 30), self.updates[1])
+        self.assertIn(pygame.Rect(100, 120, 20, 30), self.updates[1])
+
+        # Hidden card only draws where it was
+        self.card.visible = False
+        self.assertIsNone(self.card.drawn_rect)
+        CardEngine.render()
+        self.assertEqual(self.updates[2], [pygame.Rect(100, 120, 20, 30)])
+
+        self.card.visible = True
+        self.card.front_view = False
+        CardEngine.render()
+        self.assertEqual(self.updates[3], [pygame.Rect(100, 120, 20, 30)])
+
+    def test_rotated_card(self):
+        # Box around the card grows to fit the turned card
+        self.card.angle_degrees = 90
+        self.assertEqual(self.card.drawn_rect.size, (30, 20))
+        CardEngine.render()
+        self.assertIn(pygame.Rect(10, 10, 20, 30), self.updates[1])
+
+        # Card is drawn at the same place the hitbox is
+        surface = pygame.Surface((200, 200), pygame.SRCALPHA)
+        self.card.render(surface)
+        self.assertTrue(self.card.drawn_rect.contains(surface.get_bounding_rect(min_alpha=1)))
+
+    def test_merge(self):
+        # Rects inside other rects are not drawn twice, and whole screen is drawn after elements are removed
+        text = UI.Text(pygame.Rect(50, 50, 100, 40), text='Text')
+        CardEngine.render()
+        text.text = 'Other'
+        CardEngine.mark_dirty(pygame.Rect(60, 60, 10, 10))
+        CardEngine.render()
+        self.assertEqual(self.updates[2], [pygame.Rect(50, 50, 100, 40)])
+
+        CardEngine.remove_all_ui_elements()
+        CardEngine.render()
+        self.assertIsNone(self.updates[3])
+
+class DisplayListTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        CardEngine.init(200, 200)
+
+    def tearDown(self):
+        CardEngine.remove_all_ui_elements()
+        CardEngine.remove_all_card_elements()
+
+    def assertInOrder(self, elements, z_list):
+        self.assertEqual([element.z for element in elements], z_list)
+        self.assertEqual(sorted(z_list), z_list)
+
+    def test_order(self):
+        rng = random.Random(1)
+        cards = [UI.CardUI(z=rng.randint(0, 5)) for i in range(0, 30)]
+        self.assertEqual(len(CardEngine.CardElements), 30)
+        self.assertInOrder(CardEngine.CardElements, CardEngine._card_z)
+
+        # Cards with the same z stay in the order they were added
+        for z in range(0, 6):
+            self.assertEqual([card for card in CardEngine.CardElements if card.z == z],
+                             [card for card in cards if card.z == z])
+
+        # Every way of changing z moves the card
+        for i in range(0, 100):
+            card = rng.choice(cards)
+            choice = rng.randint(0, 2)
+            if choice == 0:
+                card.z = rng.random() * 5
+            elif choice == 1:
+                card.move(1, 1, rng.randint(-2, 2))
+            else:
+                card.set_location(10, 10, rng.randint(0, 5))
+            self.assertInOrder(CardEngine.CardElements, CardEngine._card_z)
+        self.assertEqual(sorted(CardEngine.CardElements), sorted(cards))
+
+        # Changed z is placed after cards already at that z
+        cards[0].z = 10
+        cards[1].z = 10
+        self.assertEqual(CardEngine.CardElements[-2:], [cards[0], cards[1]])
+
+    def test_add_remove(self):
+        text = UI.Text(z=2)
+        other_text = UI.Text(z=1)
+        card = UI.CardUI(z=3)
+        self.assertEqual(CardEngine.UIElements, [other_text, text])
+        self.assertEqual(CardEngine.CardElements, [card])
+
+        # Adding twice does nothing, and cards can be removed
+        CardEngine.add_ui_element(text)
+        CardEngine.add_card_element(card)
+        self.assertEqual(len(CardEngine.UIElements) + len(CardEngine.CardElements), 3)
+
+        CardEngine.remove_card_element(card)
+        CardEngine.remove_ui_element(other_text)
+        self.assertEqual(CardEngine.CardElements, [])
+        self.assertEqual(CardEngine.UIElements, [text])
+        self.assertEqual(CardEngine._ui_z, [2])
+
+        # Elements that are not in the engine are left alone when their z changes
+        card.z = 0
+        self.assertEqual(CardEngine.CardElements, [])
+
+class CardGridTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        CardEngine.init(800, 800)
+
+    def setUp(self):
+        self.events = []
+        self.collisions = 0
+
+    def tearDown(self):
+        CardEngine.remove_all_card_elements()
+
+    def create_card(self, x, y, z, angle=0):
+        card = UI.CardUI(front_surface=pygame.Surface((75, 105)), x=x, y=y, z=z, angle_degrees=angle)
+        card.angle_degrees = angle
+
+        # Record the cards handling events and the collision checks
+        card.handle_event = lambda event: self.events.append(card)
+        collide = card.collide
+
+        def count_collide(x, y):
+            self.collisions += 1
+            return collide(x, y)
+        card.collide = count_collide
+        return card
+
+    def click(self, x, y):
+        CardEngine._handle_card_click(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=1))
+
+    def test_pick(self):
+        # Hand of overlapping cards, with the last card on top
+        cards = [self.create_card(200 + 25 * i, 600, i * .1) for i in range(0, 13)]
+        far_card = self.create_card(600, 100, 0, 90)
+
+        self.click(210, 650)
+        self.click(260, 650)
+        self.click(550, 650)
+        self.click(650, 60)
+        self.assertEqual(self.events, [cards[0], cards[2], cards[12], far_card])
+
+        # Nothing under the mouse, and only the few cards near the mouse are checked
+        self.click(100, 100)
+        self.assertEqual(len(self.events), 4)
+        self.assertLessEqual(self.collisions, 4 * 4)
+
+    def test_update(self):
+        card = self.create_card(100, 100, 0)
+        other_card = self.create_card(120, 100, 1)
+
+        # Moving, turning, raising and hiding cards changes which card is picked
+        other_card.move(300, 0)
+        self.click(130, 150)
+        other_card.move(-300, 0)
+        card.z = 2
+        self.click(130, 150)
+        card.visible = False
+        self.click(130, 150)
+        card.visible = True
+        card.angle_degrees = 90
+        self.click(110, 90)
+        self.assertEqual(self.events, [card, card, other_card, card])
+
+        # Removed cards are not picked
+        CardEngine.remove_card_element(card)
+        self.click(110, 90)
+        self.assertEqual(len(self.events), 4)
+        self.assertEqual(CardEngine._card_cells.keys(), [other_card])
+
+    def test_pick_cards(self):
+        # Picking many points at once finds the same cards as clicking each point
+        rng = random.Random(4)
+        for i in range(0, 20):
+            self.create_card(rng.randint(0, 700), rng.randint(0, 700), rng.random(), rng.choice([0, 90, 33]))
+        CardEngine.CardElements[0].visible = False
+        points = [(rng.randint(0, 799), rng.randint(0, 799)) for i in range(0, 300)]
+
+        picked = CardEngine.pick_cards(points)
+        self.assertEqual(len(picked), len(points))
+        for (x, y), card in zip(points, picked):
+            del self.events[:]
+            self.click(x, y)
+            self.assertEqual(self.events, [card] if card is not None else [])
+        self.assertEqual(CardEngine.pick_cards([]), [])
+
+class DeckTests(unittest.TestCase):
+    def test_shuffle(self):
+        deck = range(0, 52)
+
+        # Copy is shuffled and the deck is left alone, the same way for the same seed
+        shuffled = CardEngine.shuffle(deck, random.Random(7))
+        self.assertEqual(deck, range(0, 52))
+        self.assertEqual(sorted(shuffled), deck)
+        self.assertNotEqual(shuffled, deck)
+        self.assertEqual(CardEngine.shuffle(deck, random.Random(7)), shuffled)
+
+        in_place = list(deck)
+        self.assertIs(CardEngine.shuffle_in_place(in_place, random.Random(7)), in_place)
+        self.assertEqual(in_place, shuffled)
+        self.assertEqual(CardEngine.shuffle_in_place([]), [])
+
+        # Every card ends up in the first place about as often
+        counts = [0] * 4
+        rng = random.Random(1)
+        for i in range(0, 4000):
+            counts[CardEngine.shuffle([0, 1, 2, 3], rng)[0]] += 1
+        self.assertTrue(all(900 < count < 1100 for count in counts))
+
+    def test_generate_deals(self):
+        deck = range(0, 52)
+        deals = CardEngine.generate_deals(deck, random.Random(3))
+        rng = random.Random(3)
+        for i in range(0, 5):
+            self.assertEqual(next(deals), CardEngine.shuffle(deck, rng))
+        self.assertEqual(len(list(CardEngine.generate_deals(deck, number_of_deals=3))), 3)
+
+class RecordUI(Base_UI.UIElement):
+    def __init__(self, events, rect=None, z=0, event_types=None):
+        self.events = events
+        self.event_types = event_types
+        Base_UI.UIElement.__init__(self, rect, z)
+
+    def render(self, surface):
+        return
+
+    def _update(self):
+        self.mark_dirty()
+
+    def handle_event(self, event):
+        self.events.append((self, event.type))
+
+
+class DispatchTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        CardEngine.init(200, 200)
+
+    def setUp(self):
+        self.events = []
+
+    def tearDown(self):
+        CardEngine.remove_all_ui_elements()
+
+    def test_event_types(self):
+        every_type = RecordUI(self.events, z=2)
+        mouse = RecordUI(self.events, z=1, event_types=(pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN))
+        key = RecordUI(self.events, z=3, event_types=(pygame.KEYDOWN,))
+
+        motion = pygame.event.Event(pygame.MOUSEMOTION, pos=(5, 5), rel=(0, 0), buttons=(0, 0, 0))
+        CardEngine._dispatch_event(motion)
+        CardEngine._dispatch_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, unicode='a'))
+        self.assertEqual(self.events, [(mouse, pygame.MOUSEMOTION), (every_type, pygame.MOUSEMOTION),
+                                       (every_type, pygame.KEYDOWN), (key, pygame.KEYDOWN)])
+
+        # Hidden elements get nothing, and elements are in order after z changes
+        del self.events[:]
+        every_type.visible = False
+        mouse.z = 5
+        CardEngine._dispatch_event(motion)
+        self.assertEqual(self.events, [(mouse, pygame.MOUSEMOTION)])
+
+        every_type.visible = True
+        CardEngine.remove_ui_element(mouse)
+        CardEngine._dispatch_event(motion)
+        self.assertEqual(self.events[1:], [(every_type, pygame.MOUSEMOTION)])
+
+    def test_region(self):
+        clicks = []
+        button = UI.Button(pygame.Rect(50, 50, 40, 20), callback_function=clicks.append)
+        UI.Text(pygame.Rect(0, 0, 100, 20), text='Hidden').visible = False
+        handled = []
+        handle_event = button.handle_event
+        button.handle_event = lambda event: (handled.append(event.type), handle_event(event))
+
+        # Mouse moving away from the button is skipped until the mouse enters it, then followed until it leaves
+        for x, y in [(10, 10), (20, 20), (60, 60), (120, 120), (130, 130)]:
+            CardEngine._dispatch_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(0, 0),
+                                                          buttons=(0, 0, 0)))
+        self.assertEqual(len(handled), 2)
+
+        # Pressing the button follows the mouse until it is let go
+        CardEngine._dispatch_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(60, 60), button=1))
+        CardEngine._dispatch_event(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(60, 60), button=1))
+        self.assertEqual(clicks, [button])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import random
+import unittest
+from CardEngine.Hitbox import SquareHitbox2D
+from CardEngine.HitboxArray import HitboxArray
+__author__ = 'Evan'
+
+
+class HitboxArrayTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(2)
+        self.hitboxes = [SquareHitbox2D(rng.randint(0, 300), rng.randint(0, 300), 75, 105,
+                                        rng.choice([0, 90, 180, 270, 45])) for i in range(0, 30)]
+        self.points = [(rng.uniform(-50, 450), rng.uniform(-50, 450)) for i in range(0, 200)]
+
+    def assertMatchesCollide(self, hitbox_array):
+        inside = hitbox_array.collide_points(self.points)
+        self.assertEqual(inside.shape, (len(self.points), len(hitbox_array)))
+        for k, (x, y) in enumerate(self.points):
+            expected = [hitbox.collide(x, y) for hitbox in hitbox_array.hitboxes]
+            self.assertEqual(list(inside[k]), expected)
+            self.assertEqual(list(hitbox_array.collide(x, y)), expected)
+
+    def test_collide(self):
+        self.assertMatchesCollide(HitboxArray(self.hitboxes))
+
+    def test_change(self):
+        hitbox_array = HitboxArray()
+        self.assertEqual(hitbox_array.collide_points([(1, 1)]).shape, (1, 0))
+        for hitbox in self.hitboxes:
+            hitbox_array.add(hitbox)
+        hitbox_array.remove(self.hitboxes[3])
+        self.assertNotIn(self.hitboxes[3], hitbox_array)
+        self.assertMatchesCollide(hitbox_array)
+
+        # Moved hitboxes are checked where they are after a refresh
+        self.hitboxes[0].update(x=200, y=10, degrees=90)
+        hitbox_array.refresh(self.hitboxes[0])
+        self.hitboxes[5].update(x=0, y=0)
+        self.hitboxes[6].update(degrees=30)
+        hitbox_array.refresh()
+        self.assertMatchesCollide(hitbox_array)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
+import random
 import unittest
 import CardEngine.Hitbox
 from CardEngine.VectorMath import Point2D
 from CardEngine.VectorMath import Triangle2D
+from CardEngine.VectorMath import Vector2D
 __author__ = 'Evan'
 
 
@@ -77,7 +79,98 @@ class HitboxTests(unittest.TestCase):
 class SquareHitbox(unittest.TestCase):
 
     def test_SquareHitbox(self):
-        return
+        hitbox = CardEngine.Hitbox.SquareHitbox2D(10, 20, 75, 105, 0)
+        self.assertTrue(hitbox.collide(10, 20))
+        self.assertTrue(hitbox.collide(84, 124))
+        self.assertFalse(hitbox.collide(85, 20))
+        self.assertFalse(hitbox.collide(10, 19))
+
+        # Turned a quarter counter-clockwise about the top left corner
+        hitbox.update(degrees=90)
+        self.assertTrue(hitbox.collide(50, 15))
+        self.assertFalse(hitbox.collide(50, 25))
+
+    def test_collide_rotated(self):
+        # Matches checking the point against vectors built from the rotated corners
+        rng = random.Random(3)
+        hitbox = CardEngine.Hitbox.SquareHitbox2D(0, 0, 75, 105, 0)
+        for i in range(0, 500):
+            hitbox.update(x=rng.randint(0, 200), y=rng.randint(0, 200), degrees=rng.choice([0, 90, 180, 270, 33]))
+            x, y = rng.uniform(-100, 400), rng.uniform(-100, 400)
+
+            point_a, point_b, point_d = hitbox.rotatedPoints[0], hitbox.rotatedPoints[1], hitbox.rotatedPoints[3]
+            vector_am = Vector2D(point_a.x - x, point_a.y - y)
+            vector_ab = Vector2D(point_a.x - point_b.x, point_a.y - point_b.y)
+            vector_ad = Vector2D(point_a.x - point_d.x, point_a.y - point_d.y)
+            expected = 0 <= vector_am * vector_ab < vector_ab * vector_ab and \
+                0 <= vector_am * vector_ad < vector_ad * vector_ad
+            self.assertEqual(hitbox.collide(x, y), expected)
+
+    def test_lazy(self):
+        # Points are only worked out again when the hitbox is used after it changed
+        updates = []
+        update = CardEngine.Hitbox.SquareHitbox2D._update
+        CardEngine.Hitbox.SquareHitbox2D._update = lambda hitbox: (updates.append(hitbox), update(hitbox))
+        try:
+            hitbox = CardEngine.Hitbox.SquareHitbox2D(0, 0, 10, 10, 0)
+            for i in range(0, 20):
+                hitbox.update(x=i, y=i, degrees=90)
+                hitbox.x = 5
+                hitbox.y = 0
+                hitbox.width = 20
+            self.assertEqual(updates, [])
+
+            self.assertTrue(hitbox.collide(10, -15))
+            self.assertFalse(hitbox.collide(10, 15))
+            self.assertAlmostEqual(hitbox.rotatedPoints[2].x, 15)
+            self.assertAlmostEqual(hitbox.rotatedPoints[2].y, -20)
+            self.assertEqual(len(updates), 1)
+        finally:
+            CardEngine.Hitbox.SquareHitbox2D._update = update
+
+    def test_update_unchanged(self):
+        # Passing the values the hitbox already has does not work out its points again
+        hitbox = CardEngine.Hitbox.SquareHitbox2D(10, 20, 75, 105, 90)
+        hitbox.collide(0, 0)
+        hitbox.update(x=10, y=20, width=75, height=105, degrees=90)
+        self.assertFalse(hitbox._dirty)
+
+        hitbox.update(x=11, y=20, degrees=90)
+        self.assertTrue(hitbox._dirty)
+        hitbox.collide(0, 0)
+        hitbox.update(radians=0)
+        self.assertTrue(hitbox._dirty)
+
+    def test_setters(self):
+        # Changing only the size or angle works out the points again
+        hitbox = CardEngine.Hitbox.SquareHitbox2D(0, 0, 10, 10, 0)
+        self.assertFalse(hitbox.collide(15, 5))
+        hitbox.width = 20
+        self.assertTrue(hitbox.collide(15, 5))
+        self.assertAlmostEqual(hitbox.rotatedPoints[1].x, 20)
+
+        hitbox.height = 30
+        self.assertTrue(hitbox.collide(15, 25))
+        hitbox.size = (10, 10)
+        self.assertFalse(hitbox.collide(15, 5))
+
+        # Turned a quarter counter-clockwise about the top left corner
+        hitbox.degrees = 90
+        self.assertTrue(hitbox.collide(5, -5))
+        self.assertFalse(hitbox.collide(5, 5))
+        hitbox.radians = 0
+        self.assertTrue(hitbox.collide(5, 5))
+        self.assertFalse(hitbox.collide(5, -5))
+
+    def test_triangle(self):
+        triangle = Triangle2D((0, 0), (10, 0), (0, 10))
+        self.assertTrue(triangle.collide_xy(2, 2))
+        self.assertFalse(triangle.collide_xy(8, 8))
+        self.assertEqual(triangle.collidepoint(Point2D(2, 2)), triangle.collide_xy(2, 2))
+
+        hitbox = CardEngine.Hitbox.Hitbox2D([Point2D(0, 0), Point2D(10, 0), Point2D(10, 10), Point2D(0, 10)])
+        self.assertTrue(hitbox.collidepoint(8, 8))
+        self.assertFalse(hitbox.collidepoint(11, 8))
 
 if __name__ == '__main__':
     unittest.main()
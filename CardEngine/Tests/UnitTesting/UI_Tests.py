@@ -0,0 +1,105 @@
+import os
+import unittest
+import pygame
+from CardEngine import Hitbox
+from CardEngine import UI
+from CardEngine.Engine import CardEngine
+__author__ = 'Evan'
+
+
+class CardUITests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        CardEngine.init(200, 200)
+
+    def setUp(self):
+        UI.clear_rotated_sprites()
+
+        # Count the rotations done while rendering
+        self.rotations = 0
+        self.rotate = pygame.transform.rotate
+
+        def rotate(surface, angle):
+            self.rotations += 1
+            return self.rotate(surface, angle)
+        pygame.transform.rotate = rotate
+
+    def tearDown(self):
+        pygame.transform.rotate = self.rotate
+        CardEngine.remove_all_card_elements()
+
+    def test_rotated_sprite(self):
+        surface = pygame.Surface((20, 30))
+        rotated_surface, offset = UI.get_rotated_sprite(surface, 90)
+        self.assertEqual(rotated_surface.get_size(), (30, 20))
+        self.assertEqual(offset, (0, -20))
+        self.assertEqual(UI.get_rotated_sprite(surface, 180)[1], (-20, -30))
+
+        # Same surface and angle is only rotated once
+        self.assertIs(UI.get_rotated_sprite(surface, 90)[0], rotated_surface)
+        self.assertEqual(self.rotations, 2)
+
+    def test_render(self):
+        target = pygame.Surface((200, 200))
+        card = UI.CardUI(front_surface=pygame.Surface((20, 30)), back_surface=pygame.Surface((20, 30)),
+                         x=50, y=50, angle_degrees=270)
+        for i in range(0, 10):
+            card.render(target)
+            card.move(1, 0)
+        self.assertEqual(self.rotations, 1)
+
+        # Turning the card or showing the other side rotates once for each change
+        card.angle_degrees = 90
+        card.front_view = False
+        for i in range(0, 10):
+            card.render(target)
+        self.assertEqual(self.rotations, 3)
+
+        # Side and angle already rotated are taken from the cache
+        card.front_view = True
+        self.assertEqual(self.rotations, 3)
+
+    def test_handle_event(self):
+        # Mouse events over a card that has not moved do not work out its hitbox again
+        card = UI.CardUI(front_surface=pygame.Surface((20, 30)), back_surface=pygame.Surface((20, 30)),
+                         x=50, y=50, angle_degrees=90)
+        card.collide(0, 0)
+
+        updates = []
+        update = Hitbox.SquareHitbox2D._update
+        Hitbox.SquareHitbox2D._update = lambda hitbox: (updates.append(hitbox), update(hitbox))
+        try:
+            for i in range(0, 10):
+                card.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(60, 40), rel=(0, 0), buttons=(0, 0, 0)))
+                card.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(60, 40), button=1))
+                card.handle_event(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(60, 40), button=1))
+            self.assertEqual(updates, [])
+
+            # Moving the card moves its hitbox
+            card.move(100, 0)
+            self.assertTrue(card.collide(160, 40))
+            self.assertFalse(card.collide(60, 40))
+            self.assertEqual(len(updates), 1)
+        finally:
+            Hitbox.SquareHitbox2D._update = update
+
+    def test_cached_edges(self):
+        # Edges worked out for the hitbox are used again by every collide until the card moves
+        card = UI.CardUI(front_surface=pygame.Surface((20, 30)), back_surface=pygame.Surface((20, 30)),
+                         x=50, y=50)
+        edges = card.hitbox.get_edges()
+        rotated_points = card.hitbox.rotatedPoints
+        for i in range(0, 10):
+            card.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(50 + i, 55), rel=(1, 0), buttons=(0, 0, 0)))
+            self.assertTrue(card.collide(50 + i, 55))
+        for edge, cached_edge in zip(edges, card.hitbox.get_edges()):
+            self.assertIs(edge, cached_edge)
+        self.assertIs(card.hitbox.rotatedPoints, rotated_points)
+
+        card.move(0, 1)
+        self.assertIsNot(card.hitbox.rotatedPoints, rotated_points)
+
+if __name__ == '__main__':
+    unittest.main()
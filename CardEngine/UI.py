@@ -1,3 +1,4 @@
+import os
 import pygame
 from CardEngine import Hitbox
 from CardEngine import Base_UI
@@ -14,18 +15,65 @@ WHITE = (255, 255, 255, 255)
 TRANSPARENT = (255, 255, 255, 0)
 GREEN = (24, 119, 24, 255)
 
+# Rotated card images shared by every card, keyed by the surface and the angle
+_rotated_sprites = {}
+
 
 def init():
     """
-    Initializes the Font used in the text
+    Initializes the font module.  Font used in the text is loaded by get_ui_font the first time it is needed,
+    as finding a system font is slow and a game may not show any text
     :return:
     """
     pygame.font.init()
+
+
+def get_ui_font():
+    """
+    :return: Font used by UI Elements that are not given a font
+    """
     global UI_FONT
-    UI_FONT = pygame.font.Font(pygame.font.match_font('gentiumbookbasic'), 20)
+    if UI_FONT is None:
+        font_path = pygame.font.match_font('gentiumbookbasic')
+
+        # Without the font, pygame's default font is used.  It is looked up here, as pygame finds it through
+        # pkg_resources, which is slow to import
+        if font_path is None:
+            font_path = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+            if not os.path.exists(font_path):
+                font_path = None
+        UI_FONT = pygame.font.Font(font_path, 20)
+    return UI_FONT
+
+
+def get_rotated_sprite(surface, angle):
+    """
+    Rotates a surface counterclockwise, reusing the rotated surface if it was rotated by the angle before
+    :param surface: Pygame Surface
+    :param angle: Degrees
+    :return: Rotated surface, and the offset from the top left corner of the surface to the top left of the
+             rotated surface
+    """
+    key = (surface, angle)
+    rotated_sprite = _rotated_sprites.get(key, None)
+    if rotated_sprite is None:
+        # Offset is where the rotated hitbox of the surface starts, as point 0 stays where the card is placed
+        hitbox = Hitbox.SquareHitbox2D(0, 0, surface.get_width(), surface.get_height(), angle)
+        dx = min(point.x for point in hitbox.rotatedPoints)
+        dy = min(point.y for point in hitbox.rotatedPoints)
+
+        rotated_sprite = (pygame.transform.rotate(surface, angle), (int(round(dx)), int(round(dy))))
+        _rotated_sprites[key] = rotated_sprite
+    return rotated_sprite
+
+
+def clear_rotated_sprites():
+    _rotated_sprites.clear()
 
 
 class CardUI(Base_UI.UIElement):
+    event_types = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN)
+
     def __init__(self, card=None, front_surface=None, back_surface=None, rect=None, x=0, y=0, z=0,
                  angle_degrees=0, callback_function=None):
 
@@ -50,17 +98,17 @@ class CardUI(Base_UI.UIElement):
             self._rect = rect
             self._rect.topleft = (x, y)
 
-        # Setup front of card
+        # Setup front of card.  Surfaces are shared with other cards, such as the subsurfaces of a sprite atlas
         if front_surface is None:
             self._frontSurface = pygame.Surface(self._rect.size)
         else:
-            self._frontSurface = front_surface.copy()
+            self._frontSurface = front_surface
 
         # Setup back of card
         if back_surface is None:
             self._backSurface = pygame.Surface(self._rect.size)
         else:
-            self._backSurface = back_surface.copy()
+            self._backSurface = back_surface
 
         # Create hitbox for the card
         x = self._rect.x  # Syntactic sugar
@@ -83,34 +131,35 @@ class CardUI(Base_UI.UIElement):
         # Set callback function.
         self._callbackFunction = callback_function
 
-    # Used to render an image to the screen.
-    def render(self, surface):
-        # As card may be rotated, the x and y positions do not correlate to the top left corner of the card.
-        dx = 0
-        dy = 0
+        # Rotated image for the side of the card showing, found again only when the angle or side changes
+        self._rotatedImage = None
+        self._rotatedOffset = (0, 0)
 
-        x = self._hitbox.rotatedPoints[0].x
-        y = self._hitbox.rotatedPoints[0].y
-
-        # Point 0 is reference used for hitbox, so need to offset the display to match the hitbox
-        for point in self._hitbox.rotatedPoints:
-            if (point.x - x) < dx:
-                dx = point.x - x
-            if (point.y - y) < dy:
-                dy = point.y - y
+        self.mark_dirty()
 
+    # Used to render an image to the screen.
+    def render(self, surface):
         # Display front or back of the card
         if self._visible:
+            rotated_image, (dx, dy) = self._get_rotated_image()
+            surface.blit(rotated_image, (self._rect.x + dx, self._rect.y + dy))
+
+    def _get_rotated_image(self):
+        # As card may be rotated, the x and y positions do not correlate to the top left corner of the card.
+        if self._rotatedImage is None:
             if self._frontView:
-                rotated_image = pygame.transform.rotate(self._frontSurface, self._angle)
+                self._rotatedImage, self._rotatedOffset = get_rotated_sprite(self._frontSurface, self._angle)
             else:
-                rotated_image = pygame.transform.rotate(self._backSurface, self._angle)
+                self._rotatedImage, self._rotatedOffset = get_rotated_sprite(self._backSurface, self._angle)
+        return self._rotatedImage, self._rotatedOffset
 
-            surface.blit(rotated_image, (self._rect.x + dx, self._rect.y + dy))
+    def get_draw_rect(self):
+        rotated_image, (dx, dy) = self._get_rotated_image()
+        return pygame.Rect((self._rect.x + dx, self._rect.y + dy), rotated_image.get_size())
 
     # Used to update the internal state of the UI Element.
     def _update(self):
-        self._hitbox.update(x=self._rect.x, y=self._rect.y, angle=self._angle)
+        self._hitbox.update(x=self._rect.x, y=self._rect.y, degrees=self._angle)
         return
 
     def collide(self, x, y):
@@ -159,8 +208,6 @@ class CardUI(Base_UI.UIElement):
                 if self._callbackFunction is not None:
                     self._callbackFunction(self)
 
-        self._update()
-
     def play_sound(self):
         if self._sound is not None:
             if (pygame.time.get_ticks() - self._start_time) > (self._sound.get_length() * 1000):
@@ -179,19 +226,25 @@ class CardUI(Base_UI.UIElement):
 
     def _prop_set_front_view(self, front_view):
         self._frontView = front_view
+        self._rotatedImage = None
         self._update()
+        self.mark_dirty()
     def _prop_get_front_view(self):
         return self._frontView
 
     def _prop_set_angle_radians(self, angle_radians):
         self._angle = angle_radians * 180 / 3.1415926
+        self._rotatedImage = None
         self._update()
+        self.mark_dirty()
     def _prop_get_angle_radians(self):
         return self._angle * 3.1415926 / 180
 
     def _prop_set_angle_degrees(self, angle_degrees):
         self._angle = angle_degrees
+        self._rotatedImage = None
         self._update()
+        self.mark_dirty()
     def _prop_get_angle_degrees(self):
         return self._angle
 
@@ -200,11 +253,15 @@ class CardUI(Base_UI.UIElement):
     def _prop_set_sound(self, sound):
         self._sound = sound
 
+    def _prop_get_hitbox(self):
+        return self._hitbox
+
     callbackFunction = property(_prop_get_callback_function, _prop_set_callback_function)
     front_view = property(_prop_get_front_view, _prop_set_front_view)
     angle_radians = property(_prop_get_angle_radians, _prop_set_angle_radians)
     angle_degrees = property(_prop_get_angle_degrees, _prop_set_angle_degrees)
     sound = property(_prop_get_sound, _prop_set_sound)
+    hitbox = property(_prop_get_hitbox)
 # The following classes are used as a base for common UI Elements.  The first way to handle UI Elements is to
 # use a callback function, which will be triggered internally in reaction to pygame events.  The second way is to
 # use inheritance to override several methods in the UI Element class.  These methods are called in the handle_event
@@ -222,6 +279,9 @@ class CardUI(Base_UI.UIElement):
 
 
 class _BaseText(Base_UI.UIElement):
+    # Text does not handle any events
+    event_types = ()
+
     def __init__(self, rect=None, z=0, text='',
                  background_color=TRANSPARENT, text_color=BLACK, font=None):
 
@@ -237,7 +297,7 @@ class _BaseText(Base_UI.UIElement):
             self._text = text
 
         if font is None:
-            self._font = UI_FONT
+            self._font = get_ui_font()
         else:
             self._font = font
 
@@ -263,6 +323,7 @@ class _BaseText(Base_UI.UIElement):
         text_rect = text_surf.get_rect()
         text_rect.center = int(w / 2), int(h / 2)
         self._surfaceNormal.blit(text_surf, text_rect)
+        self.mark_dirty()
 
     def handle_event(self, event):
         return
@@ -324,7 +385,7 @@ class _BaseTextBox(Base_UI.UIElement):
 
         # If no font is given, use gentium book, font size 12
         if font is None:
-            self._font = UI_FONT
+            self._font = get_ui_font()
         else:
             self._font = font
 
@@ -391,6 +452,7 @@ class _BaseTextBox(Base_UI.UIElement):
         pygame.draw.line(self._surfaceInput, DARKGRAY, (w - 1, 1), (w - 1, h - 1))
         pygame.draw.line(self._surfaceNormal, GRAY, (1, h - 2), (w - 2, h - 2))
         pygame.draw.line(self._surfaceNormal, GRAY, (w - 2, 1), (w - 2, h - 2))
+        self.mark_dirty()
 
     def _prop_get_background_text(self):
         return self._bgText
@@ -482,6 +544,7 @@ class _BaseCheckBox(Base_UI.UIElement):
         pygame.draw.rect(self._surfaceChecked, BLACK, pygame.Rect((1, 1, w - 2, h - 2)), 1)
         pygame.draw.line(self._surfaceChecked, GREEN, (3, int(h / 2)), (int(w / 2), h - 5), 3)
         pygame.draw.line(self._surfaceChecked, GREEN, (int(w / 2), h - 5), (w - 5, 4), 3)
+        self.mark_dirty()
 
     def _prop_get_background_color(self):
         return self._bgColor
@@ -512,7 +575,7 @@ class _BaseButton(Base_UI.UIElement):
 
         # set font for text
         if font is None:
-            self._font = UI_FONT
+            self._font = get_ui_font()
         else:
             self._font = font
 
@@ -580,6 +643,7 @@ class _BaseButton(Base_UI.UIElement):
 
         # draw border for highlight button
         self._surfaceHighlight = self._surfaceNormal
+        self.mark_dirty()
 
     def _prop_get_background_color(self):
         return self._bgColor
@@ -621,6 +685,8 @@ class Text(_BaseText):
 
 
 class TextBox(_BaseTextBox):
+    event_types = (pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN, pygame.KEYUP, pygame.KEYDOWN)
+
     def __init__(self, rect=None, z=0, background_text=None, background_color=WHITE,
                  input_text_color=BLACK, background_text_color=LIGHTGRAY,
                  font=None, callback_function=None):
@@ -673,6 +739,12 @@ class TextBox(_BaseTextBox):
 
         self._update()
 
+    def get_event_region(self):
+        # Mouse events outside the textbox only matter while it is selected or being clicked
+        if self._isSelected or self._lastMouseDownOverTextBox:
+            return None
+        return self._rect
+
     def _prop_get_callback_function(self):
         return self._callbackFunction
     def _prop_set_callback_function(self, new_callback_function):
@@ -683,6 +755,8 @@ class TextBox(_BaseTextBox):
 
 
 class CheckBox(_BaseCheckBox):
+    event_types = (pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN)
+
     def __init__(self, rect=None, z=0, background_color=WHITE, callback_function=None):
 
         # Let base handle most of initialization.  Base class should call _update.
@@ -715,6 +789,12 @@ class CheckBox(_BaseCheckBox):
 
         self._update()
 
+    def get_event_region(self):
+        # Mouse events outside the checkbox only matter while it is being clicked
+        if self._lastMouseDownOverCheckBox:
+            return None
+        return self._rect
+
     def _prop_get_callback_function(self):
         return self._callbackFunction
     def _prop_set_callback_function(self, new_callback_function):
@@ -725,6 +805,8 @@ class CheckBox(_BaseCheckBox):
 
 
 class Button(_BaseButton):
+    event_types = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN)
+
     def __init__(self, rect=None, z=0, text='',
                  background_color=LIGHTGRAY, foreground_color=BLACK, font=None,
                  callback_function=None):
@@ -775,6 +857,12 @@ class Button(_BaseButton):
 
         self._update()
 
+    def get_event_region(self):
+        # Mouse events outside the button only matter while the mouse is over it or it is being clicked
+        if self._mouseOverButton or self._buttonDown or self._lastMouseDownOverButton:
+            return None
+        return self._rect
+
     def _prop_get_callback_function(self):
         return self._callbackFunction
     def _prop_set_callback_function(self, new_callback_function):
@@ -798,6 +886,8 @@ class Button(_BaseButton):
 
 
 class PyText(_BaseText):
+    event_types = (pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.KEYUP, pygame.KEYDOWN)
+
     def __init__(self, rect=None, z=0, text='',
                  background_color=TRANSPARENT, text_color=BLACK, font=None):
         # Let base handle most of initialization.  Base class should call _update.
@@ -888,6 +978,8 @@ class PyText(_BaseText):
 
 
 class PyTextBox(_BaseTextBox):
+    event_types = (pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.KEYUP, pygame.KEYDOWN)
+
     def __init__(self, rect=None, z=0, background_text=None, background_color=WHITE,
                  input_text_color=BLACK, background_text_color=LIGHTGRAY, font=None):
 
@@ -977,6 +1069,8 @@ class PyTextBox(_BaseTextBox):
 
 
 class PyCheckBox(_BaseCheckBox):
+    event_types = (pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.KEYUP, pygame.KEYDOWN)
+
     def __init__(self, rect=None, z=0, background_color=WHITE):
 
         # Let base handle most of initialization.  Base class should call _update.
@@ -1066,6 +1160,8 @@ class PyCheckBox(_BaseCheckBox):
 
 
 class PyButton(_BaseButton):
+    event_types = (pygame.MOUSEBUTTONUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.KEYUP, pygame.KEYDOWN)
+
     def __init__(self, rect=None, z=0, text='',
                  background_color=LIGHTGRAY, foreground_color=BLACK, font=None):
 
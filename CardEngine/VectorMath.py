@@ -8,6 +8,8 @@ class Point2D(object):
     This class represents a 2D point in space.
     Uses several methods to translate, rotate, scale, and reflect the point in space
     """
+    __slots__ = ('_x', '_y')
+
     def __init__(self, x, y):
         """
         Initializes the point class with x and y coordinates as floating point values
@@ -133,10 +135,12 @@ class Point2D(object):
     y = property(_prop_get_y, _prop_set_y)
 
 
-class Vector2D:
+class Vector2D(object):
     """
     Represents a 2D Vector.  Origin is at (0, 0).  Uses built-in methods for vector math
     """
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         """
         Initializes the point class with x and y coordinates as floating point values
@@ -313,6 +317,8 @@ class Triangle2D(object):
     """
     A class to represent a collision within three points.
     """
+    __slots__ = ('_points',)
+
     def __init__(self, point_a, point_b, point_c):
         """
         Takes in three points of class Point2D to use as corners of a 2D triangle.  First point is reference point
@@ -369,21 +375,33 @@ class Triangle2D(object):
         else:
             raise ValueError("Improper values passed in")
 
-        point_a = self._points[0]
-        point_b = self._points[1]
-        point_c = self._points[2]
+        return self.collide_xy(x, y)
+
+    def collide_xy(self, x, y):
+        """
+        Same as collidepoint, but only takes the coordinates and does not create any objects
+        :param x: X coordinate of the point
+        :param y: Y coordinate of the point
+        :return: Returns True if point is inside the triangle
+        """
+        point_a, point_b, point_c = self._points
+        ax = point_a._x
+        ay = point_a._y
 
         # Compute vectors
-        v0 = Vector2D(point_c.x - point_a.x, point_c.y - point_a.y)
-        v1 = Vector2D(point_b.x - point_a.x, point_b.y - point_a.y)
-        v2 = Vector2D(x - point_a.x, y - point_a.y)
+        v0x = point_c._x - ax
+        v0y = point_c._y - ay
+        v1x = point_b._x - ax
+        v1y = point_b._y - ay
+        v2x = x - ax
+        v2y = y - ay
 
         # Compute dot products
-        dot00 = v0 * v0
-        dot01 = v0 * v1
-        dot02 = v0 * v2
-        dot11 = v1 * v1
-        dot12 = v1 * v2
+        dot00 = v0x * v0x + v0y * v0y
+        dot01 = v0x * v1x + v0y * v1y
+        dot02 = v0x * v2x + v0y * v2y
+        dot11 = v1x * v1x + v1y * v1y
+        dot12 = v1x * v2x + v1y * v2y
 
         # Compute barycentric coordinates
         denominator = 1 / (dot00 * dot11 - dot01 * dot01)
@@ -0,0 +1,336 @@
+import numpy
+
+from Core import Bitboard
+from Core import Constant
+
+__author__ = 'Evan'
+
+
+'''
+Batch simulator for Hearts using NumPy.
+
+Holds a number of games as arrays and advances all of them one card at a time, so the rules and the
+ComputerAI heuristics run once per card for the whole batch instead of once per card per game.
+
+Hands are stored as Bitboard masks in int64 arrays, one 13 bit lane per suit.  Suits are lanes 0 to 3
+(Clubs, Diamonds, Spades, Hearts), which is Constant.Suit - 1, and cards use the same index as Bitboard.
+Seats 0 to 3 are player one to player four.  Lowest card, highest card and card count of a suit are
+lookups into tables covering every possible 13 bit lane.
+
+Arrays:
+    hands: (N, 4) int64.  Bitboard of the cards each player holds
+    tricks: (N, 4) int64.  Bitboard of the cards each player has taken this round
+    total_points: (N, 4) int.  Points of each player over the game
+
+Usage:
+    batch = BatchHearts(100000, seed=1)
+    total_points = batch.play()
+'''
+
+SUIT_SIZE = Bitboard.SUIT_SIZE
+LANE = Bitboard.LANE
+
+CLUBS = Constant.Suit.Clubs - 1
+DIAMONDS = Constant.Suit.Diamonds - 1
+SPADES = Constant.Suit.Spades - 1
+HEARTS = Constant.Suit.Hearts - 1
+
+NO_SUIT = -1
+NO_CARD = -1
+
+TWO_OF_CLUBS = Bitboard.get_index(Constant.Suit.Clubs, Constant.Value.Two)
+QUEEN_OF_SPADES = Bitboard.get_index(Constant.Suit.Spades, Constant.Value.Queen)
+KING_OF_SPADES = Bitboard.get_index(Constant.Suit.Spades, Constant.Value.King)
+ACE_OF_SPADES = Bitboard.get_index(Constant.Suit.Spades, Constant.Value.Ace)
+
+# Passing order of each round, and how many seats along the cards go.  Same order as PassingState.
+PASSING_ORDER = ["Left", "Right", "Straight", "None"]
+PASSING_OFFSET = {"Left": 1, "Right": 3, "Straight": 2, "None": 0}
+
+
+def _create_tables():
+    lanes = numpy.arange(0, LANE + 1)
+    popcount = numpy.zeros(LANE + 1, dtype=numpy.int64)
+    lowest = numpy.full(LANE + 1, NO_CARD, dtype=numpy.int64)
+    highest = numpy.full(LANE + 1, NO_CARD, dtype=numpy.int64)
+
+    for position in range(SUIT_SIZE - 1, -1, -1):
+        has_card = (lanes >> position) & 1 == 1
+        popcount += has_card
+        lowest[has_card] = position
+    for position in range(0, SUIT_SIZE):
+        highest[(lanes >> position) & 1 == 1] = position
+
+    return popcount, lowest, highest
+
+# Number of cards, and position of the lowest and highest card, for every possible suit lane
+_POPCOUNT, _LOWEST, _HIGHEST = _create_tables()
+
+# Mask of every card below a value, indexed by value
+_BELOW = numpy.array([(1 << max(value - 2, 0)) - 1 for value in range(0, 15)], dtype=numpy.int64)
+
+
+def to_masks(cards):
+    '''
+    Converts (..., 52) bool arrays of cards to bitboards
+    '''
+    bits = numpy.left_shift(numpy.int64(1), numpy.arange(52, dtype=numpy.int64))
+    return (numpy.asarray(cards, dtype=numpy.int64) * bits).sum(axis=-1)
+
+
+def card_bits(cards):
+    return numpy.left_shift(numpy.int64(1), cards.astype(numpy.int64))
+
+
+# Functions to query a batch of hands.  Hands are int64 bitboards, and suits are a lane or an array of lanes.
+def _lane(hands, suit):
+    return (hands >> (suit * SUIT_SIZE)) & LANE
+
+
+def lowest_in_suit(hands, suit):
+    position = _LOWEST[_lane(hands, suit)]
+    return numpy.where(position == NO_CARD, NO_CARD, suit * SUIT_SIZE + position)
+
+
+def highest_in_suit(hands, suit):
+    position = _HIGHEST[_lane(hands, suit)]
+    return numpy.where(position == NO_CARD, NO_CARD, suit * SUIT_SIZE + position)
+
+
+def highest_in_suit_below(hands, suit, value):
+    position = _HIGHEST[_lane(hands, suit) & _BELOW[value]]
+    return numpy.where(position == NO_CARD, NO_CARD, suit * SUIT_SIZE + position)
+
+
+def count_suit(hands, suit):
+    return _POPCOUNT[_lane(hands, suit)]
+
+
+def _first_found(*choices):
+    # Equivalent of a chain of "if card is None" checks
+    result = choices[0]
+    for choice in choices[1:]:
+        result = numpy.where(result == NO_CARD, choice, result)
+    return result
+
+
+# Rules
+def determine_playable_cards(hands, current_suit, hearts_broken):
+    '''
+    Same rules as Hearts.determine_playable_cards
+    :param hands: (M,) bitboards
+    :param current_suit: (M,) suit lane that was led, or NO_SUIT if leading
+    :param hearts_broken: (M,) bool
+    :return: (M,) bitboard of playable cards
+    '''
+    hearts = numpy.int64(Bitboard.HEARTS)
+    lead_cards = numpy.where(hearts_broken, hands, hands & ~hearts)
+    follow_cards = hands & (numpy.int64(LANE) << (numpy.maximum(current_suit, 0) * SUIT_SIZE))
+    playable = numpy.where(current_suit == NO_SUIT, lead_cards, follow_cards)
+
+    # Player either has no card of current suit or only has hearts left.  Therefore, player can play anything
+    return numpy.where(playable == 0, hands, playable)
+
+
+def find_highest_card(trick_cards, current_suit):
+    '''
+    Seat that wins each trick, as in PlayingState.find_highest_card
+    :param trick_cards: (N, 4) card played by each seat
+    :param current_suit: (N,) suit lane that was led
+    :return: (N,) winning seat
+    '''
+    values = numpy.where(trick_cards // SUIT_SIZE == current_suit[:, None], trick_cards % SUIT_SIZE, -1)
+    return values.argmax(axis=1)
+
+
+def get_points(tricks):
+    '''
+    Points in each trick pile, as in ScoringState.get_points
+    :param tricks: Bitboards of cards taken
+    :return: Points for hearts and the Queen of Spades
+    '''
+    return count_suit(tricks, HEARTS) + 13 * ((tricks >> QUEEN_OF_SPADES) & 1)
+
+
+def handle_shooting_the_moon(round_points):
+    '''
+    Player with all 26 points gets 0, while everyone else gets 26
+    :param round_points: (N, 4) int
+    :return: (N, 4) int
+    '''
+    moon = (round_points == 26).any(axis=1)
+    return numpy.where(moon[:, None], numpy.where(round_points == 26, 0, 26), round_points)
+
+
+# ComputerAI heuristics
+def play_card(hands, current_suit, trick_high_value, trick_count):
+    '''
+    Vectorized ComputerAI.play_card.  Picks the same card as ComputerAI for every hand.
+    :param hands: (N,) bitboard of the player to move
+    :param current_suit: (N,) suit lane to follow, or NO_SUIT if leading
+    :param trick_high_value: (N,) value of the highest card of the current suit in the trick, or 0 if there is none
+    :param trick_count: Number of cards already in the trick
+    :return: (N,) card to play
+    '''
+    following = current_suit != NO_SUIT
+    suit = numpy.maximum(current_suit, 0)
+
+    # Following suit: highest card under the highest card in the trick, otherwise lowest card
+    under = numpy.where(trick_high_value > 0, highest_in_suit_below(hands, suit, trick_high_value), NO_CARD)
+    follow_card = _first_found(under, lowest_in_suit(hands, suit))
+
+    # Following spades: Queen of Spades under a King or Ace, highest spade if last, then as any other suit
+    queen_on_king = (trick_high_value >= Constant.Value.King) & ((hands >> QUEEN_OF_SPADES) & 1 == 1)
+    if trick_count == 3:
+        spade_card = _first_found(highest_in_suit(hands, SPADES), follow_card)
+    else:
+        spade_card = follow_card
+    spade_card = numpy.where(queen_on_king, QUEEN_OF_SPADES, spade_card)
+    follow_card = numpy.where(suit == SPADES, spade_card, follow_card)
+
+    # Leading: lowest spade, heart, club and then diamond
+    lead_card = _first_found(lowest_in_suit(hands, SPADES), lowest_in_suit(hands, HEARTS),
+                             lowest_in_suit(hands, CLUBS), lowest_in_suit(hands, DIAMONDS))
+
+    card = numpy.where(following, follow_card, lead_card)
+
+    # Without the suit: highest heart, spade, diamond and then club
+    discard = _first_found(highest_in_suit(hands, HEARTS), highest_in_suit(hands, SPADES),
+                           highest_in_suit(hands, DIAMONDS), highest_in_suit(hands, CLUBS))
+
+    return numpy.where(card == NO_CARD, discard, card)
+
+
+def pass_card(hands):
+    '''
+    Vectorized _PassingDecisionTree.process.  Picks the card ComputerAI passes next.
+    :param hands: (M,) bitboards
+    :return: (M,) card to pass
+    '''
+    def holds(card):
+        return numpy.where((hands >> card) & 1 == 1, card, NO_CARD)
+
+    def clear_suit(suit):
+        number = count_suit(hands, suit)
+        return numpy.where((0 < number) & (number <= 3), highest_in_suit(hands, suit), NO_CARD)
+
+    return _first_found(holds(QUEEN_OF_SPADES), holds(ACE_OF_SPADES), holds(KING_OF_SPADES),
+                        clear_suit(HEARTS), clear_suit(DIAMONDS), clear_suit(CLUBS), clear_suit(SPADES),
+                        highest_in_suit(hands, HEARTS), highest_in_suit(hands, DIAMONDS),
+                        highest_in_suit(hands, CLUBS), highest_in_suit(hands, SPADES))
+
+
+def pass_cards(hands):
+    '''
+    Three cards each player passes
+    :param hands: (N, 4) bitboards
+    :return: (N, 4) bitboards of the cards to pass
+    '''
+    remaining = hands.copy()
+    passing = numpy.zeros_like(hands)
+
+    for i in range(0, 3):
+        bits = card_bits(pass_card(remaining))
+        passing |= bits
+        remaining &= ~bits
+
+    return passing
+
+
+class BatchHearts(object):
+    """
+    Plays N games of Hearts between four ComputerAI players in lockstep
+    """
+    def __init__(self, number_of_games, seed=None):
+        self.number_of_games = number_of_games
+        self.random = numpy.random.RandomState(seed)
+
+        self.hands = numpy.zeros((number_of_games, 4), dtype=numpy.int64)
+        self.tricks = numpy.zeros((number_of_games, 4), dtype=numpy.int64)
+        self.hearts_broken = numpy.zeros(number_of_games, dtype=bool)
+        self.total_points = numpy.zeros((number_of_games, 4), dtype=int)
+        self.game_over = numpy.zeros(number_of_games, dtype=bool)
+        self.round_number = 0
+
+    def deal(self):
+        """
+        Deals a new shuffled deck to every game
+        """
+        order = self.random.rand(self.number_of_games, 52).argsort(axis=1)
+        self.hands = card_bits(order).reshape(self.number_of_games, 4, 13).sum(axis=2)
+
+    def set_hands(self, hands):
+        """
+        :param hands: (N, 4) bitboards, or (N, 4, 52) bool
+        """
+        hands = numpy.asarray(hands)
+        if hands.ndim == 3:
+            hands = to_masks(hands)
+        self.hands = hands.astype(numpy.int64)
+
+    def passing_round(self, passing_order):
+        offset = PASSING_OFFSET[passing_order]
+        if offset == 0:
+            return
+
+        # Every player chooses before receiving anything, as in PassingState.passing_round
+        passing = pass_cards(self.hands)
+        self.hands = (self.hands & ~passing) | numpy.roll(passing, offset, axis=1)
+
+    def play_round(self):
+        """
+        Plays all 13 tricks of the current hands
+        :return: (N, 4) points of the round, after shooting the moon
+        """
+        games = numpy.arange(self.number_of_games)
+        self.tricks[:] = 0
+        self.hearts_broken[:] = False
+
+        # Player with the two of clubs leads, and the first trick is always clubs
+        leader = ((self.hands >> TWO_OF_CLUBS) & 1).argmax(axis=1)
+        current_suit = numpy.full(self.number_of_games, CLUBS, dtype=numpy.int64)
+
+        for trick in range(0, 13):
+            trick_cards = numpy.full((self.number_of_games, 4), NO_CARD, dtype=numpy.int64)
+            trick_high_value = numpy.zeros(self.number_of_games, dtype=numpy.int64)
+            player = leader
+
+            for trick_count in range(0, 4):
+                card = play_card(self.hands[games, player], current_suit, trick_high_value, trick_count)
+                self.hands[games, player] &= ~card_bits(card)
+                trick_cards[games, player] = card
+
+                suit = card // SUIT_SIZE
+                value = card % SUIT_SIZE + 2
+                current_suit = numpy.where(current_suit == NO_SUIT, suit, current_suit)
+                trick_high_value = numpy.where((suit == current_suit) & (value > trick_high_value),
+                                               value, trick_high_value)
+
+                # Play goes from player one to player four, four to three, and so on
+                player = (player + 3) % 4
+
+            winner = find_highest_card(trick_cards, current_suit)
+            self.tricks[games, winner] |= card_bits(trick_cards).sum(axis=1)
+            self.hearts_broken |= (trick_cards // SUIT_SIZE == HEARTS).any(axis=1)
+
+            leader = winner
+            current_suit = numpy.full(self.number_of_games, NO_SUIT, dtype=numpy.int64)
+
+        return handle_shooting_the_moon(get_points(self.tricks))
+
+    def play(self):
+        """
+        Plays rounds until every game has a player with 100 points or more
+        :return: (N, 4) total points of each game
+        """
+        while not self.game_over.all():
+            self.deal()
+            self.passing_round(PASSING_ORDER[self.round_number % 4])
+            round_points = self.play_round()
+
+            # Games that are already over keep their final score
+            self.total_points += numpy.where(self.game_over[:, None], 0, round_points)
+            self.game_over |= (self.total_points >= 100).any(axis=1)
+            self.round_number += 1
+
+        return self.total_points
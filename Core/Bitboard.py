@@ -0,0 +1,271 @@
+from Core import Constant
+
+__author__ = 'Evan'
+
+
+'''
+Bitboard representation of a set of standard playing cards.
+
+A set of cards is stored as a single integer with one bit per card.  Each suit uses a 13 bit lane, with
+the Two in the lowest bit of the lane and the Ace in the highest:
+    Bits  0-12: Clubs
+    Bits 13-25: Diamonds
+    Bits 26-38: Spades
+    Bits 39-51: Hearts
+
+Index of a card is (suit - 1) * 13 + (value - 2), which is also the order Hearts.setup_deck creates the deck in.
+'''
+
+SUIT_SIZE = 13
+LANE = (1 << SUIT_SIZE) - 1
+ALL_CARDS = (1 << 52) - 1
+
+SUIT_MASK = {Constant.Suit.Clubs: LANE,
+             Constant.Suit.Diamonds: LANE << SUIT_SIZE,
+             Constant.Suit.Spades: LANE << (2 * SUIT_SIZE),
+             Constant.Suit.Hearts: LANE << (3 * SUIT_SIZE)}
+
+SUIT_SHIFT = {Constant.Suit.Clubs: 0,
+              Constant.Suit.Diamonds: SUIT_SIZE,
+              Constant.Suit.Spades: 2 * SUIT_SIZE,
+              Constant.Suit.Hearts: 3 * SUIT_SIZE}
+
+# Number of cards in every possible suit lane, so counting cards in a suit is a single lookup
+_POPCOUNT = [bin(i).count('1') for i in range(0, LANE + 1)]
+
+
+# Functions to convert between cards and bits
+def get_index(suit, value):
+    return (suit - 1) * SUIT_SIZE + value - 2
+
+
+def get_bit(suit, value):
+    return 1 << ((suit - 1) * SUIT_SIZE + value - 2)
+
+
+def card_index(card):
+    return (card.suit - 1) * SUIT_SIZE + card.value - 2
+
+
+def card_bit(card):
+    return 1 << ((card.suit - 1) * SUIT_SIZE + card.value - 2)
+
+
+def get_suit(index):
+    return index // SUIT_SIZE + 1
+
+
+def get_value(index):
+    return index % SUIT_SIZE + 2
+
+
+def get_mask(cards):
+    """
+    Builds a bitboard from a list of cards.  Hands already keep their own mask.
+    :param cards: Hand or list of StandardPlayingCard
+    :return: int
+    """
+    if isinstance(cards, Hand):
+        return cards.mask
+
+    mask = 0
+    for card in cards:
+        mask |= card_bit(card)
+    return mask
+
+
+QUEEN_OF_SPADES = get_bit(Constant.Suit.Spades, Constant.Value.Queen)
+TWO_OF_CLUBS = get_bit(Constant.Suit.Clubs, Constant.Value.Two)
+HEARTS = SUIT_MASK[Constant.Suit.Hearts]
+POINT_CARDS = HEARTS | QUEEN_OF_SPADES
+
+
+# Functions to query a bitboard
+def count(mask):
+    return _POPCOUNT[mask & LANE] + _POPCOUNT[(mask >> SUIT_SIZE) & LANE] + \
+        _POPCOUNT[(mask >> (2 * SUIT_SIZE)) & LANE] + _POPCOUNT[(mask >> (3 * SUIT_SIZE)) & LANE]
+
+
+def count_suit(mask, suit):
+    return _POPCOUNT[(mask >> SUIT_SHIFT[suit]) & LANE]
+
+
+def lowest_index(mask):
+    """
+    Index of the lowest card in the mask, or -1 if the mask is empty
+    """
+    return (mask & -mask).bit_length() - 1
+
+
+def highest_index(mask):
+    """
+    Index of the highest card in the mask, or -1 if the mask is empty
+    """
+    return mask.bit_length() - 1
+
+
+def lowest_in_suit(mask, suit):
+    return lowest_index(mask & SUIT_MASK[suit])
+
+
+def highest_in_suit(mask, suit):
+    return highest_index(mask & SUIT_MASK[suit])
+
+
+def below(suit, value):
+    """
+    Mask of every card in the suit with a lower value than the given value
+    """
+    return (get_bit(suit, value) - 1) & SUIT_MASK[suit]
+
+
+def points(mask):
+    """
+    Points taken for a trick pile: one per heart and 13 for the Queen of Spades
+    """
+    total = _POPCOUNT[(mask >> SUIT_SHIFT[Constant.Suit.Hearts]) & LANE]
+    if mask & QUEEN_OF_SPADES:
+        total += 13
+    return total
+
+
+def legal_moves(hand_mask, current_suit, hearts_broken):
+    """
+    Cards that may be played from a hand.  Same rules as Hearts.determine_playable_cards
+    :param hand_mask: Bitboard of the hand
+    :param current_suit: Suit that was led, or None if the player is leading
+    :param hearts_broken: Whether hearts may be led
+    :return: Bitboard of playable cards
+    """
+    if current_suit is None:
+        if hearts_broken:
+            playable = hand_mask
+        else:
+            playable = hand_mask & ~HEARTS
+    else:
+        playable = hand_mask & SUIT_MASK[current_suit]
+
+    # Player either has no card of current suit or only has hearts left.  Therefore, player can play anything
+    if playable == 0:
+        playable = hand_mask
+
+    return playable
+
+
+def indices(mask):
+    """
+    Generator over the indices in the mask, lowest first
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Hand(list):
+    """
+    List of cards that keeps a bitboard of its contents up to date.  Can be used anywhere a list of cards is
+    used, while membership and suit queries run on the bitboard instead of scanning the list.
+    """
+    def __init__(self, cards=()):
+        list.__init__(self, cards)
+        self.mask = 0
+        self._cards = {}
+        self._rebuild()
+
+    def _rebuild(self):
+        self.mask = 0
+        self._cards = {}
+        for card in self:
+            self._add(card)
+
+    def _add(self, card):
+        index = card_index(card)
+        self.mask |= 1 << index
+        self._cards[index] = card
+
+    def _discard(self, card):
+        index = card_index(card)
+        self.mask &= ~(1 << index)
+        self._cards.pop(index, None)
+
+    # List methods that change the contents of the hand
+    def append(self, card):
+        list.append(self, card)
+        self._add(card)
+
+    def extend(self, cards):
+        cards = list(cards)
+        list.extend(self, cards)
+        for card in cards:
+            self._add(card)
+
+    def insert(self, position, card):
+        list.insert(self, position, card)
+        self._add(card)
+
+    def remove(self, card):
+        list.remove(self, card)
+        self._discard(card)
+
+    def pop(self, *args):
+        card = list.pop(self, *args)
+        self._discard(card)
+        return card
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def __setitem__(self, key, value):
+        list.__setitem__(self, key, value)
+        self._rebuild()
+
+    def __delitem__(self, key):
+        list.__delitem__(self, key)
+        self._rebuild()
+
+    def __setslice__(self, i, j, cards):
+        list.__setslice__(self, i, j, cards)
+        self._rebuild()
+
+    def __delslice__(self, i, j):
+        list.__delslice__(self, i, j)
+        self._rebuild()
+
+    def __contains__(self, card):
+        try:
+            return bool(self.mask & card_bit(card))
+        except AttributeError:
+            return list.__contains__(self, card)
+
+    # Queries on the bitboard
+    def get_card(self, index):
+        return self._cards.get(index, None)
+
+    def has_card(self, suit, value):
+        return self._cards.get(get_index(suit, value), None)
+
+    def has_suit(self, suit):
+        return (self.mask & SUIT_MASK[suit]) != 0
+
+    def count_suit(self, suit):
+        return count_suit(self.mask, suit)
+
+    def lowest_in_suit(self, suit):
+        return self._cards.get(lowest_in_suit(self.mask, suit), None)
+
+    def highest_in_suit(self, suit):
+        return self._cards.get(highest_in_suit(self.mask, suit), None)
+
+    def highest_in_suit_below(self, suit, value):
+        return self._cards.get(highest_index(self.mask & below(suit, value)), None)
+
+    def cards_in_mask(self, mask):
+        return [self._cards[index] for index in indices(self.mask & mask)]
+
+    def cards_in_suit(self, suit):
+        return self.cards_in_mask(SUIT_MASK[suit])
+
+    def legal_cards(self, current_suit, hearts_broken):
+        return self.cards_in_mask(legal_moves(self.mask, current_suit, hearts_broken))
@@ -1,19 +1,318 @@
+import atexit
+import collections
 import datetime
+import signal
+import sys
+import threading
+import time
+
+
+'''
+Game log.
+
+Messages are put in a queue and written to the log file by a background thread, which keeps the file open and
+writes everything in the queue at once, so logging does not wait on the disk.  Messages use % style formatting
+with the values passed separately, and are only formatted by the writer thread.  Messages below the level of the
+logger are dropped before anything is formatted or queued.  Values are formatted after the call returns, so pass
+values that do not change, such as numbers and strings, instead of objects that do.  The file is opened when the
+writer starts, so a file that can't be opened raises IOError from the call that logged.
+
+A FlightRecorder can be attached to a logger to keep the last messages at every level in memory, whether or not
+the logger writes them, and write them to a file only when something goes wrong.
+
+Usage:
+    log_file.debug('---PassingState enter() enter---')
+    log_file.info('ScoringState: %s: %s', player.name, points)
+
+    flight_recorder = FlightRecorder()
+    flight_recorder.install(log_file)
+'''
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+level_str = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+# Messages waiting to be written before logging waits for the writer thread to catch up
+QUEUE_SIZE = 10000
+
+# Put in the queue in place of a level to have the writer thread flush the file, or stop
+_FLUSH = 'FLUSH'
+_CLOSE = 'CLOSE'
+
+# Messages kept by a flight recorder, and the signal that has it write them out.  Windows has no SIGUSR1
+FLIGHT_RECORDER_SIZE = 4096
+DUMP_SIGNAL = getattr(signal, 'SIGUSR1', getattr(signal, 'SIGBREAK', None))
+
+
+def get_file_name(name, extension='.txt'):
+    """
+    :param name: Start of the file name
+    :param extension: End of the file name
+    :return: Path of a log file named after the current time
+    """
+    now = datetime.datetime.now()
+    return 'Core\\Logs\\' + name + '_' + str(now.year) + '_' + str(now.month) + '_' + str(now.day) + '_' + \
+        str(now.hour) + '_' + str(now.minute) + '_' + str(now.second) + extension
+
+
+def format_message(message, args):
+    if args:
+        try:
+            return message % args
+        except (TypeError, ValueError):
+            return message + ' ' + str(args)
+    return message
 
 
 class Logger:
-    def __init__(self, file_name, enabled=True):
+    def __init__(self, file_name, enabled=True, level=INFO):
+        """
+        :param file_name: File messages are added to.  Not opened until the first message is logged
+        :param enabled: Nothing is logged if False
+        :param level: Lowest level of messages that are logged
+        :return:
+        """
         self.file_name = file_name
         self.number = 1
         self.enabled = enabled
+        self.level = level
+
+        # FlightRecorder given every message, at every level
+        self.recorder = None
+
+        # Appending to a deque does not need a lock, and the writer is only woken when it is waiting
+        self._queue = collections.deque()
+        self._wake = threading.Event()
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def is_enabled_for(self, level):
+        return self.enabled and level >= self.level
+
+    def debug(self, message, *args):
+        if self.recorder is not None:
+            self.recorder.record(DEBUG, message, args)
+        if self.enabled and DEBUG >= self.level:
+            self._put(DEBUG, message, args)
+
+    def info(self, message, *args):
+        if self.recorder is not None:
+            self.recorder.record(INFO, message, args)
+        if self.enabled and INFO >= self.level:
+            self._put(INFO, message, args)
+
+    def warning(self, message, *args):
+        if self.recorder is not None:
+            self.recorder.record(WARNING, message, args)
+        if self.enabled and WARNING >= self.level:
+            self._put(WARNING, message, args)
+
+    def error(self, message, *args):
+        if self.recorder is not None:
+            self.recorder.record(ERROR, message, args)
+        if self.enabled and ERROR >= self.level:
+            self._put(ERROR, message, args)
+
+    def log(self, message, *args):
+        """
+        Logs a message at the INFO level
+        :param message: Message, with % style placeholders for args
+        :param args: Values for the placeholders
+        :return:
+        """
+        if self.recorder is not None:
+            self.recorder.record(INFO, message, args)
+        if self.enabled and INFO >= self.level:
+            self._put(INFO, message, args)
+
+    def flush(self):
+        """
+        Waits until every message logged so far is written to the file
+        :return:
+        """
+        if self._writer is not None:
+            flushed = threading.Event()
+            self._add((_FLUSH, flushed, None))
+            while not flushed.wait(.1) and self._writer.is_alive():
+                pass
 
-    def log(self, data):
-        if self.enabled:
-            if not not data:
-                with open(self.file_name, "a") as _file:
-                    _file.write(str(self.number) + '. ' + data + '\n')
+    def close(self):
+        """
+        Writes every message logged so far, then stops the writer thread and closes the file.  Logging again
+        opens the file again
+        :return:
+        """
+        with self._lock:
+            if self._writer is not None:
+                self._add((_CLOSE, None, None))
+                self._writer.join()
+                self._writer = None
+
+    def _put(self, level, message, args):
+        if not message:
+            return
+        if self._writer is None or not self._writer.is_alive():
+            self._start()
+        while len(self._queue) >= QUEUE_SIZE and self._writer.is_alive():
+            time.sleep(.001)
+        self._add((level, message, args))
+
+    def _add(self, item):
+        self._queue.append(item)
+        if not self._wake.is_set():
+            self._wake.set()
+
+    def _start(self):
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                # Opened before the writer starts, so a file that can't be opened raises IOError to the caller
+                _file = open(self.file_name, 'a')
+
+                # Writer stopped without being closed.  Messages it left are dropped so the queue stays bounded
+                if self._writer is not None:
+                    self._queue.clear()
+
+                self._writer = threading.Thread(target=self._write, args=(_file,), name='CardLogging')
+                self._writer.daemon = True
+                self._writer.start()
+
+    def _write(self, _file):
+        with _file:
+            while True:
+                # Cleared before taking messages, so a message added while writing wakes the writer again
+                self._wake.wait()
+                self._wake.clear()
+
+                lines = []
+                while self._queue:
+                    level, message, args = self._queue.popleft()
+                    if level is _CLOSE:
+                        _file.write(''.join(lines))
+                        return
+                    elif level is _FLUSH:
+                        _file.write(''.join(lines))
+                        _file.flush()
+                        lines = []
+                        message.set()
+                        continue
+
+                    lines.append(str(self.number) + '. ' + level_str[level] + ': ' + format_message(message, args) +
+                                 '\n')
                     self.number += 1
+                _file.write(''.join(lines))
+                _file.flush()
+
+
+class FlightRecorder:
+    """
+    Keeps the last messages logged in a ring buffer.  Recording only stores the time, level, message and values
+    in lists made when the recorder is created.  Nothing is formatted or written until the recorder is dumped.
+    """
+    def __init__(self, size=FLIGHT_RECORDER_SIZE, level=DEBUG):
+        """
+        :param size: Number of messages kept.  Older messages are overwritten
+        :param level: Lowest level of messages that are kept
+        :return:
+        """
+        self.size = size
+        self.level = level
+
+        # Number of messages recorded so far.  The next message is stored at count % size
+        self.count = 0
+        self._times = [0.0] * size
+        self._levels = [0] * size
+        self._messages = [None] * size
+        self._args = [None] * size
+
+        self._logger = None
+        self._excepthook = None
+        self._signal_number = None
+        self._signal_handler = None
+
+    def record(self, level, message, args):
+        if level >= self.level:
+            i = self.count % self.size
+            self._times[i] = time.time()
+            self._levels[i] = level
+            self._messages[i] = message
+            self._args[i] = args
+            self.count += 1
+
+    def get_messages(self):
+        """
+        :return: List of (time, level, message) for every message kept, oldest first, with the values formatted
+        """
+        messages = []
+        for number in range(max(0, self.count - self.size), self.count):
+            i = number % self.size
+            messages.append((self._times[i], self._levels[i], format_message(self._messages[i], self._args[i])))
+        return messages
+
+    def dump(self, file_name=None, reason=None):
+        """
+        Writes the messages kept to a file.  Messages are still kept afterwards
+        :param file_name: File to write.  Defaults to a new file named after the current time
+        :param reason: Written at the start of the file
+        :return: Name of the file written
+        """
+        if file_name is None:
+            file_name = get_file_name('Hearts_Flight')
+        with open(file_name, 'w') as _file:
+            if reason is not None:
+                _file.write(reason + '\n')
+            for message_time, level, message in self.get_messages():
+                _file.write(datetime.datetime.fromtimestamp(message_time).strftime('%H:%M:%S.%f') + ' ' +
+                            level_str[level] + ': ' + message + '\n')
+        return file_name
+
+    def install(self, logger, signal_number=DUMP_SIGNAL):
+        """
+        Records every message of the logger, and dumps when there is an uncaught exception or the signal is sent
+        :param logger: Logger to record
+        :param signal_number: Signal that dumps the recorder, or None to leave signals alone
+        :return:
+        """
+        self._logger = logger
+        logger.recorder = self
+
+        self._excepthook = sys.excepthook
+        sys.excepthook = self._handle_exception
+
+        if signal_number is not None:
+            self._signal_number = signal_number
+            self._signal_handler = signal.signal(signal_number, self._handle_signal)
+
+    def uninstall(self):
+        """
+        Stops recording the logger, and puts back the exception hook and signal handler replaced by install
+        :return:
+        """
+        if self._logger is not None and self._logger.recorder is self:
+            self._logger.recorder = None
+        self._logger = None
+
+        if sys.excepthook == self._handle_exception:
+            sys.excepthook = self._excepthook
+        self._excepthook = None
+
+        if self._signal_number is not None:
+            signal.signal(self._signal_number, self._signal_handler)
+        self._signal_number = None
+        self._signal_handler = None
+
+    def _handle_exception(self, exception_type, exception, traceback):
+        try:
+            self.dump(reason='Uncaught exception: ' + exception_type.__name__ + ': ' + str(exception))
+        finally:
+            self._excepthook(exception_type, exception, traceback)
+
+    def _handle_signal(self, signal_number, frame):
+        self.dump(reason='Signal ' + str(signal_number))
+
+log_file = Logger(get_file_name('Hearts'))
 
-_now = datetime.datetime.now()
-log_file = Logger('Core\Logs\Hearts_' + str(_now.year) + '_' + str(_now.month) + '_' + str(_now.day) + '_' +
-                  str(_now.hour) + '_' + str(_now.minute) + '_' + str(_now.second) + '.txt')
+# Messages still in the queue are written before the program exits
+atexit.register(log_file.close)
@@ -0,0 +1,205 @@
+import struct
+
+from Core import Bitboard
+
+__author__ = 'Evan'
+
+
+'''
+Compact record of a game of Hearts.
+
+Keeps the deal of every round, the cards each seat passed and the cards played, as card indices from
+Bitboard.card_index.  Nothing else is needed to play a game again, as everything else follows from the rules,
+so a record does not depend on the AIs or on the random numbers they drew.  Totals from the Scoring state are
+kept as well so a replay can be checked against the game that was recorded.
+
+Card indices fit in 6 bits, so every 4 cards are packed into 3 bytes.  A file is a header followed by each round:
+    Header: 'HREC', version, number of rounds, total points of each seat
+    Round: whether cards were passed, number of cards played, deal (39 bytes), passes (9 bytes, only if passed),
+           plays (39 bytes for a whole round)
+A whole round takes 89 bytes, so a game of a dozen rounds takes about a kilobyte.
+
+Usage:
+    game_record.add_deal(shuffled_deck)
+    game_record.add_passes([player.passing for player in players])
+    game_record.add_play(card)
+    game_record.set_total_points(total_points)
+    game_record.save(file_name)
+
+    game_record = load(file_name)
+'''
+
+MAGIC = 'HREC'
+VERSION = 1
+
+NUMBER_OF_SEATS = 4
+CARDS_IN_DECK = 52
+CARDS_PASSED = 3
+
+_HEADER = struct.Struct('<4sBB4H')
+_ROUND = struct.Struct('<BB')
+_GROUP = struct.Struct('>I')
+
+
+class RecordError(Exception):
+    pass
+
+
+def pack_cards(indices):
+    """
+    :param indices: Card indices
+    :return: String with every 4 cards packed into 3 bytes.  The last group is filled out with zeros
+    """
+    data = []
+    for i in range(0, len(indices), 4):
+        group = list(indices[i:i + 4])
+        group += [0] * (4 - len(group))
+        data.append(_GROUP.pack(group[0] << 18 | group[1] << 12 | group[2] << 6 | group[3])[1:])
+    return ''.join(data)
+
+
+def unpack_cards(data, offset, number_of_cards):
+    """
+    :param data: String made by pack_cards
+    :param offset: Position of the first byte of the cards
+    :param number_of_cards: Number of cards to read
+    :return: List of card indices, and the position after the cards
+    """
+    end = offset + get_packed_size(number_of_cards)
+    if end > len(data):
+        raise RecordError('Record ends in the middle of a round')
+
+    indices = []
+    for i in range(offset, end, 3):
+        value = _GROUP.unpack('\x00' + data[i:i + 3])[0]
+        indices.extend([value >> 18, (value >> 12) & 63, (value >> 6) & 63, value & 63])
+    del indices[number_of_cards:]
+
+    for index in indices:
+        if index >= CARDS_IN_DECK:
+            raise RecordError('Card index ' + str(index) + ' is not a card')
+    return indices, end
+
+
+def get_packed_size(number_of_cards):
+    return (number_of_cards + 3) // 4 * 3
+
+
+class GameRecord(object):
+    """
+    Deals, passes and plays of a game, one entry per round in the order they happened
+    """
+    def __init__(self):
+        # Card indices of each shuffled deck, in the order the cards were in before being dealt
+        self.deals = []
+
+        # Card indices passed by each seat, one seat after the other, or None when nobody passed
+        self.passes = []
+
+        # Card indices in the order the cards were played
+        self.plays = []
+
+        # Total points of each seat after the last round that was scored
+        self.total_points = [0] * NUMBER_OF_SEATS
+
+    def add_deal(self, deck):
+        """
+        Starts a new round
+        :param deck: Shuffled deck, before any cards are dealt from it
+        :return:
+        """
+        if len(deck) != CARDS_IN_DECK:
+            raise RecordError('Deal has ' + str(len(deck)) + ' cards')
+        self.deals.append([Bitboard.card_index(card) for card in deck])
+        self.passes.append(None)
+        self.plays.append([])
+
+    def add_passes(self, passing):
+        """
+        :param passing: List of the cards passed by each seat
+        :return:
+        """
+        passes = []
+        for cards in passing:
+            if len(cards) != CARDS_PASSED:
+                raise RecordError('Seat passed ' + str(len(cards)) + ' cards')
+            passes.extend([Bitboard.card_index(card) for card in cards])
+        self.passes[-1] = passes
+
+    def add_play(self, card):
+        self.plays[-1].append(Bitboard.card_index(card))
+
+    def set_total_points(self, total_points):
+        self.total_points = list(total_points)
+
+    def get_number_of_rounds(self):
+        return len(self.deals)
+
+    def is_round_finished(self, round_number):
+        return len(self.plays[round_number]) == CARDS_IN_DECK
+
+    def to_string(self):
+        """
+        :return: The record packed into a string, as it is saved to a file
+        """
+        data = [_HEADER.pack(MAGIC, VERSION, len(self.deals), *self.total_points)]
+        for deal, passes, plays in zip(self.deals, self.passes, self.plays):
+            data.append(_ROUND.pack(passes is not None, len(plays)))
+            data.append(pack_cards(deal))
+            if passes is not None:
+                data.append(pack_cards(passes))
+            data.append(pack_cards(plays))
+        return ''.join(data)
+
+    @staticmethod
+    def from_string(data):
+        """
+        :param data: String made by to_string
+        :return: GameRecord
+        """
+        if len(data) < _HEADER.size:
+            raise RecordError('Record is too short')
+        header = _HEADER.unpack_from(data, 0)
+        if header[0] != MAGIC:
+            raise RecordError('Not a game record')
+        if header[1] != VERSION:
+            raise RecordError('Game record version ' + str(header[1]) + ' is not supported')
+
+        game_record = GameRecord()
+        game_record.total_points = list(header[3:])
+
+        offset = _HEADER.size
+        for round_number in range(0, header[2]):
+            if offset + _ROUND.size > len(data):
+                raise RecordError('Record ends in the middle of a round')
+            passed, number_of_plays = _ROUND.unpack_from(data, offset)
+            if number_of_plays > CARDS_IN_DECK:
+                raise RecordError('Round has ' + str(number_of_plays) + ' plays')
+            offset += _ROUND.size
+
+            deal, offset = unpack_cards(data, offset, CARDS_IN_DECK)
+            if sorted(deal) != range(0, CARDS_IN_DECK):
+                raise RecordError('Deal of round ' + str(round_number + 1) + ' is not a whole deck')
+            passes = None
+            if passed:
+                passes, offset = unpack_cards(data, offset, NUMBER_OF_SEATS * CARDS_PASSED)
+            plays, offset = unpack_cards(data, offset, number_of_plays)
+
+            game_record.deals.append(deal)
+            game_record.passes.append(passes)
+            game_record.plays.append(plays)
+
+        return game_record
+
+    def save(self, file_name):
+        with open(file_name, 'wb') as _file:
+            _file.write(self.to_string())
+
+
+def load(file_name):
+    """
+    :param file_name: File written by GameRecord.save
+    :return: GameRecord
+    """
+    with open(file_name, 'rb') as _file:
+        return GameRecord.from_string(_file.read())
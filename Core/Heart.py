@@ -1,10 +1,17 @@
+import os
+import random
 import pygame
 
+from CardEngine import AssetPack
+from CardEngine import Atlas
 from CardEngine import Engine
 import CardEngine.UI
 from Core.StateMachine import StateMachine
 from Core.StateMachine import State
 from Core.Player.AI import AI
+from Core import Bitboard
+from Core import CardLogging
+from Core import GameRecord
 import Constant
 
 
@@ -28,6 +35,10 @@ Hearts
     -_Image Type
     -_Sound Path
     -_Sound Type
+    -_Asset Pack (used instead of the image and sound files when it has been built)
+    -_Flight Recorder (last log messages, written out when the game crashes or quits)
+    -_Game Record (deals, passes and plays, written out when the game quits)
+    -_Random numbers the table shuffles with
     -_clock
 
 -Setup:
@@ -61,12 +72,17 @@ States
 
 '''
 
+ASSET_PACK_FILE = os.path.join('Res', 'Cards.pak')
+BACK_SPRITE = "Card Back 1"
+ACE_OF_SPADES_SOUND = "The Ace of Spades"
+SOUND_VOLUME = 0.2
+
 
 class Player(object):
     def __init__(self, name, ai):
         self.name = name
         self.ai = ai
-        self.hand = []
+        self.hand = Bitboard.Hand()
         self.tricks = []
         self.cards_to_pass = []
         self.selected_card = None
@@ -76,24 +92,8 @@ class Player(object):
         self.ai.set_player(self)
 
     def sort_hand(self):
-
-        # Selection sort by value first
-        for i in range(1, len(self.hand)):
-            j = i
-            while j > 0 and self.hand[j - 1].value > self.hand[j].value:
-                temp = self.hand[j]
-                self.hand[j] = self.hand[j - 1]
-                self.hand[j - 1] = temp
-                j -= 1
-
-        # Selection sort by suit second
-        for i in range(1, len(self.hand)):
-            j = i
-            while j > 0 and self.hand[j - 1].suit > self.hand[j].suit:
-                temp = self.hand[j]
-                self.hand[j] = self.hand[j - 1]
-                self.hand[j - 1] = temp
-                j -= 1
+        # Sort by suit, then by value within each suit
+        self.hand.sort(key=lambda card: (card.suit, card.value))
 
     def set_hand_owner(self):
         for card in self.hand:
@@ -114,8 +114,20 @@ class Player(object):
 
 class Hearts:
     def __init__(self, width=800, height=800):
+        # Asset pack is opened before the engine, as the window icon is loaded from it
+        self.asset_pack = AssetPack.load(ASSET_PACK_FILE)
+        self.imagePath = "Res/img/Cards/"
+        self.imageType = ".png"
+        self.soundPath = "Res/Sound/"
+        self.soundType = ".wav"
+
         # Initialize the pygame Engine
-        Engine.CardEngine.init(width, height)
+        Engine.CardEngine.init(width, height, icon=self.load_image(BACK_SPRITE))
+
+        # Last messages of the game are kept in memory, and written to a file if the game crashes or is closed
+        self.flight_recorder = CardLogging.FlightRecorder()
+        self.flight_recorder.install(CardLogging.log_file)
+        Engine.CardEngine.gameQuit += self.flight_recorder.dump
 
         # Initialize the players for the game
         # Bottom is Human Player.  Goes clockwise for computers
@@ -124,6 +136,9 @@ class Hearts:
         self.player_three = Player("Jane", AI.ComputerAI())
         self.player_four = Player("Smith", AI.ComputerAI())
 
+        for player in self.get_players():
+            player.ai.set_game(self)
+
         # Initialize the deck
         self.trick_pile = []
         self.deck = []
@@ -132,12 +147,22 @@ class Hearts:
         self.heartsBroken = False
         self.currentSuit = Constant.Suit.Clubs
 
+        # Table shuffles from its own random numbers, so nothing else drawing random numbers changes the deals
+        self.rng = random.Random()
+        self.deals = None
+
+        # Every deal, pass and play is recorded so the game can be replayed
+        self.game_record = GameRecord.GameRecord()
+        Engine.CardEngine.gameQuit += self.save_game_record
+        Engine.CardEngine.gameQuit += self.close
+
         # Load the sprites for the cards into the game
+        self.sprite_atlas = None
         self.front_sprites = {}
         self.back_sprites = {}
         self.card_ui_elements = []
-        self.imagePath = "Res/img/Cards/"
-        self.imageType = ".png"
+        self.card_ui_lookup = {}
+        self.sounds = {}
         self.load_sprites()
         self.setup_deck()
 
@@ -159,18 +184,46 @@ class Hearts:
 
     # Initialization functions
     def load_sprites(self):
-        for suit in range(1, 5):
-            for value in range(2, 15):
-                name = Constant.value_str[value] + " of " + Constant.suit_str[suit]
-                sprite = pygame.image.load(self.imagePath + name + self.imageType)
-                self.front_sprites[name] = sprite
-
-        for i in range(1, 5):
-            name = "Card Back " + str(i)
-            sprite = pygame.image.load(self.imagePath + name + self.imageType)
-            self.back_sprites[name] = sprite
+        front_names = get_front_sprite_names()
+        back_names = [BACK_SPRITE]
+
+        # Every card shares the sprites in one atlas, one row for each suit and a row for the back.  Packing copies
+        # in every sprite, so all of them are loaded here rather than when first shown.  Nothing is lost, as the
+        # cards of the whole deck are made right after and each takes its sprites then
+        sprites = [(name, self.load_image(name)) for name in front_names + back_names]
+        self.sprite_atlas = Atlas.SpriteAtlas(sprites, 13)
+
+        for name in front_names:
+            self.front_sprites[name] = self.sprite_atlas.get(name)
+        for name in back_names:
+            self.back_sprites[name] = self.sprite_atlas.get(name)
         return
 
+    def load_image(self, name):
+        """
+        :param name: Name of the image file, without the path or type
+        :return: Surface from the asset pack if it has been built, or else from the image file
+        """
+        if self.asset_pack is not None and name in self.asset_pack:
+            return self.asset_pack.get_image(name)
+        return pygame.image.load(self.imagePath + name + self.imageType)
+
+    def load_sound(self, name):
+        """
+        Loads a sound the first time it is needed
+        :param name: Name of the sound file, without the path or type
+        :return: Pygame Sound
+        """
+        sound = self.sounds.get(name, None)
+        if sound is None:
+            if self.asset_pack is not None and name in self.asset_pack:
+                sound = self.asset_pack.get_sound(name)
+            else:
+                sound = pygame.mixer.Sound(self.soundPath + name + self.soundType)
+            sound.set_volume(SOUND_VOLUME)
+            self.sounds[name] = sound
+        return sound
+
     def setup_ui(self):
         # Card width: 75
         # Card height: 105
@@ -251,7 +304,7 @@ class Hearts:
                 four_z += .1
 
             if card.value is Constant.Value.Ace and card.suit is Constant.Suit.Spades:
-                card_ui.load_sound_file("Res/Sound/The Ace of Spades.wav")
+                card_ui.sound = self.load_sound(ACE_OF_SPADES_SOUND)
 
         return
 
@@ -259,7 +312,7 @@ class Hearts:
         z = 0
         for card in self.deck:
             front_sprite_name = Constant.value_str[card.value] + " of " + Constant.suit_str[card.suit]
-            back_sprite_name = "Card Back 1"
+            back_sprite_name = BACK_SPRITE
 
             front_sprite = self.front_sprites[front_sprite_name]
             back_sprite = self.back_sprites[back_sprite_name]
@@ -268,6 +321,7 @@ class Hearts:
 
             card_ui.visible = False
             self.card_ui_elements.append(card_ui)
+            self.card_ui_lookup[Bitboard.card_index(card)] = card_ui
             z += .1
 
     def setup_deck(self):
@@ -294,29 +348,45 @@ class Hearts:
         self.deck = Engine.CardEngine.create_deck(card_suits, card_values)
 
     # Utility functions
+    def shuffle_deck(self):
+        # Deck is only made by the Setup state, so deals are streamed from it the first time one is needed
+        if self.deals is None:
+            self.deals = Engine.CardEngine.generate_deals(self.deck, self.rng)
+        return next(self.deals)
+
+    def save_game_record(self, file_name=None):
+        """
+        :param file_name: File to write.  Defaults to a new file in the log folder named after the current time
+        :return: Name of the file written, or None if no round was dealt yet
+        """
+        if self.game_record.get_number_of_rounds() == 0:
+            return None
+        if file_name is None:
+            file_name = CardLogging.get_file_name('Hearts_Record', '.hrc')
+        self.game_record.save(file_name)
+        return file_name
+
     def determine_playable_cards(self, hand):
+        # Player leading can only play hearts if broken.  Otherwise, player must follow the suit if possible
+        playable_mask = Bitboard.legal_moves(Bitboard.get_mask(hand), self.currentSuit, self.heartsBroken)
+
         playable_cards = []
-        # Player will play first card.  Can only play hearts if broken
-        if self.currentSuit is None:
-            for card in hand:
-                if not self.heartsBroken:
-                    if card.suit is not Constant.Suit.Hearts:
-                        playable_cards.append(card)
-                else:
-                    playable_cards.append(card)
-        # Otherwise, player is not going first, and player must follow the suit
-        else:
-            for card in hand:
-                if card.suit is self.currentSuit:
-                    playable_cards.append(card)
-
-        # Player either has no card of current suit or only has hearts left.  Therefore, player can play anything
-        if len(playable_cards) is 0:
-            for card in hand:
+        for card in hand:
+            if Bitboard.card_bit(card) & playable_mask:
                 playable_cards.append(card)
 
         return playable_cards
 
+    def get_card_ui(self, card):
+        return self.card_ui_lookup.get(Bitboard.card_index(card), None)
+
+    def get_players(self):
+        return [self.player_one, self.player_two, self.player_three, self.player_four]
+
+    def close(self):
+        # AIs can hold worker processes, which are stopped once the game is over
+        for player in self.get_players():
+            player.ai.close()
 
     # Entry Function for playing hearts
     def play(self):
@@ -324,6 +394,25 @@ class Hearts:
             self.stateMachine.update()
             Engine.CardEngine.update()
             Engine.CardEngine.render()
+            if Engine.CardEngine.frames == 1:
+                CardLogging.log_file.info('Hearts: first frame %s seconds after starting the engine',
+                                          Engine.CardEngine.first_frame_time)
             self.clock.tick(20)
 
         return
+
+
+def get_front_sprite_names():
+    return [Constant.value_str[value] + " of " + Constant.suit_str[suit] for suit in range(1, 5)
+            for value in range(2, 15)]
+
+
+def build_asset_pack(file_path=ASSET_PACK_FILE, image_path="Res/img/Cards/", sound_path="Res/Sound/"):
+    """
+    Packs the card images, card backs and sounds into the asset pack Hearts loads at startup
+    :return: Number of assets written
+    """
+    names = get_front_sprite_names() + ["Card Back " + str(i) for i in range(1, 5)]
+    images = [(name, image_path + name + ".png") for name in names]
+    sounds = [(ACE_OF_SPADES_SOUND, sound_path + ACE_OF_SPADES_SOUND + ".wav")]
+    return AssetPack.build(file_path, images, sounds)
@@ -1,13 +1,21 @@
 import copy
+import multiprocessing
+import random
+import time
 
 from CardEngine import Engine
+from Core import Bitboard
 from Core import CardLogging
 from Core import Constant
+from Core.Player.AI import DoubleDummy
 from Core.Player.AI import _DecisionTree as DecisionTree
+from Core.Player.AI import _ISMCTS as ISMCTS
+from Core.Player.AI import _Playout as Playout
 
 
 class HumanAI:
     player = None
+    game = None
     _selected_card_ui = None
 
     def __init__(self):
@@ -16,6 +24,9 @@ class HumanAI:
     def set_player(self, player):
         self.player = player
 
+    def set_game(self, game):
+        self.game = game
+
     def pass_card(self, human_player, card):
         return
 
@@ -50,22 +61,17 @@ class HumanAI:
         self._selected_card_ui = None
         return card_ui
 
+    def close(self):
+        return
+
     def has_two_of_clubs(self):
-        for card in self.player.hand:
-            if card.suit is Constant.Suit.Clubs:
-                if card.value is Constant.Value.Two:
-                    return True
-        return False
+        return self.player.hand.has_card(Constant.Suit.Clubs, Constant.Value.Two) is not None
 
     def is_suit_in_hand(self, current_suit):
-        suit_in_hand = False
-        if self.player is not None:
+        if self.player is None or current_suit is None:
+            return False
 
-            for card in self.player.hand:
-                if card.suit is current_suit:
-                    suit_in_hand = True
-
-        return suit_in_hand
+        return self.player.hand.has_suit(current_suit)
 
     def player_select_card(self, card_ui):
         card_ui.move(0, -25, 0)
@@ -83,14 +89,18 @@ class HumanAI:
 class ComputerAI:
     def __init__(self):
         self.player = None
+        self.game = None
         self.decision_tree = _PassingDecisionTree()
         return
 
     def set_player(self, player):
         self.player = player
 
+    def set_game(self, game):
+        self.game = game
+
     def pass_cards(self, computer_player):
-        CardLogging.log_file.log('ComputerAI: ' + self.player.name + ': pass cards')
+        CardLogging.log_file.info('ComputerAI: %s: pass cards', self.player.name)
 
         cards_to_pass = []
 
@@ -257,6 +267,20 @@ class ComputerAI:
     def handle_keypress(self, event):
         return
 
+    def close(self):
+        """
+        Releases anything the AI holds once the game is over.  Nothing to release for ComputerAI
+        """
+        return
+
+    def set_seed(self, seed):
+        """
+        Seeds the random numbers of the AI for the game it is in.  ComputerAI draws no random numbers
+        :param seed: Seed drawn from the random numbers of the game
+        :return:
+        """
+        return
+
     # Functions used to pass Cards
     def determine_cards_to_pass(self):
 
@@ -312,12 +336,8 @@ class ComputerAI:
         # Pass Highest Diamonds, Clubs, Hearts, Spades in that order
 
     def has_card(self, suit, value):
-        for card in self.player.hand:
-            if card.suit is suit:
-                if card.value is value:
-                    return True, card
-
-        return False, None
+        card = self.player.hand.has_card(suit, value)
+        return card is not None, card
 
     def get_highest_cards(self, suit, cards_to_pass):
         number_cards_to_move = 3 - len(cards_to_pass)
@@ -335,78 +355,27 @@ class ComputerAI:
         return card_list
 
     def get_number_of_cards_with_suit(self, suit):
-        number = 0
-        for card in self.player.hand:
-            if card.suit is suit:
-                number += 1
-        CardLogging.log_file.log('ComputerAI: Number of ' + Constant.suit_str[suit] + ': ' + str(number))
+        number = self.player.hand.count_suit(suit)
+        CardLogging.log_file.info('ComputerAI: Number of %s: %s', Constant.suit_str[suit], number)
         return number
 
     def find_lowest_card(self, current_suit):
-        suit_pile = []
-        lowest_card = None
-
-        for card in self.player.hand:
-            if card.suit is current_suit:
-                suit_pile.append(card)
-
-        if len(suit_pile) is 0:
-            return None
-
-        for card in suit_pile:
-            if lowest_card is None:
-                lowest_card = card
-            else:
-                if card.value < lowest_card.value:
-                    lowest_card = card
-
-        return lowest_card
+        return self.player.hand.lowest_in_suit(current_suit)
 
     def find_highest_card(self, current_suit):
-        suit_pile = []
-        highest_card = None
-
-        for card in self.player.hand:
-            if card.suit is current_suit:
-                suit_pile.append(card)
-
-        if len(suit_pile) is 0:
-            return None
-
-        for card in suit_pile:
-            if highest_card is None:
-                highest_card = card
-            else:
-                if card.value > highest_card.value:
-                    highest_card = card
-
-        return highest_card
+        return self.player.hand.highest_in_suit(current_suit)
 
     def find_highest_card_under_value(self, current_suit, trick_pile):
 
         if trick_pile is None:
             return None
 
-        highest_card = None
-
         highest_trick_card = self.get_highest_card_in_trick_pile(current_suit, trick_pile)
-        card_list = self.get_all_cards_of_given_suit(current_suit)
 
-        if len(card_list) is 0:
+        if highest_trick_card is None:
             return None
 
-        elif highest_trick_card is None:
-            return None
-
-        else:
-            for card in card_list:
-                if card.value < highest_trick_card.value:
-                    if highest_card is None:
-                        highest_card = card
-                    elif card.value > highest_card.value:
-                        highest_card = card
-
-        return highest_card
+        return self.player.hand.highest_in_suit_below(current_suit, highest_trick_card.value)
 
     def get_highest_card_in_trick_pile(self, current_suit, trick_pile):
         highest_trick_card = None
@@ -420,12 +389,7 @@ class ComputerAI:
         return highest_trick_card
 
     def get_all_cards_of_given_suit(self, current_suit):
-        card_list = []
-        for card in self.player.hand:
-            if card.suit is current_suit:
-                card_list.append(card)
-
-        return card_list
+        return self.player.hand.cards_in_suit(current_suit)
 
     def pass_entire_suit(self, suit, cards_to_pass):
         num_cards_in_suit = self.get_number_of_cards_with_suit(suit)
@@ -434,9 +398,204 @@ class ComputerAI:
             Engine.CardEngine.transfer_list(cards_to_move, cards_to_pass)
 
 
+class MonteCarloAI(ComputerAI):
+    """
+    Plays by sampling.  Every sample deals the cards it hasn't seen to the other players, consistent with the
+    cards already played and the suits players are known to be out of, then plays each legal card and rolls
+    the round out with a quick policy.  The card with the lowest average points is played.  Near the end of
+    the round, samples can be solved exactly with the double dummy solver instead of rolled out.
+
+    Passing is the same as ComputerAI.
+    """
+    def __init__(self, rollouts=100, time_limit=None, processes=1, seed=None, endgame_tricks=0):
+        """
+        :param rollouts: Maximum number of samples per card played
+        :param time_limit: Seconds per card played, or None to only use the number of rollouts
+        :param processes: Number of processes the samples are split across.  None uses every core
+        :param seed: Seed for the samples.  None uses the system time
+        :param endgame_tricks: Number of tricks left at which samples are solved instead of rolled out.  0 never
+            solves
+        :return:
+        """
+        ComputerAI.__init__(self)
+        self.rollouts = rollouts
+        self.endgame_tricks = endgame_tricks
+        self.time_limit = time_limit
+        self.processes = processes
+        self.seed = seed
+        self.random = random.Random(seed)
+        self._pool = None
+
+    def __getstate__(self):
+        # Pools can't be sent to other processes
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        return state
+
+    def play_card(self, current_suit, trick_pile):
+        # Without the game there is nothing to sample from
+        if self.game is None:
+            return ComputerAI.play_card(self, current_suit, trick_pile)
+
+        players = self.game.get_players()
+        seat = players.index(self.player)
+        position = Playout.observe(players, seat, trick_pile, self.game.heartsBroken)
+
+        moves = Playout.equivalent_moves(position.legal_moves(), position.get_gone(seat))
+        if len(moves) == 1:
+            move = moves[0]
+        else:
+            move = self.choose_move(position, seat, moves)
+
+        card = self.player.hand.get_card(move)
+        CardLogging.log_file.info('MonteCarloAI: %s: play %s of %s', self.player.name, Constant.value_str[card.value],
+                                  Constant.suit_str[card.suit])
+        self.player.hand.remove(card)
+        return card
+
+    def choose_move(self, position, seat, moves):
+        """
+        :return: Move with the lowest average points over the samples
+        """
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.time() + self.time_limit
+
+        processes = self.processes
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        # Hand of the seat to move holds one card for every trick left
+        if len(self.player.hand) <= self.endgame_tricks:
+            evaluate_moves = DoubleDummy.evaluate_moves
+            evaluate_moves_task = DoubleDummy.evaluate_moves_task
+        else:
+            evaluate_moves = Playout.evaluate_moves
+            evaluate_moves_task = Playout.evaluate_moves_task
+
+        if processes == 1:
+            totals, count = evaluate_moves(position, seat, moves, self.rollouts, deadline, self.random.random())
+        else:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(processes)
+
+            # Every process gets its share of the samples and its own seed
+            rollouts = (self.rollouts + processes - 1) // processes
+            tasks = [(position, seat, moves, rollouts, deadline, self.random.random())
+                     for i in range(0, processes)]
+
+            totals = dict((move, 0) for move in moves)
+            count = 0
+            for process_totals, process_count in self._pool.map(evaluate_moves_task, tasks):
+                for move in moves:
+                    totals[move] += process_totals[move]
+                count += process_count
+
+        CardLogging.log_file.info('MonteCarloAI: %s: %s samples', self.player.name, count)
+        return min(moves, key=lambda move: totals[move])
+
+    def close(self):
+        """
+        Stops the worker processes, if any were started
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def set_seed(self, seed):
+        # A seed given when the AI was made is kept
+        if self.seed is None:
+            self.random.seed(seed)
+
+
+class ISMCTSAI(ComputerAI):
+    """
+    Plays with information set Monte Carlo tree search.  The tree is kept for the whole round, and after
+    each card the part of the tree matching what was actually played is searched further.
+
+    Passing is the same as ComputerAI.
+    """
+    def __init__(self, time_limit=0.05, iterations=None, max_nodes=ISMCTS.DEFAULT_MAX_NODES,
+                 exploration=ISMCTS.DEFAULT_EXPLORATION, seed=None):
+        """
+        :param time_limit: Seconds per card played, so a turn never holds up the frame longer than this.
+            None only uses the number of iterations
+        :param iterations: Maximum number of iterations per card played, or None to only use the time limit
+        :param max_nodes: Most nodes the tree may hold
+        :param exploration: How much less visited cards are favoured in the search
+        :param seed: Seed for the deals of the unseen cards.  None uses the system time
+        :return:
+        """
+        ComputerAI.__init__(self)
+        self.time_limit = time_limit
+        self.iterations = iterations
+        self.seed = seed
+        self.search = ISMCTS.Search(max_nodes, exploration, seed)
+        self._last_move = None
+
+    def play_card(self, current_suit, trick_pile):
+        if self.game is None:
+            return ComputerAI.play_card(self, current_suit, trick_pile)
+
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.time() + self.time_limit
+
+        players = self.game.get_players()
+        seat = players.index(self.player)
+        position = Playout.observe(players, seat, trick_pile, self.game.heartsBroken)
+
+        # Move the tree down past the cards played since this player's last card
+        moves = self.get_moves_since_last_move(players, trick_pile)
+        if moves is None:
+            self.search.reset()
+        else:
+            self.search.advance(moves, position.get_gone())
+
+        move = self.search.run(position, seat, deadline, self.iterations)
+        self.search.advance([move], position.get_gone())
+        self._last_move = move
+
+        card = self.player.hand.get_card(move)
+        CardLogging.log_file.info('ISMCTSAI: %s: play %s of %s after %s iterations, %s nodes', self.player.name,
+                                  Constant.value_str[card.value], Constant.suit_str[card.suit],
+                                  self.search.iterations, self.search.pool.nodes_in_use)
+        self.player.hand.remove(card)
+        return card
+
+    def set_seed(self, seed):
+        # A seed given when the AI was made is kept
+        if self.seed is None:
+            self.search.random.seed(seed)
+
+    def get_moves_since_last_move(self, players, trick_pile):
+        """
+        Cards played since this player's last card.  The player plays once every trick, so these are the cards
+        after its own in the last trick, then the cards of the current trick.
+        :return: List of card indices in the order they were played, or None at the start of a round
+        """
+        if self._last_move is None:
+            return None
+
+        for player in players:
+            for start in range(0, len(player.tricks), 4):
+                trick = [Bitboard.card_index(card_ui.card) for card_ui in player.tricks[start:start + 4]]
+                if self._last_move in trick:
+                    return trick[trick.index(self._last_move) + 1:] + \
+                        [Bitboard.card_index(card_ui.card) for card_ui in trick_pile]
+
+        # Last card is nowhere to be found, so a new round has started
+        return None
+
+
 class _PassingDecisionTree:
 
     _base_node = None
+    _compiled_tree = None
+
+    # Every passing tree is built the same way, so they all share one cache.  None turns the cache off
+    cache = DecisionTree.TreeCache()
 
     def __init__(self):
         # Check for queen of spades to pass, then check ace or king of spades
@@ -517,11 +676,24 @@ class _PassingDecisionTree:
         suit_check_spades.pass_node = highest_spades
         suit_check_spades.fail_node = None
 
+        self.compile()
+
+    def compile(self):
+        """
+        Flattens the nodes into the table process runs.  Called again after changing the base node or any node
+        of the tree.
+        """
+        self._compiled_tree = DecisionTree.CompiledTree(self.base_node)
+
     def process(self, player, possible_cards, trick_pile):
-        return self.base_node.process(player, possible_cards, trick_pile)
+        if self._compiled_tree is None:
+            self.compile()
+        return self._compiled_tree.process(player, possible_cards, trick_pile, self.cache)
 
     def set_base_node(self, base_node):
         self._base_node = base_node
+        self._compiled_tree = None
+
     def get_base_node(self):
         return self._base_node
 
@@ -0,0 +1,453 @@
+import random
+import time
+
+from Core import Bitboard
+from Core.Player.AI import Tablebase
+from Core.Player.AI import _Playout as Playout
+
+__author__ = 'Evan'
+
+
+'''
+Double dummy solver for the end of a round.
+
+With every hand known, the solver finds the fewest points one seat can end the round with when the other
+three seats play to give it as many points as possible.  Search is alpha-beta over the remaining cards:
+    -Cards in a run with nothing left between them are searched once (suit equivalence)
+    -Best card from the table is tried first, then the rollout policy's card, then the rest in order
+    -Positions at the start of a trick are kept in a transposition table keyed by Zobrist hashing
+    -Last tricks are looked up in the endgame tablebase when one is given and nobody can shoot the moon
+
+Points are after shooting the moon, so a seat that takes every point card ends with 0.
+
+Usage:
+    solver = Solver()
+    points, card = solver.solve(position, seat)
+'''
+
+DEFAULT_TABLE_SIZE = 1 << 16
+
+# Kind of bound stored in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Moon state of positions where two or more seats have taken points, so nobody can shoot the moon
+NO_MOON = 1 << Playout.NUMBER_OF_SEATS
+
+
+def _create_keys(seed):
+    rng = random.Random(seed)
+
+    def key():
+        return rng.getrandbits(64)
+
+    card_keys = [[key() for index in range(0, 52)] for seat in range(0, Playout.NUMBER_OF_SEATS)]
+    leader_keys = [key() for seat in range(0, Playout.NUMBER_OF_SEATS)]
+    hearts_broken_key = key()
+    queen_key = key()
+    points_keys = [[key() for points in range(0, 27)] for seat in range(0, Playout.NUMBER_OF_SEATS)]
+    moon_keys = [key() for state in range(0, NO_MOON + 1)]
+    return card_keys, leader_keys, hearts_broken_key, queen_key, points_keys, moon_keys
+
+
+class TranspositionTable(object):
+    """
+    Fixed size table with two entries per slot.  The first entry keeps the position with the most cards left,
+    as it saved the most search, and the second entry is always replaced.
+    """
+    def __init__(self, size=DEFAULT_TABLE_SIZE):
+        # Size is rounded down to a power of two so a slot is a mask of the key
+        self.size = 1 << (size.bit_length() - 1)
+        self.mask = self.size - 1
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+        self.hits = 0
+        self.stores = 0
+
+    def clear(self):
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+        self.hits = 0
+        self.stores = 0
+
+    def probe(self, key):
+        """
+        :return: Entry (key, cards left, value, bound, move), or None
+        """
+        slot = key & self.mask
+        entry = self.deep[slot]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+
+        entry = self.recent[slot]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, cards_left, value, bound, move):
+        slot = key & self.mask
+        entry = (key, cards_left, value, bound, move)
+        self.stores += 1
+
+        deep = self.deep[slot]
+        if deep is None or deep[0] == key or cards_left >= deep[1]:
+            self.deep[slot] = entry
+        else:
+            self.recent[slot] = entry
+
+
+class Solver(object):
+    """
+    Alpha-beta search of the rest of the round, from the point of view of one seat
+    """
+    def __init__(self, table_size=DEFAULT_TABLE_SIZE, seed=0, tablebase=None):
+        """
+        :param table_size: Number of slots in the transposition table
+        :param seed: Seed of the Zobrist keys
+        :param tablebase: Tablebase.Tablebase for the last tricks, or None to search them
+        :return:
+        """
+        self.table = TranspositionTable(table_size)
+        self.tablebase = tablebase
+        self.card_keys, self.leader_keys, self.hearts_broken_key, self.queen_key, self.points_keys, \
+            self.moon_keys = \
+            _create_keys(seed)
+        self.nodes = 0
+
+        # Number of cutoffs each card of each seat has caused, used to order moves
+        self.history = [[0] * 52 for seat in range(0, Playout.NUMBER_OF_SEATS)]
+
+        # State of the position being searched
+        self._seat = 0
+        self._hands = None
+        self._trick = None
+        self._leader = 0
+        self._suit = None
+        self._hearts_broken = False
+        self._played = 0
+        self._points = None
+        self._point_takers = 0
+
+    def solve(self, position, seat=None):
+        """
+        :param position: Position with every hand filled in
+        :param seat: Seat whose points are minimized.  Defaults to the seat to move
+        :return: Points the seat ends the round with, and the best card for the seat to move
+        """
+        if seat is None:
+            seat = position.to_move()
+
+        self._seat = seat
+        self._hands = position.hands[:]
+        self._trick = position.trick[:]
+        self._leader = position.leader
+        self._suit = position.current_suit
+        self._hearts_broken = position.hearts_broken
+        self._played = position.played
+        self._points = [Bitboard.points(taken) for taken in position.taken]
+        self._point_takers = 0
+        for taken_seat in range(0, Playout.NUMBER_OF_SEATS):
+            if position.taken[taken_seat] & Bitboard.POINT_CARDS:
+                self._point_takers |= 1 << taken_seat
+
+        self.nodes = 0
+
+        # MTD(f): zero window searches close in on the value from both sides, starting at the points taken.
+        # Only a search that proves a bound for the seat to move also proves its card is the best one.
+        maximizing = position.to_move() != seat
+        value = self._points[seat]
+        move = None
+        lower = -1
+        upper = 27
+        while lower < upper:
+            beta = max(value, lower + 1)
+            value, search_move = self._search(beta - 1, beta, True)
+            if value < beta:
+                upper = value
+                if not maximizing:
+                    move = search_move
+            else:
+                lower = value
+                if maximizing:
+                    move = search_move
+        return value, move
+
+    def _get_moon_state(self):
+        takers = self._point_takers
+        if takers & (takers - 1):
+            return NO_MOON
+        return takers
+
+    def _get_key(self):
+        # Cards are hashed by their rank among the cards still in play, so positions that only differ in
+        # which cards were played earlier share an entry
+        key = 0
+        hands = self._hands
+        for suit in Playout.SUITS:
+            shift = Bitboard.SUIT_SHIFT[suit]
+            lanes = [(hand >> shift) & Bitboard.LANE for hand in hands]
+            remaining = lanes[0] | lanes[1] | lanes[2] | lanes[3]
+            rank = shift
+            while remaining:
+                low = remaining & -remaining
+                remaining ^= low
+                for seat in range(0, Playout.NUMBER_OF_SEATS):
+                    if lanes[seat] & low:
+                        key ^= self.card_keys[seat][rank]
+                        if shift + low.bit_length() - 1 == Playout.QUEEN_OF_SPADES:
+                            key ^= self.queen_key
+                        break
+                rank += 1
+
+        key ^= self.leader_keys[self._leader] ^ self.points_keys[self._seat][self._points[self._seat]] ^ \
+            self.moon_keys[self._get_moon_state()]
+        if self._hearts_broken:
+            key ^= self.hearts_broken_key
+        return key
+
+    def _get_result(self):
+        # Shooting the moon: one seat took all 26 points
+        for seat in range(0, Playout.NUMBER_OF_SEATS):
+            if self._points[seat] == 26:
+                return 0 if seat == self._seat else 26
+        return self._points[self._seat]
+
+    def _get_moves(self, mover, table_move):
+        """
+        Moves in search order: the table move, then the cards most likely to be best for the mover.  The seat
+        being solved for ducks under the trick and dumps points when out of the suit, while the other seats let
+        it win tricks and give it points.
+        """
+        hand = self._hands[mover]
+        if self._played == 0 and hand & (1 << Playout.TWO_OF_CLUBS):
+            return [Playout.TWO_OF_CLUBS]
+
+        trick = self._trick
+        legal = Bitboard.legal_moves(hand, self._suit if trick else None, self._hearts_broken)
+
+        # Cards in the current trick can still win it, so they are not gone
+        gone = self._played | hand
+        lane = self._suit - 1 if trick else -1
+        winning = -1
+        winner = None
+        seat_played = False
+        for seat, index in trick:
+            gone &= ~(1 << index)
+            if index // Bitboard.SUIT_SIZE == lane and index > winning:
+                winning = index
+                winner = seat
+            if seat == self._seat:
+                seat_played = True
+
+        moves = Playout.equivalent_moves(legal, gone)
+        if len(moves) > 1:
+            history = self.history[mover]
+            orders = []
+            for move in moves:
+                value = move % Bitboard.SUIT_SIZE
+                if not trick:
+                    order = value
+                else:
+                    if move == Playout.QUEEN_OF_SPADES:
+                        dump = -40 - value
+                    elif move // Bitboard.SUIT_SIZE == 3:
+                        dump = -20 - value
+                    else:
+                        dump = -value
+
+                    follows = move // Bitboard.SUIT_SIZE == lane
+                    overtakes = follows and move > winning
+                    if mover == self._seat or winner == self._seat:
+                        if overtakes:
+                            order = 100 + value
+                        elif mover == self._seat and follows:
+                            order = -value
+                        else:
+                            order = dump
+                    elif not seat_played:
+                        order = value if follows else dump
+                    else:
+                        order = -dump
+                orders.append((order, -history[move], move))
+
+            orders.sort()
+            moves = [order[2] for order in orders]
+
+        if table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+        return moves
+
+    def _search(self, alpha, beta, root=False):
+        self.nodes += 1
+
+        # Without a moon to shoot, the seat ends somewhere between its points now and those plus what is left
+        if not root and self._get_moon_state() == NO_MOON:
+            lowest = self._points[self._seat]
+            if lowest >= beta:
+                return lowest
+            highest = lowest + 26 - sum(self._points)
+            if highest <= alpha or highest == lowest:
+                return highest
+
+        key = None
+        table_move = None
+        cards_left = 0
+        if not self._trick:
+            cards_left = Bitboard.count(self._hands[0] | self._hands[1] | self._hands[2] | self._hands[3])
+            if cards_left == 0:
+                return (self._get_result(), None) if root else self._get_result()
+
+            # Tablebase values are what is still to be taken, which only adds up this way without a moon
+            if not root and self.tablebase is not None and self._get_moon_state() == NO_MOON and \
+                    cards_left <= Playout.NUMBER_OF_SEATS * self.tablebase.tricks:
+                entry = self.tablebase.probe_hands(self._hands, self._leader, self._hearts_broken)
+                if entry is not None:
+                    return self._points[self._seat] + entry[1][self._seat]
+
+            key = self._get_key()
+            entry = self.table.probe(key)
+            if entry is not None:
+                value, bound, table_move = entry[2], entry[3], entry[4]
+                if not root:
+                    if bound == EXACT:
+                        return value
+                    if bound == LOWER and value >= beta:
+                        return value
+                    if bound == UPPER and value <= alpha:
+                        return value
+
+        mover = (self._leader + 3 * len(self._trick)) % Playout.NUMBER_OF_SEATS
+        maximizing = mover != self._seat
+        original_alpha = alpha
+        original_beta = beta
+
+        best_value = -1 if maximizing else 27
+        best_move = None
+        for move in self._get_moves(mover, table_move):
+            value = self._play_and_search(mover, move, alpha, beta)
+
+            if maximizing:
+                if value > best_value:
+                    best_value = value
+                    best_move = move
+                if best_value > alpha:
+                    alpha = best_value
+            else:
+                if value < best_value:
+                    best_value = value
+                    best_move = move
+                if best_value < beta:
+                    beta = best_value
+
+            if alpha >= beta:
+                self.history[mover][move] += 1
+                break
+
+        if key is not None:
+            if best_value <= original_alpha:
+                bound = UPPER
+            elif best_value >= original_beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            self.table.store(key, cards_left, best_value, bound, best_move)
+
+        if root:
+            return best_value, best_move
+        return best_value
+
+    def _play_and_search(self, mover, move, alpha, beta):
+        bit = 1 << move
+        self._hands[mover] &= ~bit
+        self._played |= bit
+
+        previous_suit = self._suit
+        if not self._trick:
+            self._suit = Bitboard.get_suit(move)
+        self._trick.append((mover, move))
+
+        if len(self._trick) < Playout.NUMBER_OF_SEATS:
+            value = self._search(alpha, beta)
+            self._trick.pop()
+        else:
+            value = self._finish_trick_and_search(alpha, beta)
+
+        self._suit = previous_suit
+        self._played &= ~bit
+        self._hands[mover] |= bit
+        return value
+
+    def _finish_trick_and_search(self, alpha, beta):
+        trick = self._trick
+        leader = self._leader
+        hearts_broken = self._hearts_broken
+        point_takers = self._point_takers
+
+        winner = None
+        highest = -1
+        mask = 0
+        for seat, index in trick:
+            mask |= 1 << index
+            if Bitboard.get_suit(index) == self._suit and index > highest:
+                highest = index
+                winner = seat
+
+        points = Bitboard.points(mask)
+        self._points[winner] += points
+        if points:
+            self._point_takers |= 1 << winner
+        if mask & Bitboard.HEARTS:
+            self._hearts_broken = True
+        self._leader = winner
+        self._trick = []
+
+        value = self._search(alpha, beta)
+
+        self._trick = trick
+        self._trick.pop()
+        self._leader = leader
+        self._hearts_broken = hearts_broken
+        self._point_takers = point_takers
+        self._points[winner] -= points
+        return value
+
+
+# Solver kept by each process, so its table carries over between calls
+_solver = None
+
+
+def evaluate_moves(position, seat, moves, samples, deadline=None, seed=None):
+    """
+    Same as _Playout.evaluate_moves, but every sample is solved exactly instead of rolled out.  Meant for the
+    last few tricks, where solving is cheap and much more accurate than the rollout policy.
+    :return: Dictionary of total points for each move, and the number of samples played
+    """
+    global _solver
+    if _solver is None:
+        _solver = Solver(tablebase=Tablebase.load())
+
+    rng = random.Random(seed)
+    totals = dict((move, 0) for move in moves)
+
+    count = 0
+    while count < samples:
+        if count > 0 and deadline is not None and time.time() > deadline:
+            break
+
+        world = Playout.determinize(position, seat, rng)
+        for move in moves:
+            result = world.copy()
+            result.play(move)
+            totals[move] += _solver.solve(result, seat)[0]
+        count += 1
+
+    return totals, count
+
+
+def evaluate_moves_task(task):
+    # Pool.map only passes a single argument
+    return evaluate_moves(*task)
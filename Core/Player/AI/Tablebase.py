@@ -0,0 +1,356 @@
+import itertools
+import mmap
+import os
+import struct
+
+from Core import Bitboard
+from Core.Constant import Suit
+from Core.Player.AI import _Playout as Playout
+
+__author__ = 'Evan'
+
+
+'''
+Endgame tablebase for the last tricks of a round.
+
+Once only a few tricks are left, every way the remaining cards can be split between the hands is enumerated
+and solved ahead of time.  Positions are stored in a canonical form, so positions that play out the same share
+one entry:
+    -Seats are counted in play order from the leader
+    -Cards are kept by their rank among the cards still in play, not their value
+    -Clubs, diamonds and spades without the Queen carry no points, so they are sorted into a fixed order
+
+For every position the table keeps the leader's best card and, for each seat, the fewest points that seat can
+take in the tricks left when the other three seats play to give it as many as possible.  These are the same
+values DoubleDummy.Solver finds, but they only hold when nobody can shoot the moon any more.
+
+The file is a sorted array of fixed size records that is memory mapped, so loading it costs nothing and a
+lookup is a binary search over the mapped pages.
+
+Usage:
+    build('Res/Endgame.htb', tricks=2)
+
+    tablebase = load('Res/Endgame.htb')
+    entry = tablebase.probe(position)
+'''
+
+DEFAULT_FILE = os.path.join('Res', 'Endgame.htb')
+
+MAGIC = 'HTB1'
+HEADER = struct.Struct('<4sII')
+RECORD = struct.Struct('<QI')
+
+# Most tricks a key has room for
+MAX_TRICKS = 4
+_SEAT_BITS = 2 * Playout.NUMBER_OF_SEATS * MAX_TRICKS
+
+# Payload of a record: the leader's best card as a position in the canonical order, then 5 bits of points
+# for each seat in play order
+_POINTS_BITS = 5
+_POINTS_MASK = (1 << _POINTS_BITS) - 1
+_MOVE_SHIFT = Playout.NUMBER_OF_SEATS * _POINTS_BITS
+
+_PLAIN_SUITS = [Suit.Clubs, Suit.Diamonds, Suit.Spades]
+
+
+def get_key(hands, leader, hearts_broken):
+    """
+    Canonical key of a position at the start of a trick
+    :param hands: Bitboard of the hand of each seat
+    :param leader: Seat leading the trick
+    :param hearts_broken: Whether hearts have been broken
+    :return: Key, and the card indices in the canonical order the key lists them in
+    """
+    # Relative seat of each card in play order from the leader, lowest card of each suit first
+    runs = {}
+    for suit in Playout.SUITS:
+        shift = Bitboard.SUIT_SHIFT[suit]
+        run = []
+        for position in range(0, Bitboard.SUIT_SIZE):
+            index = shift + position
+            bit = 1 << index
+            for seat in range(0, Playout.NUMBER_OF_SEATS):
+                if hands[seat] & bit:
+                    run.append((3 * (seat - leader) % Playout.NUMBER_OF_SEATS, index))
+                    break
+        runs[suit] = run
+
+    hearts = runs[Suit.Hearts]
+    queen_run = []
+    queen_position = 0
+    plain_runs = [runs[Suit.Clubs], runs[Suit.Diamonds]]
+    spades = runs[Suit.Spades]
+    indices = [index for seat, index in spades]
+    if Playout.QUEEN_OF_SPADES in indices:
+        queen_run = spades
+        queen_position = indices.index(Playout.QUEEN_OF_SPADES)
+    else:
+        plain_runs.append(spades)
+
+    plain_runs.sort(key=lambda run: (len(run), [seat for seat, index in run]), reverse=True)
+    while len(plain_runs) < len(_PLAIN_SUITS):
+        plain_runs.append([])
+
+    # Hearts can't be led before they are broken, but that only matters while some are left
+    key = 1 if hearts_broken or not hearts else 0
+    for length in [len(hearts), len(queen_run), queen_position] + [len(run) for run in plain_runs]:
+        key = (key << 4) | length
+
+    seats = 0
+    cards = []
+    for run in [hearts, queen_run] + plain_runs:
+        for seat, index in run:
+            seats = (seats << 2) | seat
+            cards.append(index)
+
+    return (key << _SEAT_BITS) | seats, cards
+
+
+def _get_payload(move, points):
+    payload = move
+    for seat_points in points:
+        payload = (payload << _POINTS_BITS) | seat_points
+    return payload
+
+
+def _get_points(payload):
+    points = []
+    for shift in range(_MOVE_SHIFT - _POINTS_BITS, -1, -_POINTS_BITS):
+        points.append((payload >> shift) & _POINTS_MASK)
+    return points
+
+
+class Tablebase(object):
+    """
+    Memory mapped tablebase file
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.tricks, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or self.tricks > MAX_TRICKS or \
+                len(self._map) != HEADER.size + self.count * RECORD.size:
+            self.close()
+            raise ValueError(file_path + ' is not a tablebase file')
+
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def find(self, key):
+        """
+        :return: Payload stored for the key, or None
+        """
+        low = 0
+        high = self.count
+        while low < high:
+            middle = (low + high) // 2
+            record_key, payload = RECORD.unpack_from(self._map, HEADER.size + middle * RECORD.size)
+            if record_key < key:
+                low = middle + 1
+            elif record_key > key:
+                high = middle
+            else:
+                return payload
+        return None
+
+    def probe(self, position):
+        """
+        :param position: Position with every hand filled in
+        :return: Leader's best card and the points each seat takes in the tricks left, or None if the position
+            isn't in the table.  Only positions at the start of a trick are
+        """
+        if position.trick:
+            return None
+        return self.probe_hands(position.hands, position.leader, position.hearts_broken)
+
+    def probe_hands(self, hands, leader, hearts_broken):
+        """
+        Same as probe, for a position given by its parts
+        """
+        cards_left = Bitboard.count(hands[0] | hands[1] | hands[2] | hands[3])
+        if cards_left == 0 or cards_left > Playout.NUMBER_OF_SEATS * self.tricks:
+            return None
+
+        key, cards = get_key(hands, leader, hearts_broken)
+        payload = self.find(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        # Points are stored in play order from the leader
+        relative_points = _get_points(payload)
+        points = [0] * Playout.NUMBER_OF_SEATS
+        for relative_seat in range(0, Playout.NUMBER_OF_SEATS):
+            points[(leader + 3 * relative_seat) % Playout.NUMBER_OF_SEATS] = relative_points[relative_seat]
+        return cards[payload >> _MOVE_SHIFT], points
+
+
+def load(file_path=DEFAULT_FILE):
+    """
+    :return: Tablebase, or None if the file doesn't exist
+    """
+    if not os.path.exists(file_path):
+        return None
+    return Tablebase(file_path)
+
+
+# Generation functions
+def _get_compositions(number_of_cards):
+    """
+    Number of cards of every kind in a canonical position: hearts, spades with the Queen, the Queen's position
+    among those spades, and the suits without points from longest to shortest
+    """
+    compositions = []
+    for hearts in range(0, min(number_of_cards, Bitboard.SUIT_SIZE) + 1):
+        for queen_run in range(0, min(number_of_cards - hearts, Bitboard.SUIT_SIZE) + 1):
+            # Only the King and Ace are above the Queen, and the Two to the Jack below it
+            if queen_run == 0:
+                queen_positions = [0]
+            else:
+                queen_positions = range(max(0, queen_run - 3), min(queen_run, 11))
+
+            plain_count = 3 if queen_run == 0 else 2
+            rest = number_of_cards - hearts - queen_run
+            for lengths in itertools.product(range(0, min(rest, Bitboard.SUIT_SIZE) + 1), repeat=plain_count):
+                if sum(lengths) != rest or list(lengths) != sorted(lengths, reverse=True):
+                    continue
+                for queen_position in queen_positions:
+                    compositions.append((hearts, queen_run, queen_position, lengths))
+    return compositions
+
+
+def _get_runs(composition):
+    """
+    :return: Card indices of each run of the composition, in canonical order
+    """
+    hearts, queen_run, queen_position, lengths = composition
+    runs = [[Bitboard.get_index(Suit.Hearts, 2 + i) for i in range(0, hearts)]]
+
+    values = range(2, 2 + queen_position) + [12] + range(13, 13 + queen_run - queen_position - 1)
+    runs.append([Bitboard.get_index(Suit.Spades, value) for value in values[:queen_run]])
+
+    suits = _PLAIN_SUITS[:len(lengths)]
+    for suit, length in zip(suits, lengths):
+        runs.append([Bitboard.get_index(suit, 2 + i) for i in range(0, length)])
+    return runs
+
+
+def _solve_trick(hands, leader, hearts_broken, table):
+    """
+    Solves the trick being started for every seat at once, using the table for the tricks after it
+    :return: Leader's best card, and the fewest points each seat can take
+    """
+    def search(trick, suit):
+        if len(trick) == Playout.NUMBER_OF_SEATS:
+            winner = None
+            highest = -1
+            mask = 0
+            for seat, index in trick:
+                mask |= 1 << index
+                if Bitboard.get_suit(index) == suit and index > highest:
+                    highest = index
+                    winner = seat
+
+            trick_points = Bitboard.points(mask)
+            child_hands = [hand & ~mask for hand in hands]
+            if child_hands[0] | child_hands[1] | child_hands[2] | child_hands[3]:
+                key, cards = get_key(child_hands, winner, hearts_broken or mask & Bitboard.HEARTS != 0)
+                points = _get_points(table[key])
+                points = [points[3 * (seat - winner) % Playout.NUMBER_OF_SEATS]
+                          for seat in range(0, Playout.NUMBER_OF_SEATS)]
+            else:
+                points = [0] * Playout.NUMBER_OF_SEATS
+            points[winner] += trick_points
+            return points, None
+
+        mover = (leader + 3 * len(trick)) % Playout.NUMBER_OF_SEATS
+        moves = Bitboard.legal_moves(hands[mover], suit, hearts_broken)
+
+        # Each seat takes its fewest points on its own turns and the other seats give it the most
+        best = None
+        best_move = None
+        for move in Bitboard.indices(moves):
+            hands[mover] &= ~(1 << move)
+            points, child_move = search(trick + [(mover, move)], suit if trick else Bitboard.get_suit(move))
+            hands[mover] |= 1 << move
+
+            if best is None:
+                best = points[:]
+                best_move = move
+                continue
+            for seat in range(0, Playout.NUMBER_OF_SEATS):
+                if seat == mover:
+                    if points[seat] < best[seat]:
+                        best[seat] = points[seat]
+                        best_move = move
+                elif points[seat] > best[seat]:
+                    best[seat] = points[seat]
+        return best, best_move
+
+    return search([], None)
+
+
+def _get_assignments(counts):
+    """
+    Every order of relative seats that has each seat the given number of times
+    """
+    if not any(counts):
+        yield []
+        return
+
+    for relative_seat in range(0, Playout.NUMBER_OF_SEATS):
+        if counts[relative_seat]:
+            counts[relative_seat] -= 1
+            for assignment in _get_assignments(counts):
+                yield [relative_seat] + assignment
+            counts[relative_seat] += 1
+
+
+def build(file_path=DEFAULT_FILE, tricks=2):
+    """
+    Enumerates and solves every position with up to the given number of tricks left, and writes the table.
+    Two tricks take a few minutes, and every trick more multiplies the work by several hundred.
+    :param file_path: File to write
+    :param tricks: Number of tricks left the table covers, 1 to MAX_TRICKS
+    :return: Number of positions written
+    """
+    if not 0 < tricks <= MAX_TRICKS:
+        raise ValueError('Tablebase covers 1 to ' + str(MAX_TRICKS) + ' tricks, got ' + str(tricks))
+
+    # Tricks are solved from the last one back, as each one looks up the positions it leads to
+    table = {}
+    for level in range(1, tricks + 1):
+        for composition in _get_compositions(Playout.NUMBER_OF_SEATS * level):
+            cards = [index for run in _get_runs(composition) for index in run]
+            for hearts_broken in ([False, True] if composition[0] else [True]):
+                for assignment in _get_assignments([level] * Playout.NUMBER_OF_SEATS):
+                    hands = [0] * Playout.NUMBER_OF_SEATS
+                    for relative_seat, index in zip(assignment, cards):
+                        hands[3 * relative_seat % Playout.NUMBER_OF_SEATS] |= 1 << index
+
+                    key, key_cards = get_key(hands, 0, hearts_broken)
+                    if key in table:
+                        continue
+
+                    points, move = _solve_trick(hands, 0, hearts_broken, table)
+                    relative_points = [points[3 * relative_seat % Playout.NUMBER_OF_SEATS]
+                                       for relative_seat in range(0, Playout.NUMBER_OF_SEATS)]
+                    table[key] = _get_payload(key_cards.index(move), relative_points)
+
+    temp_file = file_path + '.tmp'
+    with open(temp_file, 'wb') as tablebase_file:
+        tablebase_file.write(HEADER.pack(MAGIC, tricks, len(table)))
+        for key in sorted(table):
+            tablebase_file.write(RECORD.pack(key, table[key]))
+
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    os.rename(temp_file, file_path)
+    return len(table)
@@ -1,5 +1,8 @@
+from Core import Bitboard
 from Core import Constant
+import collections
 import copy
+import operator
 
 __author__ = 'Evan'
 
@@ -29,7 +32,7 @@ class _Node(object):
 
     def _process_pass_node(self, player, possible_cards, trick_pile):
         if self._pass_node is not None:
-            for action in self.pass_action_list:
+            for action in self._pass_action_list:
                 action.process(player, possible_cards, trick_pile)
             return self._pass_node.process(player, possible_cards, trick_pile)
         else:
@@ -37,7 +40,7 @@ class _Node(object):
 
     def _process_fail_node(self, player, possible_cards, trick_pile):
         if self._fail_node is not None:
-            for action in self.fail_action_list:
+            for action in self._fail_action_list:
                 action.process(player, possible_cards, trick_pile)
             return self._fail_node.process(player, possible_cards, trick_pile)
         else:
@@ -302,3 +305,248 @@ class SelectCardLeaf(_LeafNode):
                     return card
 
         return None
+
+
+# Kinds of instruction in a CompiledTree
+_ANY_IN_MASK = 0
+_COUNT_IN_MASK = 1
+_SELECT_HIGHEST = 2
+_SELECT_LOWEST = 3
+_SELECT_CARD = 4
+_PROCESS_NODE = 5
+
+DEFAULT_CACHE_SIZE = 1 << 16
+
+_COMPARISONS = {Constant.ComparisonType.Equal: operator.eq,
+                Constant.ComparisonType.GreaterThan: operator.gt,
+                Constant.ComparisonType.GreaterThanOrEqual: operator.ge,
+                Constant.ComparisonType.LessThan: operator.lt,
+                Constant.ComparisonType.LessThanOrEqual: operator.le}
+
+
+def _get_value_mask(comparison_value, comparison_type):
+    """
+    :return: Bitboard of every card whose value passes the comparison
+    """
+    comparison = _COMPARISONS.get(comparison_type, None)
+    mask = 0
+    if comparison is None:
+        return mask
+
+    for suit in [Constant.Suit.Clubs, Constant.Suit.Diamonds, Constant.Suit.Spades, Constant.Suit.Hearts]:
+        for value in range(Constant.Value.Two, Constant.Value.Ace + 1):
+            if comparison(value, comparison_value):
+                mask |= Bitboard.get_bit(suit, value)
+    return mask
+
+
+class CompiledTree(object):
+    """
+    Node graph flattened into a table of instructions.  Every check becomes a bitboard of the cards that pass
+    it, worked out once when the tree is compiled, so processing the tree only ANDs masks together and walks the
+    table by index.  No lists are copied, and the list of cards a node narrows down to is only built for pass
+    and fail actions or for node types the compiler doesn't know, which are run as they are.
+
+    Row of the table: [kind, mask, limit, pass index, fail index, pass actions, fail actions, node].  An index
+    of -1 is a missing node, which ends processing with None.
+
+    Nodes are read when the tree is compiled, so a tree changed afterwards has to be compiled again.
+
+    Version of the tree is a hash of its table, so trees built the same way share it.  Trees with actions or
+    node types the compiler doesn't know may depend on more than the cards, and have no version.
+    """
+    def __init__(self, base_node):
+        self.instructions = []
+        self._add_node(base_node, {})
+
+        self.version = None
+        if all(row[0] != _PROCESS_NODE and not row[5] and not row[6] for row in self.instructions):
+            self.version = hash(tuple(tuple(row[:5]) for row in self.instructions))
+
+    def _add_node(self, node, indices):
+        if node is None:
+            return -1
+
+        # Nodes can be shared by several parents, and only need one row
+        if id(node) in indices:
+            return indices[id(node)]
+
+        index = len(self.instructions)
+        indices[id(node)] = index
+        row = [_PROCESS_NODE, 0, 0, -1, -1, tuple(node.pass_action_list), tuple(node.fail_action_list), node]
+        self.instructions.append(row)
+
+        node_type = type(node)
+        if node_type is ValueCheckNode:
+            row[0] = _ANY_IN_MASK
+            row[1] = _get_value_mask(node.comparison_value, node.comparison_type)
+        elif node_type is SuitCheckNode:
+            row[0] = _ANY_IN_MASK
+            row[1] = Bitboard.SUIT_MASK[node.suit]
+        elif node_type is CardCheckNode:
+            row[0] = _ANY_IN_MASK
+            row[1] = Bitboard.get_bit(node.suit, node.value)
+        elif node_type is NumberInSuitCheckNode:
+            row[0] = _COUNT_IN_MASK
+            row[1] = Bitboard.SUIT_MASK[node.suit]
+            row[2] = node.comparison_number
+        elif node_type is SelectHighestValueLeaf:
+            row[0] = _SELECT_HIGHEST
+        elif node_type is SelectLowestValueLeaf:
+            row[0] = _SELECT_LOWEST
+        elif node_type is SelectCardLeaf:
+            row[0] = _SELECT_CARD
+            row[1] = Bitboard.get_bit(node.suit, node.value)
+
+        if row[0] in (_ANY_IN_MASK, _COUNT_IN_MASK):
+            row[3] = self._add_node(node.pass_node, indices)
+            row[4] = self._add_node(node.fail_node, indices)
+
+        return index
+
+    def process(self, player, possible_cards, trick_pile, cache=None):
+        """
+        Same as processing the base node of the tree the table was compiled from
+        :param cache: TreeCache to look the cards up in first, or None
+        """
+        if cache is None or self.version is None:
+            return self._run(player, possible_cards, trick_pile)[0]
+
+        mask = Bitboard.get_mask(possible_cards)
+        key = (self.version, mask)
+        index = cache.get(key)
+        if index is not None:
+            return _get_card(possible_cards, index) if index >= 0 else None
+
+        card, order_dependent = self._run(player, possible_cards, trick_pile)
+        if not order_dependent:
+            cache.put(key, Bitboard.card_index(card) if card is not None else -1)
+        return card
+
+    def _run(self, player, possible_cards, trick_pile):
+        """
+        :return: Card picked, and whether a different order of the same cards could have picked another one
+        """
+        if not self.instructions:
+            return None, False
+
+        instructions = self.instructions
+        mask = Bitboard.get_mask(possible_cards)
+        index = 0
+        while True:
+            kind, node_mask, limit, pass_index, fail_index, pass_actions, fail_actions, node = instructions[index]
+
+            if kind == _ANY_IN_MASK or kind == _COUNT_IN_MASK:
+                matched = mask & node_mask
+                if kind == _ANY_IN_MASK:
+                    passed = matched != 0
+                else:
+                    passed = 0 < Bitboard.count(matched) <= limit
+
+                if passed:
+                    index, actions, mask = pass_index, pass_actions, matched
+                else:
+                    index, actions = fail_index, fail_actions
+
+                if index < 0:
+                    return None, False
+                if actions:
+                    cards = _cards_in_mask(possible_cards, mask)
+                    for action in actions:
+                        action.process(player, cards, trick_pile)
+                continue
+
+            # First card found wins a tie, so ties depend on the order of the cards
+            if kind == _SELECT_HIGHEST:
+                highest_card = None
+                tied = False
+                for card in possible_cards:
+                    if mask & Bitboard.card_bit(card):
+                        if highest_card is None or card.value > highest_card.value:
+                            highest_card = card
+                            tied = False
+                        elif card.value == highest_card.value:
+                            tied = True
+                return highest_card, tied
+
+            if kind == _SELECT_LOWEST:
+                lowest_card = None
+                tied = False
+                for card in possible_cards:
+                    if mask & Bitboard.card_bit(card):
+                        if lowest_card is None or card.value < lowest_card.value:
+                            lowest_card = card
+                            tied = False
+                        elif card.value == lowest_card.value:
+                            tied = True
+                return lowest_card, tied
+
+            if kind == _SELECT_CARD:
+                if mask & node_mask:
+                    for card in possible_cards:
+                        if Bitboard.card_bit(card) == node_mask:
+                            return card, False
+                return None, False
+
+            return node.process(player, _cards_in_mask(possible_cards, mask), trick_pile), True
+
+
+class TreeCache(object):
+    """
+    Least recently used cache of the cards picked by compiled trees, keyed by the version of the tree and the
+    bitboard of the cards it was given.  Cards are kept as indices, so entries work for any copy of the cards.
+    """
+    def __init__(self, size=DEFAULT_CACHE_SIZE):
+        """
+        :param size: Most entries kept before the least recently used one is dropped
+        :return:
+        """
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        :return: Index of the card, -1 if the tree picked no card, or None if the key isn't cached
+        """
+        index = self._entries.pop(key, None)
+        if index is None:
+            self.misses += 1
+            return None
+
+        # Entries are kept in order of use, most recent last
+        self._entries[key] = index
+        self.hits += 1
+        return index
+
+    def put(self, key, index):
+        self._entries.pop(key, None)
+        self._entries[key] = index
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+
+def _get_card(cards, index):
+    if isinstance(cards, Bitboard.Hand):
+        return cards.get_card(index)
+
+    for card in cards:
+        if Bitboard.card_index(card) == index:
+            return card
+    return None
+
+
+def _cards_in_mask(cards, mask):
+    """
+    :return: List of the cards that are in the mask, in the order of the cards
+    """
+    return [card for card in cards if mask & Bitboard.card_bit(card)]
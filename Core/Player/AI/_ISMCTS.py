@@ -0,0 +1,227 @@
+import math
+import random
+import time
+
+from Core import Bitboard
+from Core.Player.AI import _Playout as Playout
+
+__author__ = 'Evan'
+
+
+'''
+Information set Monte Carlo tree search.
+
+Every iteration deals the unseen cards again, then walks down one tree that is shared by all deals.  Only
+children whose card is legal in the current deal can be picked, and a child's exploration term counts how
+often it was available rather than how often its parent was visited.  Nodes hold the results from the point
+of view of the seat that played the node's card.
+
+The tree is kept between cards.  After other players have played, the search moves its root down to the
+node matching what was actually played and gives the rest of the tree back to the node pool.  The pool has a
+fixed number of nodes, so once it is used up the search keeps running but stops growing the tree.
+'''
+
+DEFAULT_MAX_NODES = 50000
+DEFAULT_EXPLORATION = 0.7
+
+
+class Node(object):
+    def __init__(self):
+        self.parent = None
+        self.move = None
+        self.seat = -1
+        self.children = {}
+        self.visits = 0
+        self.availability = 0
+        self.total = 0.0
+
+    def reset(self, parent, move, seat):
+        self.parent = parent
+        self.move = move
+        self.seat = seat
+        self.children = {}
+        self.visits = 0
+        self.availability = 0
+        self.total = 0.0
+
+    def get_score(self, exploration):
+        return self.total / self.visits + exploration * math.sqrt(math.log(self.availability) / self.visits)
+
+
+class NodePool(object):
+    """
+    Fixed number of nodes that are handed out and given back, so the tree never grows past max_nodes
+    and released nodes are reused instead of collected
+    """
+    def __init__(self, max_nodes=DEFAULT_MAX_NODES):
+        self.max_nodes = max_nodes
+        self.created = 0
+        self.free = []
+
+    def get_nodes_in_use(self):
+        return self.created - len(self.free)
+
+    def allocate(self, parent, move, seat):
+        """
+        :return: Node, or None if every node is in use
+        """
+        if self.free:
+            node = self.free.pop()
+        elif self.created < self.max_nodes:
+            node = Node()
+            self.created += 1
+        else:
+            return None
+
+        node.reset(parent, move, seat)
+        return node
+
+    def release(self, node):
+        """
+        Gives a node and everything below it back to the pool
+        """
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children.values())
+            node.reset(None, None, -1)
+            self.free.append(node)
+
+    nodes_in_use = property(get_nodes_in_use)
+
+
+class Search(object):
+    """
+    Search tree for one player, kept for the whole round
+    """
+    def __init__(self, max_nodes=DEFAULT_MAX_NODES, exploration=DEFAULT_EXPLORATION, seed=None):
+        self.pool = NodePool(max_nodes)
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.root = None
+        self.iterations = 0
+
+    def reset(self):
+        if self.root is not None:
+            self.pool.release(self.root)
+        self.root = None
+
+    def advance(self, moves, gone):
+        """
+        Moves the root down to the node reached by playing the moves.  Starts a new tree if the moves are not
+        in the tree.
+        :param moves: Card indices played since the root, in order
+        :param gone: Bitboard of cards from earlier tricks, used to match cards equivalent to a move
+        """
+        for move in moves:
+            if self.root is None:
+                return
+
+            child = self._find_child(self.root, move, gone)
+            if child is None:
+                self.reset()
+                return
+
+            # Everything but the matching child is given back to the pool
+            del self.root.children[child.move]
+            self.pool.release(self.root)
+            child.parent = None
+            self.root = child
+
+    @staticmethod
+    def _find_child(node, move, gone):
+        child = node.children.get(move, None)
+        if child is not None:
+            return child
+
+        # Child may be for a card in the same run as the one played
+        for other, child in node.children.items():
+            if Bitboard.get_suit(other) == Bitboard.get_suit(move) and Playout.QUEEN_OF_SPADES not in (other, move):
+                low, high = min(other, move), max(other, move)
+                between = ((1 << high) - 1) & ~((2 << low) - 1)
+                if between & ~gone == 0:
+                    return child
+        return None
+
+    def run(self, position, seat, deadline=None, iterations=None):
+        """
+        Searches until the deadline or the number of iterations is reached.  At least one iteration is run.
+        :param position: Position as seen by the seat
+        :param seat: Seat to move
+        :param deadline: time.time() to stop at, or None
+        :param iterations: Maximum number of iterations, or None
+        :return: Index of the card to play
+        """
+        if self.root is None:
+            self.root = self.pool.allocate(None, None, -1)
+            if self.root is None:
+                return Playout.policy_move(position)
+
+        self.iterations = 0
+        while iterations is None or self.iterations < iterations:
+            if self.iterations > 0 and deadline is not None and time.time() > deadline:
+                break
+            if deadline is None and iterations is None:
+                break
+
+            self.iterate(position, seat)
+            self.iterations += 1
+
+        # Most visited card is the most reliable one
+        moves = position.legal_moves()
+        best = None
+        for move, child in self.root.children.items():
+            if moves & (1 << move) and (best is None or child.visits > best.visits):
+                best = child
+
+        if best is None:
+            return Playout.policy_move(position)
+        return best.move
+
+    def iterate(self, position, seat):
+        world = Playout.determinize(position, seat, self.random)
+        node = self.root
+
+        # Selection and expansion
+        while not world.is_done():
+            mover = world.to_move()
+            moves = Playout.equivalent_moves(world.legal_moves(), world.get_gone())
+
+            available = []
+            untried = []
+            for move in moves:
+                child = node.children.get(move, None)
+                if child is None:
+                    untried.append(move)
+                else:
+                    available.append(child)
+
+            for child in available:
+                child.availability += 1
+
+            if untried:
+                move = untried[self.random.randrange(0, len(untried))]
+                child = self.pool.allocate(node, move, mover)
+                if child is not None:
+                    child.availability += 1
+                    node.children[move] = child
+                    world.play(move)
+                    node = child
+                    break
+
+            # Tree can't grow here, so the rest is left to the rollout
+            if not available:
+                break
+
+            node = max(available, key=lambda available_child: available_child.get_score(self.exploration))
+            world.play(node.move)
+
+        # Simulation
+        points = Playout.rollout(world).get_points()
+
+        # Backpropagation, with each node scored for the seat that played it
+        while node is not self.root:
+            node.visits += 1
+            node.total += 1.0 - points[node.seat] / 26.0
+            node = node.parent
+        node.visits += 1
@@ -0,0 +1,360 @@
+import random
+import time
+
+from Core import Bitboard
+from Core import Constant
+
+__author__ = 'Evan'
+
+
+'''
+Fast rules core used by the search AIs.
+
+A Position holds a round of Hearts as bitboards: the hand of every seat, the cards each seat has taken, the
+current trick and what is known about which suits a seat is out of.  Seats 0 to 3 are player one to player
+four, and play goes 0, 3, 2, 1 as in PlayingState.set_next_player.  Cards are Bitboard indices.
+
+Positions seen by a player only know that player's hand.  determinize deals the unseen cards to the other
+seats, consistent with the number of cards each seat holds and the suits they are known to be out of.
+'''
+
+NUMBER_OF_SEATS = 4
+SUITS = [Constant.Suit.Clubs, Constant.Suit.Diamonds, Constant.Suit.Spades, Constant.Suit.Hearts]
+
+QUEEN_OF_SPADES = Bitboard.get_index(Constant.Suit.Spades, Constant.Value.Queen)
+TWO_OF_CLUBS = Bitboard.get_index(Constant.Suit.Clubs, Constant.Value.Two)
+
+# Number of tries to deal the unseen cards around the known voids before the voids are ignored
+DEAL_ATTEMPTS = 20
+
+
+def next_seat(seat):
+    return (seat + 3) % NUMBER_OF_SEATS
+
+
+def lowest_value(mask):
+    """
+    Index of the card with the lowest value in the mask, lowest suit first on a tie.  -1 if the mask is empty
+    """
+    lowest = -1
+    lowest_position = Bitboard.SUIT_SIZE
+    for suit in SUITS:
+        position = Bitboard.lowest_index((mask >> Bitboard.SUIT_SHIFT[suit]) & Bitboard.LANE)
+        if 0 <= position < lowest_position:
+            lowest_position = position
+            lowest = Bitboard.SUIT_SHIFT[suit] + position
+    return lowest
+
+
+def highest_value(mask):
+    """
+    Index of the card with the highest value in the mask, highest suit first on a tie.  -1 if the mask is empty
+    """
+    highest = -1
+    highest_position = -1
+    for suit in SUITS:
+        position = Bitboard.highest_index((mask >> Bitboard.SUIT_SHIFT[suit]) & Bitboard.LANE)
+        if position >= highest_position and position >= 0:
+            highest_position = position
+            highest = Bitboard.SUIT_SHIFT[suit] + position
+    return highest
+
+
+def equivalent_moves(moves, gone):
+    """
+    Cards in a suit with nothing left between them but cards that are gone always play out the same way,
+    so only the lowest of every such run needs to be searched.  The Queen of Spades is worth points, so it
+    is never grouped with the cards around it.
+    :param moves: Bitboard of legal moves
+    :param gone: Bitboard of cards that can't be played by anyone else and aren't in the current trick, such as
+        cards from earlier tricks and the mover's hand.  Position.get_gone gives this
+    :return: List of indices, one per run of equivalent moves
+    """
+    representatives = []
+    previous = -1
+    for index in Bitboard.indices(moves):
+        if previous >= 0 and Bitboard.get_suit(previous) == Bitboard.get_suit(index) and \
+                QUEEN_OF_SPADES not in (previous, index):
+            between = ((1 << index) - 1) & ~((2 << previous) - 1)
+            if between & ~gone == 0:
+                previous = index
+                continue
+
+        representatives.append(index)
+        previous = index
+
+    return representatives
+
+
+class Position(object):
+    """
+    Round of Hearts from the point of view of the rules
+    """
+    def __init__(self):
+        self.hands = [0, 0, 0, 0]
+        self.counts = [0, 0, 0, 0]
+        self.taken = [0, 0, 0, 0]
+        self.voids = [0, 0, 0, 0]
+        self.trick = []
+        self.leader = 0
+        self.current_suit = None
+        self.hearts_broken = False
+        self.played = 0
+
+    def copy(self):
+        position = Position.__new__(Position)
+        position.hands = self.hands[:]
+        position.counts = self.counts[:]
+        position.taken = self.taken[:]
+        position.voids = self.voids[:]
+        position.trick = self.trick[:]
+        position.leader = self.leader
+        position.current_suit = self.current_suit
+        position.hearts_broken = self.hearts_broken
+        position.played = self.played
+        return position
+
+    def to_move(self):
+        return (self.leader + 3 * len(self.trick)) % NUMBER_OF_SEATS
+
+    def get_gone(self, seat=None):
+        """
+        Cards out of the running for the rest of the round: cards from earlier tricks, and the hand of the seat
+        if one is given.  Cards in the current trick can still win it, so they are not gone.
+        """
+        gone = self.played
+        for trick_seat, index in self.trick:
+            gone &= ~(1 << index)
+        if seat is not None:
+            gone |= self.hands[seat]
+        return gone
+
+    def is_done(self):
+        return not self.trick and sum(self.counts) == 0
+
+    def legal_moves(self):
+        """
+        :return: Bitboard of the cards the seat to move may play
+        """
+        hand = self.hands[self.to_move()]
+
+        # Two of Clubs always starts the round
+        if self.played == 0 and hand & (1 << TWO_OF_CLUBS):
+            return 1 << TWO_OF_CLUBS
+
+        return Bitboard.legal_moves(hand, self.current_suit, self.hearts_broken)
+
+    def play(self, index):
+        seat = self.to_move()
+        bit = 1 << index
+        suit = Bitboard.get_suit(index)
+
+        self.hands[seat] &= ~bit
+        self.counts[seat] -= 1
+        self.played |= bit
+
+        if not self.trick:
+            self.current_suit = suit
+        elif suit != self.current_suit:
+            self.voids[seat] |= Bitboard.SUIT_MASK[self.current_suit]
+
+        self.trick.append((seat, index))
+        if len(self.trick) == NUMBER_OF_SEATS:
+            self._finish_trick()
+
+    def _finish_trick(self):
+        winner = None
+        highest = -1
+        mask = 0
+        for seat, index in self.trick:
+            mask |= 1 << index
+            if Bitboard.get_suit(index) == self.current_suit and index > highest:
+                highest = index
+                winner = seat
+
+        self.taken[winner] |= mask
+        if mask & Bitboard.HEARTS:
+            self.hearts_broken = True
+
+        self.leader = winner
+        self.trick = []
+        self.current_suit = None
+
+    def get_points(self):
+        """
+        :return: Points of each seat for the round, after shooting the moon
+        """
+        points = [Bitboard.points(taken) for taken in self.taken]
+        if 26 in points:
+            points = [0 if seat_points == 26 else 26 for seat_points in points]
+        return points
+
+
+def observe(players, seat, trick_pile, hearts_broken):
+    """
+    Position as seen by one player during PlayingState
+    :param players: Player one to player four
+    :param seat: Seat of the player looking at the game
+    :param trick_pile: Card UIs in the current trick, in the order they were played
+    :param hearts_broken: Whether hearts have been broken
+    :return: Position with only the hand of the given seat filled in
+    """
+    position = Position()
+    seats = dict((player, i) for i, player in enumerate(players))
+
+    position.hands[seat] = players[seat].hand.mask
+    position.counts = [len(player.hand) for player in players]
+    position.hearts_broken = hearts_broken
+
+    # Tricks keep the order cards were played in, so the first card of every four is the suit that was led
+    for player_seat, player in enumerate(players):
+        for start in range(0, len(player.tricks), NUMBER_OF_SEATS):
+            trick = [card_ui.card for card_ui in player.tricks[start:start + NUMBER_OF_SEATS]]
+            led_suit = trick[0].suit
+            for card in trick:
+                bit = Bitboard.card_bit(card)
+                position.taken[player_seat] |= bit
+                position.played |= bit
+                if card.suit != led_suit and card.owner in seats:
+                    position.voids[seats[card.owner]] |= Bitboard.SUIT_MASK[led_suit]
+
+    for card_ui in trick_pile:
+        card = card_ui.card
+        card_seat = seats[card.owner]
+        if not position.trick:
+            position.leader = card_seat
+            position.current_suit = card.suit
+        elif card.suit != position.current_suit:
+            position.voids[card_seat] |= Bitboard.SUIT_MASK[position.current_suit]
+
+        position.trick.append((card_seat, Bitboard.card_index(card)))
+        position.played |= Bitboard.card_bit(card)
+
+    if not position.trick:
+        position.leader = seat
+
+    return position
+
+
+def determinize(position, seat, rng):
+    """
+    Deals the cards the given seat hasn't seen to the other seats
+    :param position: Position as seen by the seat
+    :param seat: Seat whose hand is known
+    :param rng: random.Random used for the deal
+    :return: Copy of the position with every hand filled in
+    """
+    world = position.copy()
+    others = [other for other in range(0, NUMBER_OF_SEATS) if other != seat]
+    cards = list(Bitboard.indices(Bitboard.ALL_CARDS & ~position.played & ~position.hands[seat]))
+
+    # Cards that fewer seats can hold are dealt first, so the deal rarely runs into a dead end
+    eligible = {}
+    for index in cards:
+        eligible[index] = [other for other in others if not position.voids[other] & (1 << index)]
+
+    for attempt in range(0, DEAL_ATTEMPTS + 1):
+        # Last attempt ignores the voids, in case they can't all be kept
+        ignore_voids = attempt == DEAL_ATTEMPTS
+        rng.shuffle(cards)
+        if not ignore_voids:
+            cards.sort(key=lambda card_index: len(eligible[card_index]))
+
+        hands = [0, 0, 0, 0]
+        room = position.counts[:]
+        for index in cards:
+            seats = others if ignore_voids else eligible[index]
+            total_room = sum(room[other] for other in seats)
+            if total_room == 0:
+                break
+
+            # Seats with more room left are more likely to hold the card
+            pick = rng.randrange(0, total_room)
+            for other in seats:
+                pick -= room[other]
+                if pick < 0:
+                    hands[other] |= 1 << index
+                    room[other] -= 1
+                    break
+        else:
+            for other in others:
+                world.hands[other] = hands[other]
+            return world
+
+    return world
+
+
+def policy_move(position):
+    """
+    Quick rollout policy: duck under the trick when possible, dump the Queen of Spades and hearts when out of
+    the suit, and lead low
+    :return: Index of the card to play
+    """
+    legal = position.legal_moves()
+    suit = position.current_suit
+
+    if suit is None:
+        return lowest_value(legal)
+
+    in_suit = legal & Bitboard.SUIT_MASK[suit]
+    if in_suit:
+        highest = max(index for seat, index in position.trick if Bitboard.get_suit(index) == suit)
+        under = in_suit & ((1 << highest) - 1)
+        if under:
+            return Bitboard.highest_index(under)
+
+        # Trick is lost either way when playing last, so get rid of the highest card other than the Queen
+        if len(position.trick) == NUMBER_OF_SEATS - 1:
+            safe = in_suit & ~(1 << QUEEN_OF_SPADES)
+            if safe:
+                return Bitboard.highest_index(safe)
+        return Bitboard.lowest_index(in_suit)
+
+    if legal & (1 << QUEEN_OF_SPADES):
+        return QUEEN_OF_SPADES
+    if legal & Bitboard.HEARTS:
+        return Bitboard.highest_index(legal & Bitboard.HEARTS)
+    return highest_value(legal)
+
+
+def rollout(position):
+    """
+    Plays the position out to the end of the round with the rollout policy
+    """
+    while not position.is_done():
+        position.play(policy_move(position))
+    return position
+
+
+def evaluate_moves(position, seat, moves, rollouts, deadline=None, seed=None):
+    """
+    Flat Monte Carlo evaluation.  Every determinization plays each move, then rolls the round out.
+    :param position: Position as seen by the seat
+    :param seat: Seat to move
+    :param moves: List of card indices to evaluate
+    :param rollouts: Maximum number of determinizations
+    :param deadline: time.time() after which no new determinization is started.  At least one is always played
+    :param seed: Seed of the random number generator
+    :return: Dictionary of total points for each move, and the number of determinizations played
+    """
+    rng = random.Random(seed)
+    totals = dict((move, 0) for move in moves)
+
+    count = 0
+    while count < rollouts:
+        if count > 0 and deadline is not None and time.time() > deadline:
+            break
+
+        world = determinize(position, seat, rng)
+        for move in moves:
+            result = world.copy()
+            result.play(move)
+            totals[move] += rollout(result).get_points()[seat]
+        count += 1
+
+    return totals, count
+
+
+def evaluate_moves_task(task):
+    # Pool.map only passes a single argument
+    return evaluate_moves(*task)
@@ -0,0 +1,362 @@
+import pygame
+
+from CardEngine import AssetPack
+from CardEngine import Engine
+from CardEngine import UI
+from Core import Bitboard
+from Core import CardLogging
+from Core import Constant
+from Core import Heart
+from Core import Simulation
+from Core.Player.AI import AI
+from Core.StateMachine import StateMachine
+from Core.StateMachine import State
+
+__author__ = 'Evan'
+
+
+'''
+Replay viewer.
+
+Shows a recorded game on the table, and jumps to any card of any round.  The record is played once through
+ReplayHearts when it is loaded, keeping each card played as a small change to the table and a copy of the whole
+table every few cards (a keyframe).  Showing a position copies the keyframe at or before it and applies the few
+cards played since, so every position takes the same time no matter how far into the game it is.
+
+Keys:
+    Right, Left: Next or previous card
+    Down, Up: Next or previous trick
+    Page Down, Page Up: Next or previous round
+    Home, End: Start or end of the round
+
+Usage:
+    viewer = ReplayViewer(GameRecord.load(file_name))
+    viewer.play()
+
+    timeline = Timeline(game_record)
+    table_state = timeline.get_state(round_number, play_number)
+'''
+
+# Cards played between keyframes.  Every 4 cards puts a keyframe at the start of every trick
+KEYFRAME_INTERVAL = 4
+
+NUMBER_OF_SEATS = 4
+
+# Seat that plays after each seat, in the order of PlayingState.set_next_player
+NEXT_SEAT = [3, 0, 1, 2]
+
+# Where the card of each seat goes in the trick pile, as in PlayingState.set_trick_pile_locations
+TRICK_PILE_LOCATIONS = [(362, 400), (295, 362), (362, 295), (400, 362)]
+
+
+class TableState(object):
+    """
+    Everything on the table at one point of a round.  Cards are kept as bitboards and card indices.
+    """
+    def __init__(self, hands, tricks, trick_pile, scores, hearts_broken, current_suit, current_seat):
+        """
+        :param hands: Bitboard of the hand of each seat
+        :param tricks: Bitboard of the cards each seat has taken this round
+        :param trick_pile: List of (seat, card index) for the cards in the trick pile, in the order played
+        :param scores: Total points of each seat before this round
+        :param hearts_broken: Whether a heart has been taken this round
+        :param current_suit: Suit to follow, or None between tricks
+        :param current_seat: Seat to play next
+        :return:
+        """
+        self.hands = hands
+        self.tricks = tricks
+        self.trick_pile = trick_pile
+        self.scores = scores
+        self.hearts_broken = hearts_broken
+        self.current_suit = current_suit
+        self.current_seat = current_seat
+
+    def copy(self):
+        return TableState(list(self.hands), list(self.tricks), list(self.trick_pile), list(self.scores),
+                          self.hearts_broken, self.current_suit, self.current_seat)
+
+    def apply_play(self, seat, index, winner):
+        """
+        Plays a card, and collects the trick if the card finished it
+        :param seat: Seat playing the card
+        :param index: Card index of the card
+        :param winner: Seat taking the trick if the card finished it, otherwise None
+        :return:
+        """
+        self.hands[seat] &= ~(1 << index)
+        if not self.trick_pile:
+            self.current_suit = Bitboard.get_suit(index)
+        self.trick_pile.append((seat, index))
+
+        if winner is None:
+            self.current_seat = NEXT_SEAT[seat]
+        else:
+            for trick_seat, trick_index in self.trick_pile:
+                self.tricks[winner] |= 1 << trick_index
+                if Bitboard.get_suit(trick_index) is Constant.Suit.Hearts:
+                    self.hearts_broken = True
+            self.trick_pile = []
+            self.current_suit = None
+            self.current_seat = winner
+
+    def get_round_points(self):
+        """
+        :return: Points in the tricks each seat has taken this round, before shooting the moon
+        """
+        return [Bitboard.points(mask) for mask in self.tricks]
+
+
+class Timeline(object):
+    """
+    Every card played in a recorded game, with keyframes of the table to start from
+    """
+    def __init__(self, game_record, keyframe_interval=KEYFRAME_INTERVAL):
+        """
+        :param game_record: GameRecord to play through
+        :param keyframe_interval: Cards played between keyframes
+        :return:
+        """
+        self.keyframe_interval = keyframe_interval
+
+        # Each round has a list of (seat, card index, seat taking the trick or None) for every card played,
+        # and a list of keyframes for play 0, keyframe_interval, 2 * keyframe_interval...
+        self.plays = []
+        self.keyframes = []
+
+        self._build(game_record)
+
+    def get_number_of_rounds(self):
+        return len(self.plays)
+
+    def get_number_of_plays(self, round_number):
+        return len(self.plays[round_number])
+
+    def get_state(self, round_number, play_number):
+        """
+        :param round_number: Round, starting from 0
+        :param play_number: Number of cards played in the round, from 0 up to get_number_of_plays
+        :return: TableState after the cards are played.  Changing it does not change the timeline
+        """
+        if play_number < 0 or play_number > len(self.plays[round_number]):
+            raise IndexError('Round ' + str(round_number + 1) + ' has no play ' + str(play_number))
+
+        keyframe_number = play_number // self.keyframe_interval
+        table_state = self.keyframes[round_number][keyframe_number].copy()
+        for seat, index, winner in self.plays[round_number][keyframe_number * self.keyframe_interval:play_number]:
+            table_state.apply_play(seat, index, winner)
+        return table_state
+
+    def _build(self, game_record):
+        game = Simulation.ReplayHearts(game_record, enable_logging=CardLogging.log_file.enabled)
+        players = game.get_players()
+        playing_state = game.stateMachine.state_list["Playing"]
+
+        # Table is looked at after every card played, once any finished trick has been collected
+        while not game.game_over and not game.is_replay_done():
+            game.stateMachine.update()
+            if game.stateMachine.current_state is playing_state and len(playing_state.trickPile) < NUMBER_OF_SEATS:
+                self._observe(game, players, playing_state)
+
+        # Record stopped right after the last card of a trick, before the trick was collected
+        if game.stateMachine.current_state is playing_state and len(playing_state.trickPile) == NUMBER_OF_SEATS:
+            playing_state.move_trick_pile_to_player()
+            self._observe(game, players, playing_state)
+
+    def _observe(self, game, players, playing_state):
+        plays = game.game_record.plays[-1]
+        if len(self.plays) <= game.round_number:
+            self.plays.append([])
+            self.keyframes.append([self._get_table_state(game, players, playing_state)])
+            return
+
+        play_number = len(plays)
+        if play_number == len(self.plays[-1]):
+            return
+
+        index = plays[-1]
+        seat = players.index(game.card_ui_lookup[index].card.owner)
+        winner = None
+        if play_number % NUMBER_OF_SEATS == 0:
+            winner = players.index(playing_state.currentPlayer)
+        self.plays[-1].append((seat, index, winner))
+
+        if play_number % self.keyframe_interval == 0:
+            self.keyframes[-1].append(self._get_table_state(game, players, playing_state))
+
+    @staticmethod
+    def _get_table_state(game, players, playing_state):
+        return TableState([player.hand.mask for player in players],
+                          [Bitboard.get_mask([card_ui.card for card_ui in player.tricks]) for player in players],
+                          [(players.index(card_ui.card.owner), Bitboard.card_index(card_ui.card))
+                           for card_ui in playing_state.trickPile],
+                          game.get_total_points(), game.heartsBroken, game.currentSuit,
+                          players.index(playing_state.currentPlayer))
+
+
+class ReplayState(State.State):
+    """
+    Only state of the viewer.  Moves through the timeline as keys are pressed.
+    """
+    def enter(self):
+        return
+
+    def exit(self):
+        return
+
+    def handle_keypress(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+
+        if event.key == pygame.K_RIGHT:
+            self.game.step_play(1)
+        elif event.key == pygame.K_LEFT:
+            self.game.step_play(-1)
+        elif event.key == pygame.K_DOWN:
+            self.game.step_trick(1)
+        elif event.key == pygame.K_UP:
+            self.game.step_trick(-1)
+        elif event.key == pygame.K_PAGEDOWN:
+            self.game.step_round(1)
+        elif event.key == pygame.K_PAGEUP:
+            self.game.step_round(-1)
+        elif event.key == pygame.K_HOME:
+            self.game.seek(self.game.round_number, 0)
+        elif event.key == pygame.K_END:
+            self.game.seek(self.game.round_number, self.game.timeline.get_number_of_plays(self.game.round_number))
+
+    def handle_card_click(self, card_ui):
+        return
+
+    def update(self):
+        return None
+
+
+class ReplayViewer(Heart.Hearts):
+    """
+    Shows a recorded game with every hand face up
+    """
+    def __init__(self, game_record, width=800, height=800):
+        """
+        :param game_record: GameRecord to show
+        :param width: Width of the window
+        :param height: Height of the window
+        :return:
+        """
+        self.timeline = Timeline(game_record)
+        if self.timeline.get_number_of_rounds() == 0:
+            raise ValueError('Record has no cards to show')
+
+        self.asset_pack = AssetPack.load(Heart.ASSET_PACK_FILE)
+        self.imagePath = "Res/img/Cards/"
+        self.imageType = ".png"
+        self.soundPath = "Res/Sound/"
+        self.soundType = ".wav"
+
+        Engine.CardEngine.init(width, height, icon=self.load_image(Heart.BACK_SPRITE))
+
+        # Players only hold the cards shown.  Their AI never plays
+        self.player_one = Heart.Player("North", AI.HumanAI())
+        self.player_two = Heart.Player("East", AI.HumanAI())
+        self.player_three = Heart.Player("South", AI.HumanAI())
+        self.player_four = Heart.Player("West", AI.HumanAI())
+
+        self.trick_pile = []
+        self.deck = []
+
+        self.heartsBroken = False
+        self.currentSuit = None
+
+        self.sprite_atlas = None
+        self.front_sprites = {}
+        self.back_sprites = {}
+        self.card_ui_elements = []
+        self.card_ui_lookup = {}
+        self.sounds = {}
+        self.load_sprites()
+
+        self.stateMachine = StateMachine.StateMachine()
+        self.setup_deck()
+        self._create_card_ui()
+
+        self.stateMachine.add_state(ReplayState(self, "Replay"), "Replay")
+        self.stateMachine.set_initial_state("Replay")
+
+        self.position_text = UI.Text(rect=pygame.Rect((250, 0), (300, 30)))
+        self.score_text = UI.Text(rect=pygame.Rect((150, 30), (500, 30)))
+
+        Engine.CardEngine.keyPress += self.stateMachine.handle_keypress
+
+        self.clock = pygame.time.Clock()
+
+        self.round_number = 0
+        self.play_number = 0
+        self.table_state = None
+        self.seek(0, 0)
+
+    def seek(self, round_number, play_number):
+        """
+        Shows the table after a number of cards are played in a round.  Positions past either end are moved to the end
+        :param round_number: Round, starting from 0
+        :param play_number: Number of cards played in the round
+        :return:
+        """
+        self.round_number = max(0, min(round_number, self.timeline.get_number_of_rounds() - 1))
+        self.play_number = max(0, min(play_number, self.timeline.get_number_of_plays(self.round_number)))
+        self.table_state = self.timeline.get_state(self.round_number, self.play_number)
+        self.show_table_state(self.table_state)
+
+    def step_play(self, number_of_plays):
+        """
+        Moves a number of cards forward or back, going on to the next or previous round at the end of a round
+        """
+        play_number = self.play_number + number_of_plays
+        if play_number > self.timeline.get_number_of_plays(self.round_number) and \
+                self.round_number < self.timeline.get_number_of_rounds() - 1:
+            self.seek(self.round_number + 1, 0)
+        elif play_number < 0 and self.round_number > 0:
+            self.seek(self.round_number - 1, self.timeline.get_number_of_plays(self.round_number - 1))
+        else:
+            self.seek(self.round_number, play_number)
+
+    def step_trick(self, number_of_tricks):
+        """
+        Moves to the start of a later or earlier trick of the round
+        """
+        trick_number = (self.play_number + NUMBER_OF_SEATS - 1) // NUMBER_OF_SEATS if number_of_tricks < 0 else \
+            self.play_number // NUMBER_OF_SEATS
+        self.seek(self.round_number, (trick_number + number_of_tricks) * NUMBER_OF_SEATS)
+
+    def step_round(self, number_of_rounds):
+        self.seek(self.round_number + number_of_rounds, 0)
+
+    def show_table_state(self, table_state):
+        players = self.get_players()
+        for player, mask in zip(players, table_state.hands):
+            player.hand = Bitboard.Hand([self.card_ui_lookup[index].card for index in Bitboard.indices(mask)])
+
+        # Hands are laid out the same way Hearts lays them out, but face up
+        for card_ui in self.card_ui_elements:
+            card_ui.visible = False
+        self.setup_ui()
+        for card_ui in self.card_ui_elements:
+            card_ui.front_view = True
+
+        z = 2
+        for seat, index in table_state.trick_pile:
+            card_ui = self.card_ui_lookup[index]
+            card_ui.angle_degrees = 0
+            x, y = TRICK_PILE_LOCATIONS[seat]
+            card_ui.set_location(x, y, z)
+            card_ui.visible = True
+            z += .1
+
+        self.heartsBroken = table_state.hearts_broken
+        self.currentSuit = table_state.current_suit
+
+        self.position_text.text = 'Round ' + str(self.round_number + 1) + ' of ' + \
+            str(self.timeline.get_number_of_rounds()) + '  Card ' + str(self.play_number) + ' of ' + \
+            str(self.timeline.get_number_of_plays(self.round_number))
+        round_points = table_state.get_round_points()
+        self.score_text.text = '  '.join(player.name + ' ' + str(score) + ' +' + str(points)
+                                         for player, score, points in zip(players, table_state.scores, round_points))
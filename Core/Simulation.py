@@ -0,0 +1,366 @@
+import random
+
+from Core import Bitboard
+from Core import CardLogging
+from Core import Constant
+from Core import GameRecord
+from Core import Heart
+from Core.Player.AI import AI
+from Core.StateMachine import StateMachine
+from Core.StateMachine import State
+
+__author__ = 'Evan'
+
+
+'''
+Headless driver for Hearts.
+
+Runs the same Setup, Passing, Playing and Scoring states as Hearts, but with four computer players
+and no display, sprites, sounds or frame clock.  Used to push large numbers of complete games through
+the rules and AI for regression and strength testing.
+
+Games go through the game objects and states one card at a time, which runs at around 40 complete games a
+second on one core with ComputerAI.  For thousands of games a second, BatchSimulation.BatchHearts plays the
+ComputerAI rules on whole batches of games at once.  HeadlessHearts is the path for other AIs and for checking
+the batch simulator against the real states.
+
+Games recorded by Hearts or HeadlessHearts can be played again through the same states by ReplayHearts, which
+deals the recorded decks and has every seat pass and play the recorded cards.
+
+Usage:
+    game = HeadlessHearts(seed=1)
+    total_points = game.play()
+
+    results = simulate(1000, seed=1)
+
+    total_points = replay(GameRecord.load(file_name))
+'''
+
+
+class CardView(object):
+    """
+    Stand-in for CardUI when there is no display.  States move cards between the hands, the trick pile
+    and the tricks through their UI element, so this only keeps track of the card and where it would be.
+    """
+    def __init__(self, card, z=0):
+        self.card = card
+        self.x = 0
+        self.y = 0
+        self.z = z
+        self.visible = False
+        self.front_view = True
+        self.angle_degrees = 0
+
+    def set_location(self, x, y, z=0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def move(self, dx, dy, dz=0):
+        self.x += dx
+        self.y += dy
+        self.z += dz
+
+    def play_sound(self):
+        return
+
+    def load_sound_file(self, file_path):
+        return
+
+
+class HeadlessPassingState(State.PassingState):
+    def update(self):
+        # No human is choosing cards, so player one passes the same way as the other computer players
+        if self.next_state is None:
+            self.game.player_one.pass_cards()
+            self.passing_round()
+            self.next_state = "Playing"
+        return self.next_state
+
+
+class HeadlessPlayingState(State.PlayingState):
+    def update(self):
+        # Every player is a computer, and the trick pile is collected without waiting for it to be seen
+        if len(self.trickPile) is 4:
+            self.move_trick_pile_to_player()
+
+        elif self.is_done():
+            CardLogging.log_file.info('PlayingState: Setting next state to Scoring')
+            self.next_state = "Scoring"
+
+        else:
+            self.handle_computer_player_turn()
+
+        return self.next_state
+
+
+class HeadlessScoringState(State.ScoringState):
+    def enter(self):
+        State.ScoringState.enter(self)
+
+        # Nobody is around to press the button, so move on to the next round straight away
+        self.handle_button_press(None)
+        self.game.game_over = self.next_state is None
+
+    def setup_ui(self):
+        return
+
+    def show_score_ui(self):
+        return
+
+    def hide_score_ui(self):
+        return
+
+
+class HeadlessHearts(Heart.Hearts):
+    """
+    Hearts without pygame.  Each instance plays a single game through play().
+    """
+    def __init__(self, seed=None, ai_list=None, enable_logging=False):
+        """
+        :param seed: Seed of the random numbers this game shuffles with.  None uses the system time
+        :param ai_list: List of four AIs, one per seat.  Defaults to four ComputerAI.  AIs made without a seed are
+            seeded from the game, so the same seed plays the same game
+        :param enable_logging: Logging is turned off by default, as it dominates the time of a game
+        :return:
+        """
+        CardLogging.log_file.enabled = enable_logging
+
+        # Each game has its own random numbers, so games give the same deals whatever ran before them or alongside
+        self.rng = random.Random(seed)
+        self.deals = None
+
+        if ai_list is None:
+            ai_list = [AI.ComputerAI(), AI.ComputerAI(), AI.ComputerAI(), AI.ComputerAI()]
+
+        # Players go in the same order as Hearts, but every seat is a computer
+        self.player_one = Heart.Player("North", ai_list[0])
+        self.player_two = Heart.Player("East", ai_list[1])
+        self.player_three = Heart.Player("South", ai_list[2])
+        self.player_four = Heart.Player("West", ai_list[3])
+
+        # Seeds are drawn for every seat, so the deals do not depend on which AIs were given seeds
+        for player in self.get_players():
+            player.ai.set_game(self)
+            player.ai.set_seed(self.rng.getrandbits(32))
+
+        self.trick_pile = []
+        self.deck = []
+
+        self.heartsBroken = False
+        self.currentSuit = None
+        self.game_over = False
+
+        self.game_record = GameRecord.GameRecord()
+
+        self.card_ui_elements = []
+        self.card_ui_lookup = {}
+
+        self.stateMachine = StateMachine.StateMachine()
+
+        self.stateMachine.add_state(State.SetupState(self, "Setup"), "Setup")
+        self.stateMachine.add_state(HeadlessPassingState(self, "Passing"), "Passing")
+        self.stateMachine.add_state(HeadlessPlayingState(self, "Playing"), "Playing")
+        self.stateMachine.add_state(HeadlessScoringState(self, "Scoring"), "Scoring")
+
+        self.stateMachine.set_initial_state("Setup")
+
+    # Initialization functions
+    def load_sprites(self):
+        return
+
+    def setup_ui(self):
+        # Hands are already sorted by the Setup and Passing states, and there is nothing to lay out
+        return
+
+    def _create_card_ui(self):
+        z = 0
+        for card in self.deck:
+            card_view = CardView(card, z)
+            self.card_ui_elements.append(card_view)
+            self.card_ui_lookup[Bitboard.card_index(card)] = card_view
+            z += .1
+
+    # Utility functions
+    def get_total_points(self):
+        scoring_state = self.stateMachine.state_list["Scoring"]
+        return [scoring_state.player_one_total_points,
+                scoring_state.player_two_total_points,
+                scoring_state.player_three_total_points,
+                scoring_state.player_four_total_points]
+
+    def get_round_points(self):
+        """
+        :return: List with the points of each player for every round played, after shooting the moon
+        """
+        scoring_state = self.stateMachine.state_list["Scoring"]
+
+        # Scoring state starts every list of points with a 0 before the first round
+        return [list(points) for points in zip(scoring_state.player_one_points[1:],
+                                               scoring_state.player_two_points[1:],
+                                               scoring_state.player_three_points[1:],
+                                               scoring_state.player_four_points[1:])]
+
+    # Entry Function for playing hearts
+    def play(self):
+        try:
+            while not self.game_over:
+                self.stateMachine.update()
+        finally:
+            self.close()
+
+        return self.get_total_points()
+
+
+class ReplayAI(object):
+    """
+    Passes and plays the cards one seat of a GameRecord passed and played
+    """
+    def __init__(self, replay_game, seat):
+        """
+        :param replay_game: ReplayHearts being played, which keeps track of the next card to play
+        :param seat: Index of the seat in the record
+        :return:
+        """
+        self.replay_game = replay_game
+        self.seat = seat
+        self.player = None
+        self.game = None
+
+    def set_player(self, player):
+        self.player = player
+
+    def set_game(self, game):
+        self.game = game
+
+    def pass_cards(self, computer_player):
+        passing = []
+        for index in self.replay_game.get_passes(self.seat):
+            passing.append(self.get_card(index))
+        computer_player.passing = passing
+
+    def play_card(self, current_suit, trick_pile):
+        card = self.get_card(self.replay_game.get_next_play())
+        self.player.hand.remove(card)
+        return card
+
+    def get_card(self, index):
+        card = self.player.hand.get_card(index)
+        if card is None:
+            raise GameRecord.RecordError(self.player.name + ' does not have the ' +
+                                         Constant.value_str[Bitboard.get_value(index)] + ' of ' +
+                                         Constant.suit_str[Bitboard.get_suit(index)] + ' in round ' +
+                                         str(self.replay_game.round_number + 1))
+        return card
+
+    def handle_card_click(self, card_ui, current_suit):
+        return
+
+    def handle_keypress(self, event):
+        return
+
+    def close(self):
+        return
+
+    def set_seed(self, seed):
+        return
+
+
+class ReplayHearts(HeadlessHearts):
+    """
+    Plays a GameRecord again through the same states as HeadlessHearts.  A record of a game that was stopped part
+    way through is played up to where it stopped.
+    """
+    def __init__(self, game_record, enable_logging=False):
+        """
+        :param game_record: GameRecord to play
+        :param enable_logging: Logging is turned off by default, as it dominates the time of a game
+        :return:
+        """
+        if game_record.get_number_of_rounds() == 0:
+            raise GameRecord.RecordError('Record has no rounds')
+
+        self.record = game_record
+        self.round_number = -1
+        self.play_number = 0
+
+        # Setup state deals the first round while the game is created
+        HeadlessHearts.__init__(self, ai_list=[ReplayAI(self, seat) for seat in range(0, GameRecord.NUMBER_OF_SEATS)],
+                                enable_logging=enable_logging)
+
+    def shuffle_deck(self):
+        self.round_number += 1
+        self.play_number = 0
+        if self.round_number >= self.record.get_number_of_rounds():
+            raise GameRecord.RecordError('Record has no deal for round ' + str(self.round_number + 1))
+
+        cards = {}
+        for card in self.deck:
+            cards[Bitboard.card_index(card)] = card
+        return [cards[index] for index in self.record.deals[self.round_number]]
+
+    def get_passes(self, seat):
+        passes = self.record.passes[self.round_number]
+        if passes is None:
+            raise GameRecord.RecordError('Record has no passes for round ' + str(self.round_number + 1))
+        return passes[seat * GameRecord.CARDS_PASSED:(seat + 1) * GameRecord.CARDS_PASSED]
+
+    def get_next_play(self):
+        plays = self.record.plays[self.round_number]
+        if self.play_number >= len(plays):
+            raise GameRecord.RecordError('Record has no more plays in round ' + str(self.round_number + 1))
+        self.play_number += 1
+        return plays[self.play_number - 1]
+
+    def is_replay_done(self):
+        if self.round_number < self.record.get_number_of_rounds() - 1:
+            return False
+
+        # Last round is done once it is scored, or once the cards recorded for an unfinished round are played
+        if self.record.is_round_finished(self.round_number):
+            return self.stateMachine.current_state is self.stateMachine.state_list["Scoring"]
+        return self.play_number == len(self.record.plays[self.round_number])
+
+    # Entry Function for playing hearts
+    def play(self):
+        """
+        :return: List with the total points of each player, after checking they match the record
+        """
+        try:
+            while not self.game_over and not self.is_replay_done():
+                self.stateMachine.update()
+        finally:
+            self.close()
+
+        total_points = self.get_total_points()
+        if total_points != self.record.total_points:
+            raise GameRecord.RecordError('Replay ended with ' + str(total_points) + ' points, but the record has ' +
+                                         str(self.record.total_points))
+        return total_points
+
+
+def replay(game_record):
+    """
+    Plays a recorded game again as fast as possible
+    :param game_record: GameRecord to play
+    :return: List with the total points of each player.  Raises RecordError if the game does not play out the same
+    """
+    return ReplayHearts(game_record).play()
+
+
+def simulate(number_of_games, seed=None):
+    """
+    Plays a number of complete games between four ComputerAI players
+    :param number_of_games: Number of games to play
+    :param seed: Seed for the first game.  Following games use the next seeds in order
+    :return: List with the total points of each player for every game
+    """
+    results = []
+    for i in range(0, number_of_games):
+        if seed is None:
+            game = HeadlessHearts()
+        else:
+            game = HeadlessHearts(seed + i)
+        results.append(game.play())
+
+    return results
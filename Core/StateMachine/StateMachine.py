@@ -8,19 +8,19 @@ class StateMachine:
         return
 
     def add_state(self, state, key):
-        CardLogging.log_file.log("StateMachine: Adding state key " + key)
+        CardLogging.log_file.info("StateMachine: Adding state key %s", key)
         if key not in self.state_list:
             self.state_list[key] = state
         return
 
     def remove_state(self, key):
-        CardLogging.log_file.log("StateMachine: Removing state key " + key)
+        CardLogging.log_file.info("StateMachine: Removing state key %s", key)
         if key in self.state_list:
             self.state_list.pop(key, None)
         return
 
     def set_initial_state(self, key):
-        CardLogging.log_file.log("StateMachine: Set initial state key " + key)
+        CardLogging.log_file.info("StateMachine: Set initial state key %s", key)
         if self.current_state is not None:
             self.current_state.exit()
 
@@ -44,7 +44,7 @@ class StateMachine:
             key = None
         next_state = self.state_list.get(key, None)
         if next_state is not None:
-            CardLogging.log_file.log("StateMachine: Transitioning")
+            CardLogging.log_file.info("StateMachine: Transitioning")
             self.current_state.exit()
             self.current_state = next_state
             self.current_state.enter()
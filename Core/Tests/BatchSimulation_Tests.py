@@ -0,0 +1,64 @@
+import unittest
+import numpy
+from Core import BatchSimulation
+from Core import Bitboard
+from Core import CardLogging
+from Core import Simulation
+from Core.Constant import Suit
+from Core.Constant import Value
+
+CardLogging.log_file.enabled = False
+
+__author__ = 'Evan'
+
+
+class BatchSimulationTests(unittest.TestCase):
+    def test_playable_cards(self):
+        heart = Bitboard.get_bit(Suit.Hearts, Value.Five)
+        club = Bitboard.get_bit(Suit.Clubs, Value.Five)
+        hands = numpy.array([heart | club] * 4 + [heart], dtype=numpy.int64)
+        current_suit = numpy.array([BatchSimulation.NO_SUIT, BatchSimulation.NO_SUIT, BatchSimulation.HEARTS,
+                                    BatchSimulation.SPADES, BatchSimulation.NO_SUIT])
+        hearts_broken = numpy.array([False, True, False, False, False])
+
+        # Same results as Bitboard.legal_moves
+        playable = BatchSimulation.determine_playable_cards(hands, current_suit, hearts_broken)
+        self.assertEqual(list(playable), [club, heart | club, heart, heart | club, heart])
+
+    def test_shooting_the_moon(self):
+        round_points = numpy.array([[0, 26, 0, 0], [10, 3, 13, 0]])
+        self.assertEqual(BatchSimulation.handle_shooting_the_moon(round_points).tolist(),
+                         [[26, 0, 26, 26], [10, 3, 13, 0]])
+
+    def test_same_as_headless(self):
+        # Batch plays the same first round as HeadlessHearts for the same deal
+        hands = []
+        results = []
+        for seed in range(0, 10):
+            game = Simulation.HeadlessHearts(seed=seed)
+            hands.append([Bitboard.get_mask(player.hand) for player in game.get_players()])
+
+            scoring_state = game.stateMachine.state_list["Scoring"]
+            while len(scoring_state.player_one_points) < 2:
+                game.stateMachine.update()
+            results.append([scoring_state.player_one_points[1], scoring_state.player_two_points[1],
+                            scoring_state.player_three_points[1], scoring_state.player_four_points[1]])
+
+        batch = BatchSimulation.BatchHearts(10)
+        batch.set_hands(hands)
+        batch.passing_round("Left")
+        self.assertEqual(batch.play_round().tolist(), results)
+
+    def test_play(self):
+        batch = BatchSimulation.BatchHearts(50, seed=1)
+        total_points = batch.play()
+
+        # Every game ends with a player on 100 points, and every round hands out 26 points
+        self.assertTrue((total_points.max(axis=1) >= 100).all())
+        self.assertTrue((total_points.sum(axis=1) % 26 == 0).all())
+
+        # Same seed gives the same games
+        self.assertEqual(BatchSimulation.BatchHearts(50, seed=1).play().tolist(), total_points.tolist())
+
+if __name__ == '__main__':
+    unittest.main()
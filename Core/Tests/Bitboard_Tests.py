@@ -0,0 +1,100 @@
+import unittest
+from CardEngine.Engine import StandardPlayingCard
+from Core import Bitboard
+from Core.Constant import Suit
+from Core.Constant import Value
+
+__author__ = 'Evan'
+
+
+class BitboardTests(unittest.TestCase):
+    def test_index(self):
+        # Two of Clubs is the lowest bit, and Ace of Hearts is the highest bit
+        self.assertEqual(Bitboard.get_index(Suit.Clubs, Value.Two), 0)
+        self.assertEqual(Bitboard.get_index(Suit.Hearts, Value.Ace), 51)
+
+        # Index converts back to suit and value
+        index = Bitboard.get_index(Suit.Spades, Value.Queen)
+        self.assertEqual(Bitboard.get_suit(index), Suit.Spades)
+        self.assertEqual(Bitboard.get_value(index), Value.Queen)
+
+    def test_count(self):
+        mask = Bitboard.get_mask([StandardPlayingCard(Suit.Hearts, Value.Two),
+                                  StandardPlayingCard(Suit.Hearts, Value.King),
+                                  StandardPlayingCard(Suit.Clubs, Value.Ten)])
+
+        self.assertEqual(Bitboard.count(mask), 3)
+        self.assertEqual(Bitboard.count_suit(mask, Suit.Hearts), 2)
+        self.assertEqual(Bitboard.count_suit(mask, Suit.Spades), 0)
+        self.assertEqual(Bitboard.count(Bitboard.ALL_CARDS), 52)
+
+    def test_lowest_highest(self):
+        mask = Bitboard.get_mask([StandardPlayingCard(Suit.Diamonds, Value.Four),
+                                  StandardPlayingCard(Suit.Diamonds, Value.Jack),
+                                  StandardPlayingCard(Suit.Diamonds, Value.Seven)])
+
+        self.assertEqual(Bitboard.lowest_in_suit(mask, Suit.Diamonds), Bitboard.get_index(Suit.Diamonds, Value.Four))
+        self.assertEqual(Bitboard.highest_in_suit(mask, Suit.Diamonds), Bitboard.get_index(Suit.Diamonds, Value.Jack))
+        self.assertEqual(Bitboard.lowest_in_suit(mask, Suit.Clubs), -1)
+
+        # Highest card under a Ten is the Seven
+        self.assertEqual(Bitboard.highest_index(mask & Bitboard.below(Suit.Diamonds, Value.Ten)),
+                         Bitboard.get_index(Suit.Diamonds, Value.Seven))
+
+    def test_points(self):
+        mask = Bitboard.get_mask([StandardPlayingCard(Suit.Hearts, Value.Two),
+                                  StandardPlayingCard(Suit.Hearts, Value.Ace),
+                                  StandardPlayingCard(Suit.Spades, Value.Queen),
+                                  StandardPlayingCard(Suit.Spades, Value.King)])
+
+        self.assertEqual(Bitboard.points(mask), 15)
+        self.assertEqual(Bitboard.points(Bitboard.ALL_CARDS), 26)
+
+    def test_legal_moves(self):
+        heart = StandardPlayingCard(Suit.Hearts, Value.Five)
+        club = StandardPlayingCard(Suit.Clubs, Value.Five)
+        mask = Bitboard.get_mask([heart, club])
+
+        # Hearts can't be led until broken
+        self.assertEqual(Bitboard.legal_moves(mask, None, False), Bitboard.card_bit(club))
+        self.assertEqual(Bitboard.legal_moves(mask, None, True), mask)
+
+        # Suit must be followed
+        self.assertEqual(Bitboard.legal_moves(mask, Suit.Hearts, False), Bitboard.card_bit(heart))
+
+        # Anything can be played without the suit that was led
+        self.assertEqual(Bitboard.legal_moves(mask, Suit.Spades, False), mask)
+
+        # Only hearts left can be led
+        self.assertEqual(Bitboard.legal_moves(Bitboard.card_bit(heart), None, False), Bitboard.card_bit(heart))
+
+
+class HandTests(unittest.TestCase):
+    def test_hand(self):
+        hand = Bitboard.Hand()
+        two_of_clubs = StandardPlayingCard(Suit.Clubs, Value.Two)
+        queen_of_spades = StandardPlayingCard(Suit.Spades, Value.Queen)
+        king_of_spades = StandardPlayingCard(Suit.Spades, Value.King)
+
+        hand.append(queen_of_spades)
+        hand += [two_of_clubs, king_of_spades]
+        self.assertEqual(hand.mask, Bitboard.get_mask([two_of_clubs, queen_of_spades, king_of_spades]))
+        self.assertTrue(two_of_clubs in hand)
+        self.assertIs(hand.has_card(Suit.Spades, Value.King), king_of_spades)
+        self.assertIs(hand.lowest_in_suit(Suit.Spades), queen_of_spades)
+        self.assertIs(hand.highest_in_suit_below(Suit.Spades, Value.King), queen_of_spades)
+        self.assertIsNone(hand.highest_in_suit_below(Suit.Spades, Value.Queen))
+        self.assertEqual(hand.count_suit(Suit.Spades), 2)
+
+        # Removing cards updates the bitboard
+        hand.remove(queen_of_spades)
+        self.assertFalse(queen_of_spades in hand)
+        self.assertIs(hand.pop(), king_of_spades)
+        self.assertEqual(hand.mask, Bitboard.card_bit(two_of_clubs))
+
+        del hand[:]
+        self.assertEqual(hand.mask, 0)
+        self.assertFalse(hand.has_suit(Suit.Clubs))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import unittest
+from Core import CardLogging
+
+__author__ = 'Evan'
+
+
+class CountStr:
+    # Counts the times it is formatted
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return 'counted'
+
+
+class BrokenStr:
+    # Stops the writer thread when it is formatted
+    def __str__(self):
+        raise RuntimeError('broken')
+
+
+class LoggerTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.directory, 'Hearts.txt')
+        self.logger = CardLogging.Logger(self.file_name)
+
+    def tearDown(self):
+        self.logger.close()
+        shutil.rmtree(self.directory)
+
+    def read_lines(self):
+        with open(self.file_name) as _file:
+            return _file.read().splitlines()
+
+    def test_log(self):
+        self.logger.log('State: Initializing %s', 'Setup')
+        self.logger.debug('---SetupState enter() enter---')
+        self.logger.warning('Points: %s, %s', 3, 100)
+        self.logger.info('')
+        self.logger.info('100% of %s', 'cards')
+        self.logger.error('No values: 100%')
+        self.logger.flush()
+        self.assertEqual(self.read_lines(), ['1. INFO: State: Initializing Setup', '2. WARNING: Points: 3, 100',
+                                             '3. INFO: 100% of %s (\'cards\',)', '4. ERROR: No values: 100%'])
+
+        # File is opened again after closing
+        self.logger.close()
+        self.logger.level = CardLogging.DEBUG
+        self.logger.debug('---SetupState enter() exit---')
+        self.logger.close()
+        self.assertEqual(self.read_lines()[-1], '5. DEBUG: ---SetupState enter() exit---')
+
+    def test_open_failed(self):
+        # File that can't be opened raises, and nothing is left waiting for a writer
+        logger = CardLogging.Logger(os.path.join(self.directory, 'Missing', 'Hearts.txt'))
+        self.assertRaises(IOError, logger.info, 'State: %s', 'Setup')
+        self.assertIsNone(logger._writer)
+        self.assertEqual(len(logger._queue), 0)
+
+        # Logging again tries the file again
+        os.mkdir(os.path.join(self.directory, 'Missing'))
+        logger.info('State: %s', 'Setup')
+        logger.close()
+        with open(logger.file_name) as _file:
+            self.assertEqual(_file.read().splitlines(), ['1. INFO: State: Setup'])
+
+    def test_writer_stopped(self):
+        # Writer that stopped is started again by the next message
+        stderr = sys.stderr
+        sys.stderr = open(os.devnull, 'w')
+        try:
+            self.logger.info('Value: %s', BrokenStr())
+            self.logger._writer.join()
+        finally:
+            sys.stderr.close()
+            sys.stderr = stderr
+
+        self.logger.info('State: %s', 'Setup')
+        self.logger.flush()
+        self.assertEqual(self.read_lines(), ['1. INFO: State: Setup'])
+
+    def test_level(self):
+        # Messages that are not logged are not formatted, and do not open the file
+        value = CountStr()
+        self.logger.debug('Value: %s', value)
+        self.logger.enabled = False
+        self.logger.error('Value: %s', value)
+        self.logger.flush()
+        self.assertEqual(value.count, 0)
+        self.assertFalse(os.path.exists(self.file_name))
+        self.assertFalse(self.logger.is_enabled_for(CardLogging.ERROR))
+
+        self.logger.enabled = True
+        self.assertFalse(self.logger.is_enabled_for(CardLogging.DEBUG))
+        self.assertTrue(self.logger.is_enabled_for(CardLogging.INFO))
+        for i in range(0, 1000):
+            self.logger.info('Value %s: %s', i, value)
+        self.logger.flush()
+        self.assertEqual(value.count, 1000)
+        self.assertEqual(len(self.read_lines()), 1000)
+
+
+class FlightRecorderTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.directory, 'Hearts_Flight.txt')
+        self.logger = CardLogging.Logger(os.path.join(self.directory, 'Hearts.txt'), enabled=False)
+        self.recorder = CardLogging.FlightRecorder(size=5)
+
+    def tearDown(self):
+        self.recorder.uninstall()
+        self.logger.close()
+        shutil.rmtree(self.directory)
+
+    def read_lines(self):
+        with open(self.file_name) as _file:
+            return _file.read().splitlines()
+
+    def test_record(self):
+        # Every level is kept while the logger writes nothing, and only the last messages are kept
+        self.recorder.install(self.logger, signal_number=None)
+        self.logger.info('Trick %s', 1)
+        self.logger.debug('---PlayingState enter() enter---')
+        for i in range(2, 8):
+            self.logger.log('Trick %s', i)
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertEqual(self.recorder.count, 8)
+        messages = self.recorder.get_messages()
+        self.assertEqual([message for message_time, level, message in messages],
+                         ['Trick 3', 'Trick 4', 'Trick 5', 'Trick 6', 'Trick 7'])
+        self.assertEqual(sorted(messages), messages)
+
+        self.recorder.level = CardLogging.WARNING
+        self.logger.info('Trick %s', 8)
+        self.logger.error('Card %s not in hand', 'Ace of Spades')
+        self.recorder.dump(self.file_name, reason='Test')
+        lines = self.read_lines()
+        self.assertEqual(lines[0], 'Test')
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[-1].endswith(' ERROR: Card Ace of Spades not in hand'))
+
+        # Nothing is recorded after uninstalling
+        self.recorder.uninstall()
+        self.logger.error('Not recorded')
+        self.assertEqual(self.recorder.count, 9)
+
+    def test_dump(self):
+        dumps = []
+        self.recorder.dump = lambda file_name=None, reason=None: dumps.append(reason)
+        excepthook = sys.excepthook
+        calls = []
+        sys.excepthook = lambda *args: calls.append(args[0])
+        try:
+            self.recorder.install(self.logger)
+            self.logger.info('Playing')
+
+            # Uncaught exceptions dump, then go to the hook that was replaced
+            try:
+                raise ValueError('Bad card')
+            except ValueError:
+                sys.excepthook(*sys.exc_info())
+            self.assertEqual(dumps, ['Uncaught exception: ValueError: Bad card'])
+            self.assertEqual(calls, [ValueError])
+
+            if hasattr(signal, 'SIGUSR1'):
+                os.kill(os.getpid(), signal.SIGUSR1)
+                self.assertEqual(dumps[1], 'Signal ' + str(signal.SIGUSR1))
+
+            self.recorder.uninstall()
+            self.assertEqual(len(calls), 1)
+            self.assertNotEqual(sys.excepthook, self.recorder._handle_exception)
+        finally:
+            sys.excepthook = excepthook
+
+if __name__ == '__main__':
+    unittest.main()
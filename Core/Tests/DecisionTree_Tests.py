@@ -0,0 +1,133 @@
+import random
+import unittest
+from CardEngine.Engine import StandardPlayingCard
+from Core import Bitboard
+from Core.Constant import Check
+from Core.Constant import ComparisonType
+from Core.Constant import Suit
+from Core.Constant import Value
+from Core.Player.AI import AI
+from Core.Player.AI import _Actions as Actions
+from Core.Player.AI import _DecisionTree as DecisionTree
+
+__author__ = 'Evan'
+
+
+def deal_hand(rng, size=13):
+    deck = [StandardPlayingCard(suit, value) for suit in range(Suit.Clubs, Suit.Hearts + 1)
+            for value in range(Value.Two, Value.Ace + 1)]
+    return Bitboard.Hand(rng.sample(deck, size))
+
+
+class RecordAction(Actions._Action):
+    def __init__(self):
+        Actions._Action.__init__(self, Check.PlayerHand)
+        self.cards = []
+
+    def process(self, player, possible_cards, trick_pile):
+        self.cards.append(list(possible_cards))
+
+
+class CompiledTreeTests(unittest.TestCase):
+    def test_passing_tree(self):
+        # Compiled tree picks the same card as the nodes for every hand, all the way through passing three cards
+        rng = random.Random(1)
+        tree = AI._PassingDecisionTree()
+        for i in range(0, 300):
+            hand = deal_hand(rng)
+            for j in range(0, 3):
+                card = tree.base_node.process(None, hand, [])
+                self.assertIs(tree.process(None, hand, []), card)
+                hand.remove(card)
+
+    def test_value_check(self):
+        rng = random.Random(2)
+        for comparison_type in [ComparisonType.Equal, ComparisonType.GreaterThan, ComparisonType.GreaterThanOrEqual,
+                                ComparisonType.LessThan, ComparisonType.LessThanOrEqual, ComparisonType.Empty]:
+            # Lowest card is shared by both branches, and is compiled once
+            lowest = DecisionTree.SelectLowestValueLeaf()
+            base_node = DecisionTree.ValueCheckNode(Value.Ten, comparison_type, Check.PlayerHand, lowest,
+                                                    DecisionTree.SelectHighestValueLeaf())
+            base_node.pass_node = DecisionTree.SuitCheckNode(Suit.Hearts, Check.PlayerHand, lowest, lowest)
+            compiled_tree = DecisionTree.CompiledTree(base_node)
+            self.assertEqual(len(compiled_tree.instructions), 4)
+
+            for i in range(0, 50):
+                hand = deal_hand(rng, 5)
+                self.assertIs(compiled_tree.process(None, hand, []), base_node.process(None, hand, []))
+
+                # Plain lists work as well as hands
+                cards = list(hand)
+                self.assertIs(compiled_tree.process(None, cards, []), base_node.process(None, cards, []))
+
+    def test_actions(self):
+        hand = Bitboard.Hand([StandardPlayingCard(Suit.Hearts, Value.Two), StandardPlayingCard(Suit.Clubs, Value.Ace),
+                              StandardPlayingCard(Suit.Hearts, Value.King)])
+
+        action = RecordAction()
+        base_node = DecisionTree.SuitCheckNode(Suit.Hearts, Check.PlayerHand, DecisionTree.SelectLowestValueLeaf())
+        base_node.pass_action_list = [action]
+
+        # Action list is copied when the tree is compiled, so the compiled copy of the action gets the cards
+        compiled_tree = DecisionTree.CompiledTree(base_node)
+        self.assertIs(compiled_tree.process(None, hand, []), hand[0])
+        compiled_action = compiled_tree.instructions[0][5][0]
+        self.assertEqual(compiled_action.cards, [[hand[0], hand[2]]])
+
+        # Missing nodes end the tree
+        self.assertIsNone(DecisionTree.CompiledTree(DecisionTree.SuitCheckNode(Suit.Spades, Check.PlayerHand))
+                          .process(None, hand, []))
+        self.assertIsNone(DecisionTree.CompiledTree(None).process(None, hand, []))
+
+
+class TreeCacheTests(unittest.TestCase):
+    def test_cache(self):
+        cache = DecisionTree.TreeCache(2)
+        cache.put(1, 10)
+        cache.put(2, 20)
+
+        # Using the first entry makes the second one the least recently used
+        self.assertEqual(cache.get(1), 10)
+        cache.put(3, 30)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), 30)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+    def test_passing_tree(self):
+        rng = random.Random(3)
+        cache = DecisionTree.TreeCache(100)
+        compiled_tree = DecisionTree.CompiledTree(AI._PassingDecisionTree().base_node)
+        self.assertEqual(DecisionTree.CompiledTree(AI._PassingDecisionTree().base_node).version, compiled_tree.version)
+
+        hands = [deal_hand(rng) for i in range(0, 20)]
+        for hand in hands:
+            self.assertIs(compiled_tree.process(None, hand, [], cache), compiled_tree.process(None, hand, []))
+        self.assertEqual(cache.misses, 20)
+
+        # Same cards in a different order and a different list are found in the cache
+        for hand in hands:
+            cards = list(reversed(hand))
+            self.assertIs(compiled_tree.process(None, cards, [], cache), compiled_tree.process(None, cards, []))
+        self.assertEqual(cache.hits, 20)
+
+    def test_not_cached(self):
+        cache = DecisionTree.TreeCache()
+        cards = [StandardPlayingCard(Suit.Hearts, Value.King), StandardPlayingCard(Suit.Clubs, Value.King)]
+
+        # Highest card is a tie between two suits, so the pick depends on the order of the cards
+        compiled_tree = DecisionTree.CompiledTree(DecisionTree.SelectHighestValueLeaf())
+        self.assertIs(compiled_tree.process(None, cards, [], cache), cards[0])
+        self.assertIs(compiled_tree.process(None, cards[::-1], [], cache), cards[1])
+        self.assertEqual(len(cache), 0)
+
+        # Actions may depend on more than the cards, so trees with actions aren't cached at all
+        base_node = DecisionTree.SuitCheckNode(Suit.Hearts, Check.PlayerHand, DecisionTree.SelectLowestValueLeaf())
+        base_node.pass_action_list = [RecordAction()]
+        self.assertIsNone(DecisionTree.CompiledTree(base_node).version)
+
+if __name__ == '__main__':
+    unittest.main()
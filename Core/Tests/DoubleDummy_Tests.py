@@ -0,0 +1,113 @@
+import random
+import unittest
+from Core import Bitboard
+from Core import CardLogging
+from Core import Simulation
+from Core.Constant import Suit
+from Core.Constant import Value
+from Core.Player.AI import AI
+from Core.Player.AI import DoubleDummy
+from Core.Player.AI import _Playout as Playout
+
+CardLogging.log_file.enabled = False
+
+__author__ = 'Evan'
+
+
+def minimax(position, seat):
+    # Plain search over every legal card, to check the solver against
+    if position.is_done():
+        return position.get_points()[seat]
+
+    values = []
+    for move in Bitboard.indices(position.legal_moves()):
+        child = position.copy()
+        child.play(move)
+        values.append(minimax(child, seat))
+
+    if position.to_move() == seat:
+        return min(values)
+    return max(values)
+
+
+def random_endgame(rng, tricks):
+    cards = range(0, 52)
+    rng.shuffle(cards)
+
+    position = Playout.Position()
+    for seat in range(0, 4):
+        for index in cards[seat * 13:(seat + 1) * 13]:
+            position.hands[seat] |= 1 << index
+    position.counts = [13, 13, 13, 13]
+
+    # Play with the rollout policy up to a few cards before the end, sometimes stopping inside a trick
+    while sum(position.counts) > tricks * 4 + rng.randrange(0, 4):
+        position.play(Playout.policy_move(position))
+    return position
+
+
+class TranspositionTableTests(unittest.TestCase):
+    def test_table(self):
+        table = DoubleDummy.TranspositionTable(100)
+        self.assertEqual(table.size, 64)
+
+        # Deep entry keeps the position with the most cards left, and the other entry takes the rest
+        table.store(1, 20, 5, DoubleDummy.EXACT, 3)
+        table.store(1 + 64, 8, 2, DoubleDummy.EXACT, 4)
+        self.assertEqual(table.probe(1)[2], 5)
+        self.assertEqual(table.probe(1 + 64)[2], 2)
+
+        table.store(1 + 128, 4, 1, DoubleDummy.EXACT, 5)
+        self.assertIsNone(table.probe(1 + 64))
+        self.assertEqual(table.probe(1)[2], 5)
+
+
+class SolverTests(unittest.TestCase):
+    def test_solve(self):
+        position = Playout.Position()
+        position.hands = [Bitboard.get_bit(Suit.Clubs, Value.King) | Bitboard.get_bit(Suit.Hearts, Value.Jack),
+                          Bitboard.get_bit(Suit.Clubs, Value.Seven) | Bitboard.get_bit(Suit.Diamonds, Value.Nine),
+                          Bitboard.get_bit(Suit.Clubs, Value.Jack) | Bitboard.get_bit(Suit.Diamonds, Value.Eight),
+                          Bitboard.get_bit(Suit.Clubs, Value.Queen) | Bitboard.get_bit(Suit.Clubs, Value.Ace)]
+        position.counts = [2, 2, 2, 2]
+        position.played = Bitboard.ALL_CARDS & ~(position.hands[0] | position.hands[1] | position.hands[2] |
+                                                 position.hands[3])
+        position.taken = [0, position.played & Bitboard.HEARTS, position.played & ~Bitboard.HEARTS, 0]
+        position.leader = 3
+        position.hearts_broken = True
+
+        # Leading the Queen lets player one win with the King and keep the Jack of Hearts.  Leading the Ace
+        # keeps the lead, and player one throws the Jack of Hearts on the Queen
+        points, move = DoubleDummy.Solver().solve(position, 3)
+        self.assertEqual(move, Bitboard.get_index(Suit.Clubs, Value.Queen))
+        self.assertEqual(points, 0)
+
+    def test_against_minimax(self):
+        rng = random.Random(3)
+        solver = DoubleDummy.Solver(table_size=1 << 10)
+        for i in range(0, 15):
+            position = random_endgame(rng, 2)
+
+            # Value matches a full search for every seat, with one solver and its table kept throughout, and the
+            # solver's card keeps that value
+            for seat in range(0, 4):
+                points, move = solver.solve(position, seat)
+                self.assertEqual(points, minimax(position, seat))
+                child = position.copy()
+                child.play(move)
+                self.assertEqual(minimax(child, seat), points)
+
+
+class EndgameTests(unittest.TestCase):
+    def test_play(self):
+        ai = AI.MonteCarloAI(rollouts=3, seed=1, endgame_tricks=4)
+        game = Simulation.HeadlessHearts(seed=2, ai_list=[ai, AI.ComputerAI(), AI.ComputerAI(), AI.ComputerAI()])
+        scoring_state = game.stateMachine.state_list["Scoring"]
+
+        while len(scoring_state.player_one_points) < 2:
+            game.stateMachine.update()
+
+        self.assertEqual(sum(game.get_round_points()[0]) % 26, 0)
+
+if __name__ == '__main__':
+    unittest.main()
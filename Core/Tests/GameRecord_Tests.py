@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+from Core import CardLogging
+from Core import GameRecord
+from Core import Simulation
+
+__author__ = 'Evan'
+
+CardLogging.log_file.enabled = False
+
+
+class GameRecordTests(unittest.TestCase):
+    def setUp(self):
+        self.game = Simulation.HeadlessHearts(seed=3)
+        self.total_points = self.game.play()
+        self.game_record = self.game.game_record
+
+    def test_pack(self):
+        indices = [0, 51, 17, 32, 5, 1, 63]
+        data = GameRecord.pack_cards(indices)
+        self.assertEqual(len(data), 6)
+        self.assertEqual(GameRecord.unpack_cards('xx' + data, 2, 6), (indices[:6], 8))
+
+        # Indices past the end of the deck, and cards past the end of the data, are not read
+        self.assertRaises(GameRecord.RecordError, GameRecord.unpack_cards, data, 0, 7)
+        self.assertRaises(GameRecord.RecordError, GameRecord.unpack_cards, data, 3, 4)
+
+    def test_record(self):
+        # Every round has its deal, passes on three of every four rounds, and every card played
+        rounds = self.game_record.get_number_of_rounds()
+        self.assertEqual(len(self.game.get_round_points()), rounds)
+        self.assertEqual(self.game_record.total_points, self.total_points)
+        for round_number in range(0, rounds):
+            self.assertEqual(sorted(self.game_record.plays[round_number]), range(0, 52))
+            self.assertEqual(self.game_record.passes[round_number] is None, round_number % 4 == 3)
+
+        data = self.game_record.to_string()
+        self.assertEqual(len(data), 14 + rounds * 89 - rounds // 4 * 9)
+
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, 'Hearts.hrc')
+            self.game_record.save(file_name)
+            self.assertEqual(GameRecord.load(file_name).to_string(), data)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_replay(self):
+        game_record = GameRecord.GameRecord.from_string(self.game_record.to_string())
+        replay_game = Simulation.ReplayHearts(game_record)
+        self.assertEqual(replay_game.play(), self.total_points)
+        self.assertTrue(replay_game.game_over)
+        self.assertEqual(replay_game.game_record.to_string(), self.game_record.to_string())
+
+    def test_unfinished(self):
+        # Record of a game stopped in the middle of a round plays up to where it stopped
+        game_record = GameRecord.GameRecord.from_string(self.game_record.to_string())
+        del game_record.deals[3:]
+        del game_record.passes[3:]
+        del game_record.plays[3:]
+        del game_record.plays[2][30:]
+        game_record.total_points = [sum(points) for points in zip(*self.game.get_round_points()[:2])]
+
+        replay_game = Simulation.ReplayHearts(game_record)
+        self.assertEqual(replay_game.play(), game_record.total_points)
+        self.assertFalse(replay_game.game_over)
+        self.assertEqual(replay_game.game_record.plays, game_record.plays)
+
+    def test_mismatch(self):
+        # Cards that are not in the hand, or points that do not add up, are caught
+        game_record = GameRecord.GameRecord.from_string(self.game_record.to_string())
+        plays = game_record.plays[0]
+        plays[4], plays[5] = plays[5], plays[4]
+        self.assertRaises(GameRecord.RecordError, Simulation.replay, game_record)
+
+        game_record = GameRecord.GameRecord.from_string(self.game_record.to_string())
+        game_record.total_points[0] += 1
+        self.assertRaises(GameRecord.RecordError, Simulation.replay, game_record)
+
+        self.assertRaises(GameRecord.RecordError, GameRecord.GameRecord.from_string, 'HRT' + '\x00' * 20)
+        self.assertRaises(GameRecord.RecordError, GameRecord.GameRecord.from_string,
+                          self.game_record.to_string()[:-1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import time
+import unittest
+from Core import Bitboard
+from Core import CardLogging
+from Core import Simulation
+from Core.Constant import Suit
+from Core.Player.AI import AI
+from Core.Player.AI import _ISMCTS as ISMCTS
+from Core.Player.AI import _Playout as Playout
+
+CardLogging.log_file.enabled = False
+
+__author__ = 'Evan'
+
+
+class NodePoolTests(unittest.TestCase):
+    def test_pool(self):
+        pool = ISMCTS.NodePool(3)
+        root = pool.allocate(None, None, -1)
+        child = pool.allocate(root, 1, 0)
+        root.children[1] = child
+        root.children[2] = pool.allocate(root, 2, 0)
+
+        # Pool never hands out more nodes than it has
+        self.assertIsNone(pool.allocate(root, 3, 0))
+        self.assertEqual(pool.nodes_in_use, 3)
+
+        # Released nodes are reused
+        pool.release(root)
+        self.assertEqual(pool.nodes_in_use, 0)
+        self.assertIsNotNone(pool.allocate(None, None, -1))
+        self.assertEqual(pool.created, 3)
+
+
+class SearchTests(unittest.TestCase):
+    def setUp(self):
+        self.position = Playout.Position()
+        self.position.hands = [Bitboard.SUIT_MASK[suit] for suit in Playout.SUITS]
+        self.position.counts = [13, 13, 13, 13]
+
+    def test_run(self):
+        search = ISMCTS.Search(max_nodes=500, seed=1)
+        position = self.position
+        position.play(Playout.TWO_OF_CLUBS)
+
+        # Search stays inside the node pool and picks a legal card
+        move = search.run(position, 3, iterations=200)
+        self.assertTrue(position.legal_moves() & (1 << move))
+        self.assertTrue(search.pool.nodes_in_use <= 500)
+
+        # Root moves down to the card that was played, and the rest of the tree is given back
+        kept = search.root.children[move].visits
+        search.advance([move], position.get_gone())
+        self.assertEqual(search.root.visits, kept)
+        self.assertIsNone(search.root.parent)
+
+        # Cards not in the tree start a new one.  Player four holds every heart, so no one else can play one
+        search.advance([Bitboard.get_index(Suit.Hearts, 5)], position.get_gone())
+        self.assertIsNone(search.root)
+        self.assertEqual(search.pool.nodes_in_use, 0)
+
+    def test_deadline(self):
+        search = ISMCTS.Search(seed=1)
+        start = time.time()
+        search.run(self.position, 0, deadline=start + 0.05)
+        self.assertTrue(time.time() - start < 0.5)
+        self.assertTrue(search.iterations >= 1)
+
+
+class ISMCTSAITests(unittest.TestCase):
+    def test_play(self):
+        ai = AI.ISMCTSAI(time_limit=None, iterations=20, max_nodes=200, seed=1)
+        game = Simulation.HeadlessHearts(seed=2, ai_list=[ai, AI.ComputerAI(), AI.ComputerAI(), AI.ComputerAI()])
+        scoring_state = game.stateMachine.state_list["Scoring"]
+
+        while len(scoring_state.player_one_points) < 3:
+            game.stateMachine.update()
+
+        # Two full rounds played with the tree held to its node limit
+        self.assertEqual([sum(points) % 26 for points in game.get_round_points()], [0, 0])
+        self.assertTrue(ai.search.pool.created <= 200)
+
+if __name__ == '__main__':
+    unittest.main()
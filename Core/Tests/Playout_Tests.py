@@ -0,0 +1,141 @@
+import random
+import unittest
+from Core import Bitboard
+from Core import CardLogging
+from Core import Simulation
+from Core.Constant import Suit
+from Core.Constant import Value
+from Core.Player.AI import AI
+from Core.Player.AI import _Playout as Playout
+
+CardLogging.log_file.enabled = False
+
+__author__ = 'Evan'
+
+
+def index(suit, value):
+    return Bitboard.get_index(suit, value)
+
+
+class PositionTests(unittest.TestCase):
+    def setUp(self):
+        # Deal the deck in order: player one gets every club, player two every diamond, and so on
+        self.position = Playout.Position()
+        self.position.hands = [Bitboard.SUIT_MASK[suit] for suit in Playout.SUITS]
+        self.position.counts = [13, 13, 13, 13]
+
+    def test_play(self):
+        position = self.position
+
+        # Two of Clubs starts, and play goes from player one to player four
+        self.assertEqual(position.legal_moves(), Bitboard.get_bit(Suit.Clubs, Value.Two))
+        position.play(index(Suit.Clubs, Value.Two))
+        self.assertEqual(position.to_move(), 3)
+
+        # Player four is out of clubs, so anything can be played
+        self.assertEqual(position.legal_moves(), position.hands[3])
+        position.play(index(Suit.Hearts, Value.Ace))
+        position.play(index(Suit.Spades, Value.Queen))
+        position.play(index(Suit.Diamonds, Value.Five))
+
+        # Player one takes the trick, and everyone else is known to be out of clubs
+        self.assertEqual(position.leader, 0)
+        self.assertEqual(Bitboard.points(position.taken[0]), 14)
+        self.assertTrue(position.hearts_broken)
+        self.assertEqual(position.voids[1:], [Bitboard.SUIT_MASK[Suit.Clubs]] * 3)
+
+    def test_points(self):
+        position = self.position
+        position.taken = [Bitboard.POINT_CARDS, 0, 0, 0]
+        self.assertEqual(position.get_points(), [0, 26, 26, 26])
+
+        position.taken = [Bitboard.HEARTS, Bitboard.get_bit(Suit.Spades, Value.Queen), 0, 0]
+        self.assertEqual(position.get_points(), [13, 13, 0, 0])
+
+    def test_rollout(self):
+        position = Playout.rollout(self.position.copy())
+        self.assertTrue(position.is_done())
+        self.assertEqual(sum(position.get_points()) % 26, 0)
+
+        # Copies don't share state
+        self.assertEqual(self.position.counts, [13, 13, 13, 13])
+
+    def test_equivalent_moves(self):
+        moves = Bitboard.get_bit(Suit.Spades, Value.Nine) | Bitboard.get_bit(Suit.Spades, Value.Jack) | \
+            Bitboard.get_bit(Suit.Spades, Value.Queen) | Bitboard.get_bit(Suit.Spades, Value.King)
+
+        # Nine and Jack are the same card once the Ten is gone, but the Queen is worth points
+        self.assertEqual(Playout.equivalent_moves(moves, moves),
+                         [index(Suit.Spades, Value.Nine), index(Suit.Spades, Value.Jack),
+                          index(Suit.Spades, Value.Queen), index(Suit.Spades, Value.King)])
+        gone = moves | Bitboard.get_bit(Suit.Spades, Value.Ten)
+        self.assertEqual(Playout.equivalent_moves(moves, gone),
+                         [index(Suit.Spades, Value.Nine), index(Suit.Spades, Value.Queen),
+                          index(Suit.Spades, Value.King)])
+
+    def test_gone(self):
+        position = self.position
+        position.play(index(Suit.Clubs, Value.Two))
+        position.play(index(Suit.Hearts, Value.Two))
+        position.play(index(Suit.Spades, Value.Two))
+        position.play(index(Suit.Diamonds, Value.Two))
+        position.play(index(Suit.Clubs, Value.Ten))
+
+        # Ten of Clubs is still in the trick, so the Nine and Jack of Clubs are not the same card
+        gone = position.get_gone(0)
+        self.assertFalse(gone & Bitboard.get_bit(Suit.Clubs, Value.Ten))
+        self.assertTrue(gone & Bitboard.get_bit(Suit.Clubs, Value.Two))
+        self.assertEqual(Playout.equivalent_moves(Bitboard.get_bit(Suit.Clubs, Value.Nine) |
+                                                  Bitboard.get_bit(Suit.Clubs, Value.Jack), gone),
+                         [index(Suit.Clubs, Value.Nine), index(Suit.Clubs, Value.Jack)])
+
+    def test_determinize(self):
+        position = Playout.Position()
+        position.hands[0] = Bitboard.SUIT_MASK[Suit.Clubs]
+        position.counts = [13, 13, 13, 13]
+        position.voids[1] = Bitboard.SUIT_MASK[Suit.Hearts]
+        position.voids[2] = Bitboard.SUIT_MASK[Suit.Hearts]
+
+        rng = random.Random(1)
+        for i in range(0, 20):
+            world = Playout.determinize(position, 0, rng)
+
+            # Every card is dealt once, and player four has to hold all the hearts
+            self.assertEqual(world.hands[0], position.hands[0])
+            self.assertEqual(sum(world.hands), Bitboard.ALL_CARDS)
+            self.assertEqual([Bitboard.count(hand) for hand in world.hands], [13, 13, 13, 13])
+            self.assertEqual(world.hands[3], Bitboard.HEARTS)
+
+
+class MonteCarloAITests(unittest.TestCase):
+    def test_play(self):
+        ai_list = [AI.MonteCarloAI(rollouts=5, seed=1), AI.ComputerAI(), AI.ComputerAI(), AI.ComputerAI()]
+        game = Simulation.HeadlessHearts(seed=2, ai_list=ai_list)
+        scoring_state = game.stateMachine.state_list["Scoring"]
+
+        # Only play the first round, which is enough to check every card played was legal
+        while len(scoring_state.player_one_points) < 2:
+            game.stateMachine.update()
+
+        self.assertEqual(sum(len(player.tricks) for player in game.get_players()), 52)
+        self.assertEqual(sum(game.get_round_points()[0]) % 26, 0)
+
+    def test_observe(self):
+        game = Simulation.HeadlessHearts(seed=2)
+        while game.stateMachine.current_state is not game.stateMachine.state_list["Playing"]:
+            game.stateMachine.update()
+        for i in range(0, 6):
+            game.stateMachine.update()
+
+        # Player sees its own hand, and every card that was played
+        playing_state = game.stateMachine.state_list["Playing"]
+        players = game.get_players()
+        seat = players.index(playing_state.currentPlayer)
+        position = Playout.observe(players, seat, playing_state.trickPile, game.heartsBroken)
+
+        self.assertEqual(position.hands[seat], players[seat].hand.mask)
+        self.assertEqual(position.to_move(), seat)
+        self.assertEqual(Bitboard.count(position.played), 52 - sum(len(player.hand) for player in players))
+
+if __name__ == '__main__':
+    unittest.main()
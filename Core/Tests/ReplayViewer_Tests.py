@@ -0,0 +1,98 @@
+import os
+import unittest
+import pygame
+from Core import Bitboard
+from Core import CardLogging
+from Core import ReplayViewer
+from Core import Simulation
+
+__author__ = 'Evan'
+
+CardLogging.log_file.enabled = False
+
+
+class TimelineTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.game = Simulation.HeadlessHearts(seed=2)
+        cls.total_points = cls.game.play()
+
+    def test_keyframes(self):
+        # Table rebuilt from the keyframes matches the table looked at after every card of the game
+        timeline = ReplayViewer.Timeline(self.game.game_record)
+        every_play = ReplayViewer.Timeline(self.game.game_record, keyframe_interval=1)
+        self.assertEqual(timeline.get_number_of_rounds(), len(self.game.get_round_points()))
+        for round_number in range(0, timeline.get_number_of_rounds()):
+            self.assertEqual(timeline.get_number_of_plays(round_number), 52)
+            self.assertEqual(len(timeline.keyframes[round_number]), 14)
+            for play_number in range(0, 53):
+                self.assertEqual(vars(timeline.get_state(round_number, play_number)),
+                                 vars(every_play.keyframes[round_number][play_number]))
+        self.assertRaises(IndexError, timeline.get_state, 0, 53)
+
+    def test_state(self):
+        timeline = ReplayViewer.Timeline(self.game.game_record)
+        round_points = self.game.get_round_points()
+
+        # Scores are the totals before each round, and every card ends up in a trick
+        table_state = timeline.get_state(3, 52)
+        self.assertEqual(table_state.scores, [sum(points) for points in zip(*round_points[:3])])
+        self.assertEqual(table_state.hands, [0, 0, 0, 0])
+        self.assertEqual(sum(table_state.tricks), Bitboard.ALL_CARDS)
+        self.assertEqual(sum(table_state.get_round_points()), 26)
+
+        # Middle of a trick has the cards played so far on the table
+        table_state = timeline.get_state(3, 6)
+        self.assertEqual(len(table_state.trick_pile), 2)
+        self.assertEqual(table_state.current_suit, Bitboard.get_suit(table_state.trick_pile[0][1]))
+        self.assertEqual(sum(Bitboard.count(mask) for mask in table_state.hands), 46)
+
+        # Changing a state does not change the timeline
+        table_state.hands[0] = 0
+        self.assertNotEqual(timeline.get_state(3, 6).hands[0], 0)
+
+
+class ReplayViewerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        game = Simulation.HeadlessHearts(seed=4)
+        game.play()
+        cls.viewer = ReplayViewer.ReplayViewer(game.game_record)
+
+    def press(self, key):
+        self.viewer.stateMachine.handle_keypress(pygame.event.Event(pygame.KEYDOWN, key=key))
+        return self.viewer.round_number, self.viewer.play_number
+
+    def test_keys(self):
+        self.viewer.seek(1, 0)
+        self.assertEqual(self.press(pygame.K_RIGHT), (1, 1))
+        self.assertEqual(self.press(pygame.K_DOWN), (1, 4))
+        self.assertEqual(self.press(pygame.K_DOWN), (1, 8))
+        self.assertEqual(self.press(pygame.K_LEFT), (1, 7))
+        self.assertEqual(self.press(pygame.K_UP), (1, 4))
+        self.assertEqual(self.press(pygame.K_END), (1, 52))
+        self.assertEqual(self.press(pygame.K_RIGHT), (2, 0))
+        self.assertEqual(self.press(pygame.K_LEFT), (1, 52))
+        self.assertEqual(self.press(pygame.K_PAGEUP), (0, 0))
+        self.assertEqual(self.press(pygame.K_LEFT), (0, 0))
+        self.assertEqual(self.press(pygame.K_HOME), (0, 0))
+
+    def test_cards(self):
+        # Hands are face up, cards in the trick pile are in front of the seat that played them
+        self.viewer.seek(2, 6)
+        table_state = self.viewer.table_state
+        visible = [card_ui for card_ui in self.viewer.card_ui_elements if card_ui.visible]
+        self.assertEqual(len(visible), 46 + 2)
+        self.assertTrue(all(card_ui.front_view for card_ui in visible))
+        for seat, index in table_state.trick_pile:
+            card_ui = self.viewer.card_ui_lookup[index]
+            self.assertEqual(card_ui.rect.topleft, ReplayViewer.TRICK_PILE_LOCATIONS[seat])
+
+        # Taken cards are not shown
+        self.viewer.seek(2, 52)
+        self.assertFalse(any(card_ui.visible for card_ui in self.viewer.card_ui_elements))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import multiprocessing
+import random
+import unittest
+from Core import CardLogging
+from Core import Simulation
+from Core.Player.AI import AI
+
+CardLogging.log_file.enabled = False
+
+
+class HeadlessHeartsTests(unittest.TestCase):
+    def test_play(self):
+        game = Simulation.HeadlessHearts(seed=1)
+        total_points = game.play()
+
+        # Game only ends once a player reaches 100 points
+        self.assertTrue(game.game_over)
+        self.assertTrue(max(total_points) >= 100)
+
+        # Every round hands out 26 points, whether or not someone shot the moon
+        self.assertEqual(sum(total_points) % 26, 0)
+
+        # All cards were played
+        for player in game.get_players():
+            self.assertEqual(len(player.hand), 0)
+
+    def test_seed(self):
+        # Same seed gives the same game
+        self.assertEqual(Simulation.HeadlessHearts(seed=5).play(), Simulation.HeadlessHearts(seed=5).play())
+
+    def test_seed_ai(self):
+        # AIs without a seed are seeded by the game, so games with AIs that sample are the same every time
+        def play():
+            ai_list = [AI.MonteCarloAI(rollouts=2), AI.ISMCTSAI(time_limit=None, iterations=10, max_nodes=200),
+                       AI.ComputerAI(), AI.ComputerAI()]
+            return Simulation.HeadlessHearts(seed=3, ai_list=ai_list).play()
+        self.assertEqual(play(), play())
+
+    def test_random(self):
+        # Games neither use nor change the random numbers of anything else
+        random.seed(2)
+        value = random.random()
+        random.seed(2)
+        total_points = Simulation.HeadlessHearts(seed=5).play()
+        self.assertEqual(random.random(), value)
+
+        game = Simulation.HeadlessHearts(seed=5)
+        random.random()
+        self.assertEqual(game.play(), total_points)
+
+    def test_close(self):
+        # Worker processes of the AIs are stopped when the game is over
+        monte_carlo_ai = AI.MonteCarloAI(rollouts=2, processes=2, seed=1)
+        game = Simulation.HeadlessHearts(seed=1, ai_list=[monte_carlo_ai, AI.ComputerAI(), AI.ComputerAI(),
+                                                          AI.ComputerAI()])
+        game.play()
+        self.assertIsNone(monte_carlo_ai._pool)
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_simulate(self):
+        results = Simulation.simulate(3, seed=10)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[1], Simulation.HeadlessHearts(seed=11).play())
+
+if __name__ == '__main__':
+    unittest.main()
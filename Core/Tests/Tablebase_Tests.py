@@ -0,0 +1,100 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from Core import Bitboard
+from Core import CardLogging
+from Core.Constant import Suit
+from Core.Constant import Value
+from Core.Player.AI import DoubleDummy
+from Core.Player.AI import Tablebase
+from Core.Tests.DoubleDummy_Tests import random_endgame
+
+CardLogging.log_file.enabled = False
+
+__author__ = 'Evan'
+
+
+def random_start(rng, tricks):
+    # Endgame at the start of a trick where two seats have taken points, so nobody can shoot the moon
+    while True:
+        position = random_endgame(rng, tricks)
+        takers = [seat for seat in range(0, 4) if position.taken[seat] & Bitboard.POINT_CARDS]
+        if not position.trick and sum(position.counts) == 4 * tricks and len(takers) > 1:
+            return position
+
+
+class TablebaseTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.file_path = os.path.join(cls.directory, 'endgame.htb')
+        cls.count = Tablebase.build(cls.file_path, tricks=1)
+        cls.tablebase = Tablebase.load(cls.file_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebase.close()
+        shutil.rmtree(cls.directory)
+
+    def test_key(self):
+        hands = [Bitboard.get_bit(Suit.Clubs, Value.Two), Bitboard.get_bit(Suit.Clubs, Value.Ace),
+                 Bitboard.get_bit(Suit.Diamonds, Value.Five), Bitboard.get_bit(Suit.Hearts, Value.Ten)]
+        key, cards = Tablebase.get_key(hands, 0, True)
+
+        # Swapping clubs and diamonds, moving the cards down in rank and turning the table gives the same key
+        turned = [Bitboard.get_bit(Suit.Diamonds, Value.Four), Bitboard.get_bit(Suit.Clubs, Value.Three),
+                  Bitboard.get_bit(Suit.Hearts, Value.Two), Bitboard.get_bit(Suit.Diamonds, Value.Two)]
+        turned_key, turned_cards = Tablebase.get_key(turned, 3, True)
+        self.assertEqual(turned_key, key)
+        self.assertEqual(cards[0], Bitboard.get_index(Suit.Hearts, Value.Ten))
+        self.assertEqual(turned_cards[0], Bitboard.get_index(Suit.Hearts, Value.Two))
+
+        # Queen of Spades is kept apart from the other spades
+        hands[2] = Bitboard.get_bit(Suit.Spades, Value.Queen)
+        self.assertNotEqual(Tablebase.get_key(hands, 0, True)[0], key)
+
+    def test_file(self):
+        self.assertEqual(self.tablebase.tricks, 1)
+        self.assertEqual(self.tablebase.count, self.count)
+        self.assertIsNone(Tablebase.load(os.path.join(self.directory, 'missing.htb')))
+
+        bad_file = os.path.join(self.directory, 'bad.htb')
+        with open(bad_file, 'wb') as tablebase_file:
+            tablebase_file.write('not a tablebase')
+        self.assertRaises(ValueError, Tablebase.Tablebase, bad_file)
+
+    def test_probe(self):
+        rng = random.Random(4)
+        solver = DoubleDummy.Solver()
+        for i in range(0, 50):
+            position = random_start(rng, 1)
+            move, points = self.tablebase.probe(position)
+
+            # Same points as solving, and the leader's card gets them
+            for seat in range(0, 4):
+                taken = Bitboard.points(position.taken[seat])
+                self.assertEqual(solver.solve(position, seat)[0], taken + points[seat])
+
+            leader = position.leader
+            child = position.copy()
+            child.play(move)
+            self.assertEqual(solver.solve(child, leader)[0], Bitboard.points(position.taken[leader]) + points[leader])
+
+        # Only whole tricks are in the table
+        position.play(position.legal_moves().bit_length() - 1)
+        self.assertIsNone(self.tablebase.probe(position))
+
+    def test_solver(self):
+        rng = random.Random(5)
+        solver = DoubleDummy.Solver()
+        tablebase_solver = DoubleDummy.Solver(tablebase=self.tablebase)
+        for i in range(0, 20):
+            position = random_start(rng, 2)
+            for seat in range(0, 4):
+                self.assertEqual(tablebase_solver.solve(position, seat)[0], solver.solve(position, seat)[0])
+        self.assertGreater(self.tablebase.hits, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+from Core import CardLogging
+from Core import Tournament
+from Core.Player.AI import AI
+
+CardLogging.log_file.enabled = False
+
+__author__ = 'Evan'
+
+
+class TournamentTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint_file = os.path.join(self.directory, 'tournament.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_seatings(self):
+        # Every entrant plays every seat
+        self.assertEqual(Tournament.get_seatings(4), [(0, 1, 2, 3), (1, 2, 3, 0), (2, 3, 0, 1), (3, 0, 1, 2)])
+        self.assertEqual(Tournament.get_seatings(2), [(0, 1, 0, 1), (1, 0, 1, 0)])
+        self.assertEqual(Tournament.get_seatings(1), [(0, 0, 0, 0)])
+
+    def test_scoring(self):
+        self.assertEqual(Tournament.get_moon_shots([[0, 26, 26, 26], [13, 5, 8, 0], [26, 26, 0, 26]]), [1, 0, 1, 0])
+        self.assertEqual(Tournament.get_win_shares([40, 100, 40, 60]), [0.5, 0.0, 0.5, 0.0])
+
+    def test_run(self):
+        tournament = Tournament.Tournament([AI.ComputerAI, AI.ComputerAI], 3, seed=1, names=['A', 'B'])
+        report = tournament.run(processes=1)
+
+        self.assertEqual(report['games'], 6)
+        self.assertEqual(report['deals'], 3)
+
+        # Same AI in every seat of the same deals, so both entrants get exactly the same results
+        first, second = report['entrants']
+        self.assertEqual(first['points'], second['points'])
+        self.assertEqual(first['win_rate'], second['win_rate'])
+        self.assertAlmostEqual(sum(seat['win_rate'] for seat in report['seats']), 1.0)
+
+    def test_checkpoint(self):
+        entrants = [AI.ComputerAI, AI.ComputerAI]
+        Tournament.Tournament(entrants, 2, seed=1, checkpoint_file=self.checkpoint_file).run(processes=1)
+
+        # Resuming only plays the deals that are missing, using two worker processes
+        tournament = Tournament.Tournament(entrants, 4, seed=1, checkpoint_file=self.checkpoint_file)
+        tournament.load_checkpoint()
+        self.assertEqual(len(tournament.get_tasks()), 4)
+        report = tournament.run(processes=2)
+
+        expected = Tournament.Tournament(entrants, 4, seed=1).run(processes=1)
+        self.assertEqual(report['games'], expected['games'])
+        for entrant, expected_entrant in zip(report['entrants'], expected['entrants']):
+            self.assertAlmostEqual(entrant['points'], expected_entrant['points'])
+            self.assertAlmostEqual(entrant['win_rate'], expected_entrant['win_rate'])
+
+        # Checkpoint of a different tournament is refused
+        other = Tournament.Tournament(entrants, 4, seed=2, checkpoint_file=self.checkpoint_file)
+        self.assertRaises(ValueError, other.run, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,335 @@
+import json
+import math
+import multiprocessing
+import os
+
+from Core import Simulation
+
+__author__ = 'Evan'
+
+
+'''
+Tournament runner for comparing AIs.
+
+Every deal is played once for each seating of the AIs, so each AI gets to play every seat of the same
+cards (duplicate dealing).  Luck of the deal then cancels out between AIs, and far fewer games are needed
+to tell two AIs apart.  Games are independent of each other, so they are spread across a multiprocessing
+pool and the run scales with the number of cores.
+
+Results are written to a checkpoint file as games finish.  Running the same tournament again with the same
+checkpoint file only plays the games that are missing, so an interrupted run picks up where it stopped.
+
+Every game shuffles from its own random numbers, seeded by the deal, so every seating gets the same deals in
+every round, whatever the AIs draw and however many processes the games are spread over.  AIs are seeded
+from the game as well, so running a tournament again gives the same results as long as no AI stops
+searching on a time limit.
+
+Usage:
+    tournament = Tournament([AI.ComputerAI, NewAI], number_of_deals=1000, seed=1,
+                            checkpoint_file='tournament.json')
+    report = tournament.run()
+    print(format_report(report))
+'''
+
+NUMBER_OF_SEATS = 4
+
+# Normal distribution value for a 95% confidence interval
+Z_95 = 1.96
+
+# AI classes of the tournament being run by a worker process.  Set once per process by _init_worker
+_worker_entrants = None
+
+
+def get_seatings(number_of_entrants):
+    """
+    Seatings that move every entrant through every seat.  Entrants fill the seats in order and repeat when
+    there are fewer than four, so duplicate seatings are left out.
+    :param number_of_entrants: Number of AIs in the tournament, 1 to 4
+    :return: List of seatings, each a tuple with the entrant for each seat
+    """
+    seatings = []
+    for rotation in range(0, NUMBER_OF_SEATS):
+        seating = tuple((seat + rotation) % number_of_entrants for seat in range(0, NUMBER_OF_SEATS))
+        if seating not in seatings:
+            seatings.append(seating)
+
+    return seatings
+
+
+def get_moon_shots(round_points):
+    """
+    Seats that shot the moon in a game.  Shooting the moon is the only way a round hands out 78 points.
+    :param round_points: Points of each player for every round, as from HeadlessHearts.get_round_points
+    :return: Number of moon shots for each seat
+    """
+    moon_shots = [0] * NUMBER_OF_SEATS
+    for points in round_points:
+        if sum(points) == 3 * 26:
+            moon_shots[points.index(0)] += 1
+
+    return moon_shots
+
+
+def get_win_shares(total_points):
+    """
+    Lowest total points wins.  Players tied for the lowest points share the win.
+    :param total_points: Total points of each seat
+    :return: Share of the win for each seat
+    """
+    lowest_points = min(total_points)
+    winners = total_points.count(lowest_points)
+    return [1.0 / winners if points == lowest_points else 0.0 for points in total_points]
+
+
+def play_game(entrants, deal, seating):
+    """
+    Plays one game of the tournament
+    :param entrants: List of AI classes
+    :param deal: Seed of the deal
+    :param seating: Entrant for each seat
+    :return: Dictionary with the points, win shares and moon shots of each seat
+    """
+    game = Simulation.HeadlessHearts(seed=deal, ai_list=[entrants[entrant]() for entrant in seating])
+    total_points = game.play()
+    round_points = game.get_round_points()
+
+    return {'deal': deal,
+            'seating': list(seating),
+            'points': total_points,
+            'wins': get_win_shares(total_points),
+            'moon_shots': get_moon_shots(round_points),
+            'rounds': len(round_points)}
+
+
+def _init_worker(entrants):
+    global _worker_entrants
+    _worker_entrants = entrants
+
+
+def _play_task(task):
+    deal, seating = task
+    return play_game(_worker_entrants, deal, seating)
+
+
+def _get_key(deal, seating):
+    return str(deal) + ':' + ''.join(str(entrant) for entrant in seating)
+
+
+def _mean_and_interval(values):
+    """
+    :return: Mean of the values and the half width of its 95% confidence interval
+    """
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0
+
+    mean = float(sum(values)) / n
+    if n == 1:
+        return mean, 0.0
+
+    variance = sum((value - mean) ** 2 for value in values) / (n - 1)
+    return mean, Z_95 * math.sqrt(variance / n)
+
+
+class Tournament(object):
+    """
+    Duplicate dealt, seat rotated tournament between AIs
+    """
+    def __init__(self, entrants, number_of_deals, seed=0, names=None, checkpoint_file=None,
+                 checkpoint_interval=100):
+        """
+        :param entrants: List of 1 to 4 AI classes.  Classes have to be importable by the worker processes
+        :param number_of_deals: Number of deals.  Every deal is played once for each seating
+        :param seed: Seed of the first deal.  Following deals use the next seeds in order
+        :param names: Names of the entrants for the report.  Defaults to the class names
+        :param checkpoint_file: File results are saved to and resumed from.  None keeps results in memory only
+        :param checkpoint_interval: Number of finished games between saves of the checkpoint file
+        :return:
+        """
+        if not 0 < len(entrants) <= NUMBER_OF_SEATS:
+            raise ValueError('Tournament needs 1 to 4 entrants, got ' + str(len(entrants)))
+
+        if names is None:
+            names = [entrant.__name__ for entrant in entrants]
+
+        self.entrants = list(entrants)
+        self.names = list(names)
+        self.number_of_deals = number_of_deals
+        self.seed = seed
+        self.seatings = get_seatings(len(entrants))
+
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+
+        # Results of finished games, keyed by deal and seating
+        self.results = {}
+
+    # Checkpoint functions
+    def load_checkpoint(self):
+        if self.checkpoint_file is None or not os.path.exists(self.checkpoint_file):
+            return
+
+        with open(self.checkpoint_file, 'r') as checkpoint:
+            data = json.load(checkpoint)
+
+        # Results of a different tournament would skew this one
+        if data['names'] != self.names or data['seed'] != self.seed:
+            raise ValueError('Checkpoint file ' + self.checkpoint_file + ' is from a different tournament')
+
+        self.results = data['results']
+
+    def save_checkpoint(self):
+        if self.checkpoint_file is None:
+            return
+
+        data = {'names': self.names,
+                'seed': self.seed,
+                'number_of_deals': self.number_of_deals,
+                'results': self.results}
+
+        # Write to a temporary file first, so an interruption never leaves half a checkpoint behind
+        temp_file = self.checkpoint_file + '.tmp'
+        with open(temp_file, 'w') as checkpoint:
+            json.dump(data, checkpoint)
+
+        if os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+        os.rename(temp_file, self.checkpoint_file)
+
+    # Running functions
+    def get_tasks(self):
+        """
+        :return: List of (deal, seating) that don't have a result yet
+        """
+        tasks = []
+        for deal in range(self.seed, self.seed + self.number_of_deals):
+            for seating in self.seatings:
+                if _get_key(deal, seating) not in self.results:
+                    tasks.append((deal, seating))
+
+        return tasks
+
+    def add_result(self, result):
+        self.results[_get_key(result['deal'], result['seating'])] = result
+
+    def run(self, processes=None, chunk_size=8):
+        """
+        Plays every game that doesn't have a result yet
+        :param processes: Number of worker processes.  None uses every core, and 1 plays in this process
+        :param chunk_size: Number of games handed to a worker at a time
+        :return: Report from get_report
+        """
+        self.load_checkpoint()
+        tasks = self.get_tasks()
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        finished = 0
+        try:
+            if processes == 1:
+                for deal, seating in tasks:
+                    self.add_result(play_game(self.entrants, deal, seating))
+                    finished += 1
+                    if finished % self.checkpoint_interval == 0:
+                        self.save_checkpoint()
+
+            elif tasks:
+                pool = multiprocessing.Pool(processes, _init_worker, (self.entrants,))
+                try:
+                    for result in pool.imap_unordered(_play_task, tasks, chunk_size):
+                        self.add_result(result)
+                        finished += 1
+                        if finished % self.checkpoint_interval == 0:
+                            self.save_checkpoint()
+                    pool.close()
+                except:
+                    pool.terminate()
+                    raise
+                finally:
+                    pool.join()
+
+        finally:
+            # Keep whatever finished, even if the run was interrupted
+            self.save_checkpoint()
+
+        return self.get_report()
+
+    # Report functions
+    def get_report(self):
+        """
+        Statistics of every entrant and seat over the finished games.  Points and win rates are averaged per
+        deal first, so the confidence intervals are over deals and the luck of the deal cancels out.
+        :return: Dictionary with 'games', 'deals', 'entrants' and 'seats'
+        """
+        number_of_entrants = len(self.entrants)
+
+        # Per deal sums for each entrant: [points, wins, seats played]
+        deals = {}
+        moon_shots = [0] * number_of_entrants
+        seat_points = [[] for seat in range(0, NUMBER_OF_SEATS)]
+        seat_wins = [0.0] * NUMBER_OF_SEATS
+        seat_moon_shots = [0] * NUMBER_OF_SEATS
+
+        for result in self.results.values():
+            deal = deals.setdefault(result['deal'], [[0.0, 0.0, 0] for entrant in range(0, number_of_entrants)])
+
+            for seat in range(0, NUMBER_OF_SEATS):
+                entrant = result['seating'][seat]
+                deal[entrant][0] += result['points'][seat]
+                deal[entrant][1] += result['wins'][seat]
+                deal[entrant][2] += 1
+                moon_shots[entrant] += result['moon_shots'][seat]
+
+                seat_points[seat].append(result['points'][seat])
+                seat_wins[seat] += result['wins'][seat]
+                seat_moon_shots[seat] += result['moon_shots'][seat]
+
+        entrants = []
+        for entrant in range(0, number_of_entrants):
+            points = [deal[entrant][0] / deal[entrant][2] for deal in deals.values()]
+            wins = [deal[entrant][1] / deal[entrant][2] for deal in deals.values()]
+            mean_points, points_interval = _mean_and_interval(points)
+            win_rate, win_rate_interval = _mean_and_interval(wins)
+
+            entrants.append({'name': self.names[entrant],
+                             'points': mean_points,
+                             'points_interval': points_interval,
+                             'win_rate': win_rate,
+                             'win_rate_interval': win_rate_interval,
+                             'moon_shots': moon_shots[entrant]})
+
+        seats = []
+        for seat in range(0, NUMBER_OF_SEATS):
+            mean_points, points_interval = _mean_and_interval(seat_points[seat])
+            games = len(seat_points[seat])
+
+            seats.append({'points': mean_points,
+                          'points_interval': points_interval,
+                          'win_rate': seat_wins[seat] / games if games else 0.0,
+                          'moon_shots': seat_moon_shots[seat]})
+
+        return {'games': len(self.results),
+                'deals': len(deals),
+                'entrants': entrants,
+                'seats': seats}
+
+
+def format_report(report):
+    """
+    :param report: Report from Tournament.get_report
+    :return: Report as a table of text
+    """
+    lines = ['Games: ' + str(report['games']) + '  Deals: ' + str(report['deals'])]
+
+    for entrant in report['entrants']:
+        lines.append('%-20s points %6.2f +/- %5.2f  win rate %5.1f%% +/- %4.1f%%  moon shots %d' %
+                     (entrant['name'], entrant['points'], entrant['points_interval'],
+                      100 * entrant['win_rate'], 100 * entrant['win_rate_interval'], entrant['moon_shots']))
+
+    for seat, stats in enumerate(report['seats']):
+        lines.append('Seat %-15d points %6.2f +/- %5.2f  win rate %5.1f%%  moon shots %d' %
+                     (seat + 1, stats['points'], stats['points_interval'], 100 * stats['win_rate'],
+                      stats['moon_shots']))
+
+    return '\n'.join(lines)
@@ -1,4 +1,12 @@
+import sys
+
 from Core import Heart as Game
 
-game = Game.Hearts()
+# Playing with a game record file shows the recorded game instead
+if len(sys.argv) > 1:
+    from Core import GameRecord
+    from Core import ReplayViewer
+    game = ReplayViewer.ReplayViewer(GameRecord.load(sys.argv[1]))
+else:
+    game = Game.Hearts()
 game.play()